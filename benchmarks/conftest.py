@@ -0,0 +1,207 @@
+"""Fixtures and result recording for the Immich Browser benchmarks.
+
+Run with ``pytest benchmarks``. Results are written as JSON to
+``--bench-output``; pass a previous run as ``--bench-baseline`` to compare
+against it.
+"""
+
+from __future__ import annotations
+
+import json
+import platform
+import sys
+from collections.abc import AsyncGenerator, Generator
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import pytest
+from aiohttp.test_utils import TestServer
+
+from .fake_immich import FakeImmich, SyntheticLibrary
+
+DEFAULT_SIZES = "1000,10000,50000,200000"
+DEFAULT_OUTPUT = Path(__file__).parent / "results" / "latest.json"
+
+RECORDER_KEY = pytest.StashKey["BenchmarkRecorder"]()
+
+
+class BenchmarkRecorder:
+    """Collect metrics per library size and compare them with a baseline.
+
+    Metrics ending in ``_hit_rate`` are better when higher; every other
+    metric (times, CPU, memory) is better when lower.
+    """
+
+    def __init__(self, options: dict[str, Any]) -> None:
+        """Initialize the recorder."""
+        self.options = options
+        self.results: dict[str, dict[str, float]] = {}
+
+    def record(self, size: int, metric: str, value: float) -> None:
+        """Record one metric for a library size."""
+        self.results.setdefault(str(size), {})[metric] = round(value, 4)
+
+    def as_json(self) -> dict[str, Any]:
+        """Return the run as a JSON document."""
+        return {
+            "meta": {
+                "created": datetime.now(UTC).isoformat(),
+                "python": sys.version.split()[0],
+                "platform": platform.platform(),
+                **self.options,
+            },
+            "results": self.results,
+        }
+
+    def compare(
+        self, baseline: dict[str, Any], tolerance: float
+    ) -> tuple[list[str], list[str]]:
+        """Return report lines and the regressions beyond ``tolerance``."""
+        lines: list[str] = []
+        regressions: list[str] = []
+        for size, metrics in self.results.items():
+            previous = baseline.get("results", {}).get(size, {})
+            for metric, value in metrics.items():
+                if not previous.get(metric):
+                    continue
+                change = (value - previous[metric]) / previous[metric]
+                worse = -change if metric.endswith("_hit_rate") else change
+                line = (
+                    f"{size:>7} {metric:<28} {previous[metric]:>12.4f} "
+                    f"-> {value:>12.4f} ({change:+.1%})"
+                )
+                lines.append(line)
+                if worse > tolerance:
+                    regressions.append(line)
+        return lines, regressions
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Add the benchmark options."""
+    group = parser.getgroup("immich_browser benchmarks")
+    group.addoption(
+        "--bench-sizes",
+        default=DEFAULT_SIZES,
+        help="Comma-separated synthetic library sizes",
+    )
+    group.addoption(
+        "--bench-latency",
+        type=float,
+        default=0.0,
+        help="Seconds the fake Immich server waits before each response",
+    )
+    group.addoption(
+        "--bench-think-time",
+        type=float,
+        default=0.25,
+        help="Seconds a simulated user looks at each page before scrolling",
+    )
+    group.addoption("--bench-output", default=str(DEFAULT_OUTPUT))
+    group.addoption("--bench-baseline", default=None)
+    group.addoption(
+        "--bench-tolerance",
+        type=float,
+        default=0.25,
+        help="Relative change against the baseline reported as a regression",
+    )
+    group.addoption(
+        "--bench-strict",
+        action="store_true",
+        help="Fail the run when a metric regressed beyond the tolerance",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Create the run's recorder."""
+    config.stash[RECORDER_KEY] = BenchmarkRecorder(
+        {
+            "latency": config.getoption("bench_latency"),
+            "think_time": config.getoption("bench_think_time"),
+        }
+    )
+
+
+def pytest_generate_tests(metafunc: pytest.Metafunc) -> None:
+    """Run each benchmark once per library size, smallest first."""
+    if "library_size" in metafunc.fixturenames:
+        sizes = sorted(
+            int(size) for size in metafunc.config.getoption("bench_sizes").split(",")
+        )
+        metafunc.parametrize("library_size", sizes, ids=str)
+
+
+def pytest_terminal_summary(
+    terminalreporter: Any, exitstatus: int, config: pytest.Config
+) -> None:
+    """Save the results and report changes against the baseline."""
+    recorder = config.stash[RECORDER_KEY]
+    if not recorder.results:
+        return
+    output = Path(config.getoption("bench_output"))
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(recorder.as_json(), indent=2) + "\n")
+    terminalreporter.write_sep("=", "immich_browser benchmarks")
+    terminalreporter.write_line(f"Results written to {output}")
+
+    if (baseline_path := config.getoption("bench_baseline")) is None:
+        for size, metrics in recorder.results.items():
+            for metric, value in metrics.items():
+                terminalreporter.write_line(f"{size:>7} {metric:<28} {value:>12.4f}")
+        return
+    baseline = json.loads(Path(baseline_path).read_text())
+    lines, regressions = recorder.compare(
+        baseline, config.getoption("bench_tolerance")
+    )
+    for line in lines:
+        terminalreporter.write_line(line)
+    for line in regressions:
+        terminalreporter.write_line(f"REGRESSION {line}", red=True)
+
+
+def pytest_sessionfinish(session: pytest.Session, exitstatus: int) -> None:
+    """Fail a strict run that regressed against its baseline."""
+    config = session.config
+    baseline_path = config.getoption("bench_baseline")
+    if not config.getoption("bench_strict") or baseline_path is None:
+        return
+    baseline = json.loads(Path(baseline_path).read_text())
+    _, regressions = config.stash[RECORDER_KEY].compare(
+        baseline, config.getoption("bench_tolerance")
+    )
+    if regressions:
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Enable custom integrations for all benchmarks."""
+    yield
+
+
+@pytest.fixture
+def bench(request: pytest.FixtureRequest) -> BenchmarkRecorder:
+    """Return the run's recorder."""
+    return request.config.stash[RECORDER_KEY]
+
+
+@pytest.fixture
+def think_time(request: pytest.FixtureRequest) -> float:
+    """Return the simulated per-page viewing time."""
+    return request.config.getoption("bench_think_time")
+
+
+@pytest.fixture
+def synthetic_library(library_size: int) -> Generator[SyntheticLibrary]:
+    """Generate the library for this size."""
+    yield SyntheticLibrary(library_size)
+
+
+@pytest.fixture
+async def fake_immich(
+    request: pytest.FixtureRequest, synthetic_library: SyntheticLibrary
+) -> AsyncGenerator[tuple[FakeImmich, TestServer]]:
+    """Serve the synthetic library on a local port."""
+    fake = FakeImmich(synthetic_library, request.config.getoption("bench_latency"))
+    async with TestServer(fake.app, host="127.0.0.1") as server:
+        yield fake, server
@@ -0,0 +1,241 @@
+"""Local aiohttp stand-in for the Immich API used by the benchmarks."""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import io
+import json
+from bisect import bisect_right
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from aiohttp import web
+from PIL import Image
+
+USER_ID = "bench-user"
+ASSETS_PER_ALBUM = 500
+MAX_ALBUMS = 300
+# Immich's renditions: a WebP "thumbnail" and a JPEG "preview", both 3:4.
+RENDITIONS = {"thumbnail": (250, 333, "WEBP"), "preview": (1440, 1920, "JPEG")}
+# A real ThumbHash, so the payloads carry realistic string sizes.
+THUMBHASH = "1QcSHQRnh493V4dIh4eXh1h4kJUI"
+STREAM_BATCH = 1000
+_EPOCH = datetime(2020, 1, 1, tzinfo=UTC)
+
+
+def _timestamp(value: datetime) -> str:
+    """Format a datetime the way Immich does."""
+    return value.strftime("%Y-%m-%dT%H:%M:%S.") + f"{value.microsecond // 1000:03d}Z"
+
+
+def _render(width: int, height: int, image_format: str) -> bytes:
+    """Encode a detailed synthetic image at about a photo's compressed size."""
+    output = io.BytesIO()
+    image = Image.effect_mandelbrot((width, height), (-2.2, -1.6, 1.0, 1.6), 64)
+    image.convert("RGB").save(output, image_format, quality=80)
+    return output.getvalue()
+
+
+def _asset_id(index: int) -> str:
+    """Return a deterministic UUID-shaped asset id."""
+    return f"{index:08x}-0000-4000-8000-{index:012x}"
+
+
+class SyntheticLibrary:
+    """A deterministic library of ``size`` assets spread over albums.
+
+    Assets are kept as compact tuples and only rendered to dicts while a
+    response is written, so the stand-in adds little to the measured RSS.
+    """
+
+    def __init__(self, size: int) -> None:
+        """Generate the library."""
+        self.ids = [_asset_id(index) for index in range(size)]
+        self.created = [
+            _timestamp(_EPOCH + timedelta(minutes=17 * index)) for index in range(size)
+        ]
+        updated = _timestamp(_EPOCH)
+        self.updated = [updated] * size
+        self.album_count = max(1, min(MAX_ALBUMS, size // ASSETS_PER_ALBUM))
+        self.album_updated = [updated] * self.album_count
+        self.clock = _EPOCH + timedelta(days=1)
+        # (updatedAt, index) of every touch, in time order, for delta syncs.
+        self.changes: list[tuple[str, int]] = []
+
+    def asset(self, index: int) -> dict[str, Any]:
+        """Render one asset as Immich returns it."""
+        return {
+            "id": self.ids[index],
+            "type": "VIDEO" if index % 10 == 0 else "IMAGE",
+            "ownerId": USER_ID,
+            "originalFileName": f"IMG_{index:06d}.jpg",
+            "fileCreatedAt": self.created[index],
+            "updatedAt": self.updated[index],
+            "thumbhash": THUMBHASH,
+            "checksum": base64.b64encode(
+                hashlib.sha1(self.ids[index].encode()).digest()
+            ).decode(),
+            "isFavorite": False,
+            "isTrashed": False,
+        }
+
+    def album_id(self, album: int) -> str:
+        """Return the UUID-shaped id of an album."""
+        return f"{album:08x}-0000-4000-9000-{album:012x}"
+
+    def album_members(self, album: int) -> range:
+        """Return the asset indexes of an album."""
+        return range(album, len(self.ids), self.album_count)
+
+    def album(self, album: int) -> dict[str, Any]:
+        """Render an album without its assets."""
+        members = self.album_members(album)
+        return {
+            "id": self.album_id(album),
+            "albumName": f"Album {album}",
+            "albumThumbnailAssetId": self.ids[members[0]] if members else None,
+            "assetCount": len(members),
+            "startDate": self.created[members[0]] if members else None,
+            "endDate": self.created[members[-1]] if members else None,
+            "updatedAt": self.album_updated[album],
+            "shared": False,
+        }
+
+    def touch(self, count: int) -> None:
+        """Mark ``count`` assets (and their albums) as updated now."""
+        self.clock += timedelta(seconds=1)
+        now = _timestamp(self.clock)
+        step = max(1, len(self.ids) // max(1, count))
+        for index in range(0, len(self.ids), step)[:count]:
+            self.updated[index] = now
+            self.album_updated[index % self.album_count] = now
+            self.changes.append((now, index))
+
+    def changed_since(self, after: str) -> list[int]:
+        """Return the indexes of assets whose latest update is after ``after``."""
+        start = bisect_right(self.changes, (after, len(self.ids)))
+        return sorted(
+            {index for _, index in self.changes[start:] if self.updated[index] > after}
+        )
+
+
+class FakeImmich:
+    """aiohttp application serving a ``SyntheticLibrary``.
+
+    Every request waits ``latency`` seconds first. Request counts per route
+    are kept in ``requests`` so benchmarks can tell prefetch traffic apart.
+    """
+
+    def __init__(self, library: SyntheticLibrary, latency: float = 0.0) -> None:
+        """Initialize the server."""
+        self.library = library
+        self.latency = latency
+        self.requests: dict[str, int] = {}
+        self._renditions: dict[str, bytes] = {}
+        self.app = web.Application(middlewares=[self._middleware])
+        self.app.router.add_get("/api/users/me", self._user)
+        self.app.router.add_get("/api/albums", self._albums)
+        self.app.router.add_get("/api/albums/{album_id}", self._album)
+        self.app.router.add_post("/api/sync/full-sync", self._full_sync)
+        self.app.router.add_post("/api/sync/delta-sync", self._delta_sync)
+        self.app.router.add_get("/api/assets/{asset_id}/thumbnail", self._thumbnail)
+        self.app.router.add_get("/api/server/statistics", self._statistics)
+
+    @web.middleware
+    async def _middleware(
+        self, request: web.Request, handler: Any
+    ) -> web.StreamResponse:
+        """Count the request and apply the configured latency."""
+        route = request.match_info.route.resource
+        name = route.canonical if route is not None else request.path
+        self.requests[name] = self.requests.get(name, 0) + 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return await handler(request)
+
+    async def _stream(
+        self, request: web.Request, head: str, items: Any, tail: str
+    ) -> web.StreamResponse:
+        """Write a JSON document whose array is rendered in batches."""
+        response = web.StreamResponse(headers={"Content-Type": "application/json"})
+        await response.prepare(request)
+        await response.write(head.encode())
+        batch: list[str] = []
+        separator = ""
+        for item in items:
+            batch.append(json.dumps(item))
+            if len(batch) == STREAM_BATCH:
+                await response.write((separator + ", ".join(batch)).encode())
+                separator = ", "
+                batch = []
+        if batch:
+            await response.write((separator + ", ".join(batch)).encode())
+        await response.write(tail.encode())
+        await response.write_eof()
+        return response
+
+    async def _user(self, request: web.Request) -> web.Response:
+        """Return the API key's user."""
+        return web.json_response({"id": USER_ID, "email": "bench@example.com"})
+
+    async def _albums(self, request: web.Request) -> web.Response:
+        """Return every album without assets."""
+        library = self.library
+        return web.json_response(
+            [library.album(album) for album in range(library.album_count)]
+        )
+
+    async def _album(self, request: web.Request) -> web.StreamResponse:
+        """Stream one album with its assets."""
+        library = self.library
+        album_id = request.match_info["album_id"]
+        album = int(album_id[:8], 16)
+        head = json.dumps(library.album(album))[:-1] + ', "assets": ['
+        members = (library.asset(index) for index in library.album_members(album))
+        return await self._stream(request, head, members, "]}")
+
+    async def _full_sync(self, request: web.Request) -> web.StreamResponse:
+        """Stream one page of assets ordered by id."""
+        library = self.library
+        body = await request.json()
+        start = bisect_right(library.ids, body["lastId"]) if body.get("lastId") else 0
+        end = min(len(library.ids), start + body["limit"])
+        assets = (library.asset(index) for index in range(start, end))
+        return await self._stream(request, "[", assets, "]")
+
+    async def _delta_sync(self, request: web.Request) -> web.Response:
+        """Return the assets updated after the watermark."""
+        library = self.library
+        body = await request.json()
+        after = body["updatedAfter"]
+        upserted = [library.asset(index) for index in library.changed_since(after)]
+        return web.json_response(
+            {"needsFullSync": False, "upserted": upserted, "deleted": []}
+        )
+
+    async def _thumbnail(self, request: web.Request) -> web.Response:
+        """Return the requested rendition; every asset shares the same image."""
+        size = request.query.get("size", "thumbnail")
+        if size not in RENDITIONS:
+            return web.Response(status=400)
+        if size not in self._renditions:
+            self._renditions[size] = _render(*RENDITIONS[size])
+        image_format = RENDITIONS[size][2]
+        return web.Response(
+            body=self._renditions[size], content_type=f"image/{image_format.lower()}"
+        )
+
+    async def _statistics(self, request: web.Request) -> web.Response:
+        """Return server totals; every asset is counted at 2 MB."""
+        size = len(self.library.ids)
+        videos = (size + 9) // 10
+        return web.json_response(
+            {
+                "photos": size - videos,
+                "videos": videos,
+                "usage": size * 2_000_000,
+                "usageByUser": [],
+            }
+        )
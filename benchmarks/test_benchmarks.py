@@ -0,0 +1,179 @@
+"""Benchmarks of the Immich Browser integration against a fake Immich server.
+
+Each size runs one scenario end to end: set up the entry (a cold first
+sync), poll with a little churn, page through an album and the recent
+timeline over the WebSocket API, then scroll an album the way the card
+does and count how many thumbnails the prefetcher had already cached.
+Sizes run smallest first, so the process-wide peak RSS recorded after
+each one is attributable to that size.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import resource
+import statistics
+import sys
+import time
+from typing import Any
+
+from aiohttp.test_utils import TestServer
+from homeassistant.const import CONF_API_KEY, CONF_HOST, CONF_PORT
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.immich_browser.const import DOMAIN
+from custom_components.immich_browser.prefetch import DATA_PREFETCHER
+from custom_components.immich_browser.thumbnails import thumbnail_key
+
+from .conftest import BenchmarkRecorder
+from .fake_immich import FakeImmich
+
+POLLS = 10
+CHURN = 25
+PAGES = 20
+PAGE_SIZE = 100
+SCROLL_PAGES = 8
+SCROLL_PAGE_SIZE = 50
+# A 3-column grid cell on a 7" tablet at 1.5x is about 256 device pixels.
+THUMBNAIL_SIZE = "256"
+
+
+def _percentile(samples: list[float], percent: int) -> float:
+    """Return a percentile of the samples."""
+    if len(samples) < 2:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[percent - 1]
+
+
+def _peak_rss_mb() -> float:
+    """Return the process's peak resident set size in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+async def _async_time_pages(
+    client: Any, message: dict[str, Any], pages: int
+) -> list[float]:
+    """Follow a paged command's cursors and time each round trip."""
+    timings: list[float] = []
+    cursor = None
+    for _ in range(pages):
+        started = time.perf_counter()
+        await client.send_json_auto_id({**message, "cursor": cursor})
+        response = await client.receive_json()
+        timings.append(time.perf_counter() - started)
+        assert response["success"], response
+        if (cursor := response["result"]["next_cursor"]) is None:
+            break
+    return timings
+
+
+async def test_library(
+    hass: HomeAssistant,
+    hass_ws_client,
+    hass_client,
+    tmp_path,
+    fake_immich: tuple[FakeImmich, TestServer],
+    library_size: int,
+    bench: BenchmarkRecorder,
+    think_time: float,
+) -> None:
+    """Benchmark sync, polling, paging and thumbnail prefetch for one size."""
+    fake, server = fake_immich
+    library = fake.library
+    # A fresh config dir keeps thumbnails cached by a previous run out.
+    hass.config.config_dir = str(tmp_path)
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_HOST: server.host, CONF_PORT: server.port, CONF_API_KEY: "bench"},
+    )
+    entry.add_to_hass(hass)
+
+    started = time.perf_counter()
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    bench.record(library_size, "first_refresh_s", time.perf_counter() - started)
+    coordinator = entry.runtime_data.coordinator
+    assert len(coordinator.library.assets) == library_size
+
+    cpu: list[float] = []
+    wall: list[float] = []
+    for poll in range(POLLS):
+        if poll % 2:
+            library.touch(CHURN)
+        cpu_started = time.process_time()
+        started = time.perf_counter()
+        await coordinator.async_refresh()
+        wall.append(time.perf_counter() - started)
+        cpu.append(time.process_time() - cpu_started)
+    assert coordinator.last_update_success
+    bench.record(library_size, "poll_cpu_ms", statistics.mean(cpu) * 1000)
+    bench.record(library_size, "poll_wall_ms", statistics.mean(wall) * 1000)
+
+    album_id = library.album_id(0)
+    ws_client = await hass_ws_client(hass)
+    timings = await _async_time_pages(
+        ws_client,
+        {
+            "type": f"{DOMAIN}/album_assets",
+            "album_id": album_id,
+            "page_size": PAGE_SIZE,
+            "prefetch": 0,
+        },
+        PAGES,
+    )
+    bench.record(library_size, "album_page_p50_ms", _percentile(timings, 50) * 1000)
+    bench.record(library_size, "album_page_p95_ms", _percentile(timings, 95) * 1000)
+    timings = await _async_time_pages(
+        ws_client,
+        {"type": f"{DOMAIN}/recent_assets", "page_size": PAGE_SIZE},
+        PAGES,
+    )
+    bench.record(library_size, "recent_page_p50_ms", _percentile(timings, 50) * 1000)
+    bench.record(library_size, "recent_page_p95_ms", _percentile(timings, 95) * 1000)
+
+    # Scroll like the card: fetch a page, load its thumbnails in one bundle,
+    # linger, repeat.
+    prefetcher = hass.data[DATA_PREFETCHER]
+    http_client = await hass_client()
+    size = THUMBNAIL_SIZE
+    hits = total = received = 0
+    timings = []
+    cursor = None
+    for _ in range(SCROLL_PAGES):
+        await ws_client.send_json_auto_id(
+            {
+                "type": f"{DOMAIN}/album_assets",
+                "album_id": album_id,
+                "cursor": cursor,
+                "page_size": SCROLL_PAGE_SIZE,
+                "prefetch": SCROLL_PAGE_SIZE,
+                "thumbnail_size": size,
+            }
+        )
+        page = (await ws_client.receive_json())["result"]
+        asset_ids = [asset["id"] for asset in page["assets"]]
+        for asset_id in asset_ids:
+            checksum = coordinator.library.get_record(asset_id).checksum
+            hits += thumbnail_key(asset_id, size, checksum) in prefetcher._cache
+        total += len(asset_ids)
+        started = time.perf_counter()
+        response = await http_client.post(
+            f"/api/{DOMAIN}/thumbnails", json={"asset_ids": asset_ids, "size": size}
+        )
+        assert response.status == 200
+        received += len(await response.read())
+        timings.append(time.perf_counter() - started)
+        if (cursor := page["next_cursor"]) is None:
+            break
+        await asyncio.sleep(think_time)
+    bench.record(library_size, "thumbnail_hit_rate", hits / total)
+    bench.record(library_size, "thumbnail_kb", received / total / 1024)
+    bench.record(library_size, "bundle_p50_ms", _percentile(timings, 50) * 1000)
+
+    await ws_client.close()
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    bench.record(library_size, "peak_rss_mb", _peak_rss_mb())
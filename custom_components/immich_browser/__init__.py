@@ -3,17 +3,46 @@
 from __future__ import annotations
 
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 
+import aiohttp
+
 from homeassistant.components.http import StaticPathConfig, async_register_static_paths
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.const import (
+    CONF_API_KEY,
+    CONF_HOST,
+    CONF_PORT,
+    EVENT_HOMEASSISTANT_CLOSE,
+    Platform,
+)
+from homeassistant.core import Event, HomeAssistant, callback
 from homeassistant.helpers import config_validation as cv
-
-from .const import DOMAIN, FRONTEND_SCRIPT_URL
+from homeassistant.util.ssl import get_default_context
+
+from .api import ApiClient
+from .const import (
+    CONF_PUSH_UPDATES,
+    CONF_USE_SSL,
+    DEFAULT_CONNECTION_LIMIT_PER_HOST,
+    DEFAULT_DNS_CACHE_TTL,
+    DEFAULT_KEEPALIVE_TIMEOUT,
+    DEFAULT_THUMBNAIL_CACHE_SIZE,
+    DOMAIN,
+    FRONTEND_SCRIPT_URL,
+)
 from .coordinator import TemplateCoordinator
+from .metrics import MetricsRegistry
+from .prefetch import DATA_PREFETCHER, ThumbnailPrefetcher
+from .push import LIBRARY_EVENTS, ImmichEventListener
+from .snapshot import LibrarySnapshot, async_remove_snapshot, snapshot_source
+from .thumbnails import (
+    DATA_THUMBNAIL_CACHE,
+    ImmichThumbnailBundleView,
+    ImmichThumbnailView,
+    ThumbnailCache,
+)
 
 from .websocket import async_setup_websocket
 
@@ -32,10 +61,16 @@ CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 class ImmichBrowserData:
     """Data for the Immich Browser integration."""
 
+    client: ApiClient
+
     coordinator: TemplateCoordinator
 
     coordinator_secondary: TemplateSecondaryCoordinator
 
+    push: ImmichEventListener | None = None
+
+    # WebSocket command stats; the client keeps its own for API requests.
+    metrics: MetricsRegistry = field(default_factory=MetricsRegistry)
 
 
 type ImmichBrowserConfigEntry = ConfigEntry[
@@ -73,6 +108,17 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
         # Path already registered — happens on reload
         pass
 
+    thumbnail_cache = ThumbnailCache(
+        hass,
+        Path(hass.config.path(".cache", DOMAIN, "thumbnails")),
+        DEFAULT_THUMBNAIL_CACHE_SIZE,
+    )
+    await thumbnail_cache.async_load()
+    hass.http.register_view(ImmichThumbnailView(thumbnail_cache))
+    hass.http.register_view(ImmichThumbnailBundleView(thumbnail_cache))
+    hass.data[DATA_THUMBNAIL_CACHE] = thumbnail_cache
+    hass.data[DATA_PREFETCHER] = ThumbnailPrefetcher(hass, thumbnail_cache)
+
     # Auto-register as Lovelace resource (storage mode only)
     try:
         lovelace = hass.data.get("lovelace")
@@ -93,19 +139,107 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     return True
 
 
+def _async_create_client(
+    hass: HomeAssistant, entry: ImmichBrowserConfigEntry
+) -> ApiClient:
+    """Create the entry's API client on its own keep-alive connection pool.
+
+    A dedicated connector keeps TLS sessions and sockets to the Immich host
+    warm instead of competing for HA's shared pool; the session is closed
+    when the entry unloads or Home Assistant shuts down.
+    """
+    connector = aiohttp.TCPConnector(
+        limit_per_host=DEFAULT_CONNECTION_LIMIT_PER_HOST,
+        keepalive_timeout=DEFAULT_KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=DEFAULT_DNS_CACHE_TTL,
+        ssl=get_default_context(),
+    )
+    session = aiohttp.ClientSession(connector=connector)
+
+    async def _async_close_session(_event: Event | None = None) -> None:
+        await session.close()
+
+    entry.async_on_unload(_async_close_session)
+    entry.async_on_unload(
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close_session)
+    )
+    return ApiClient(
+        host=entry.data[CONF_HOST],
+        port=entry.data[CONF_PORT],
+        api_key=entry.data.get(CONF_API_KEY, ""),
+        session=session,
+        use_ssl=entry.data.get(CONF_USE_SSL, False),
+        executor=hass.async_add_executor_job,
+    )
+
+
+async def _async_restore_snapshot(
+    snapshot: LibrarySnapshot,
+    coordinator: TemplateCoordinator,
+    coordinator_secondary: TemplateSecondaryCoordinator,
+) -> bool:
+    """Restore the coordinators from the saved snapshot, if there is one."""
+    data = await snapshot.async_load()
+    if not data or "library" not in data:
+        return False
+    try:
+        await coordinator.async_restore(data["library"])
+    except (KeyError, TypeError, ValueError) as err:
+        _LOGGER.warning("Ignoring unreadable library snapshot: %s", err)
+        return False
+    if (secondary := data.get("secondary")) is not None:
+        coordinator_secondary.async_restore(secondary)
+    return True
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ImmichBrowserConfigEntry) -> bool:
     """Set up Immich Browser from a config entry."""
-    coordinator = TemplateCoordinator(hass, entry)
-    await coordinator.async_config_entry_first_refresh()
+    client = _async_create_client(hass, entry)
+
+    snapshot = LibrarySnapshot(hass, entry.entry_id, snapshot_source(entry.data))
+    coordinator = TemplateCoordinator(hass, entry, client, snapshot)
+
+
+    coordinator_secondary = TemplateSecondaryCoordinator(
+        hass, entry, client, snapshot
+    )
+
+    if await _async_restore_snapshot(snapshot, coordinator, coordinator_secondary):
+        # Serve the saved index now and let a delta sync catch up behind it.
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN}_refresh_{entry.entry_id}"
+        )
+        entry.async_create_background_task(
+            hass,
+            coordinator_secondary.async_refresh(),
+            f"{DOMAIN}_refresh_secondary_{entry.entry_id}",
+        )
+    else:
+        await coordinator.async_config_entry_first_refresh()
+        # Statistics only feed sensors; if they fail, those stay unavailable
+        # until a later poll instead of holding up the whole entry.
+        await coordinator_secondary.async_refresh()
 
 
-    coordinator_secondary = TemplateSecondaryCoordinator(hass, entry)
-    await coordinator_secondary.async_config_entry_first_refresh()
+    push: ImmichEventListener | None = None
+    if entry.data.get(CONF_PUSH_UPDATES):
 
+        @callback
+        def _async_on_event(name: str, _payload: object) -> None:
+            # The coordinator's debouncer folds event bursts into one delta sync.
+            if name in LIBRARY_EVENTS:
+                entry.async_create_task(hass, coordinator.async_request_refresh())
+
+        push = ImmichEventListener(client, _async_on_event)
+        entry.async_create_background_task(
+            hass, push.async_run(), f"{DOMAIN}_push_{entry.entry_id}"
+        )
 
     entry.runtime_data = ImmichBrowserData(
+        client=client,
         coordinator=coordinator,
         coordinator_secondary=coordinator_secondary,
+        push=push,
     )
 
 
@@ -116,3 +250,10 @@ async def async_setup_entry(hass: HomeAssistant, entry: ImmichBrowserConfigEntry
 async def async_unload_entry(hass: HomeAssistant, entry: ImmichBrowserConfigEntry) -> bool:
     """Unload a config entry."""
     return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+
+
+async def async_remove_entry(
+    hass: HomeAssistant, entry: ImmichBrowserConfigEntry
+) -> None:
+    """Remove the stored snapshot of a deleted entry."""
+    await async_remove_snapshot(hass, entry.entry_id)
@@ -3,20 +3,51 @@
 from __future__ import annotations
 
 import asyncio
+import json
 import logging
-from typing import Any
+import random
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable, Hashable, Iterable
+from dataclasses import dataclass, field
+from typing import Any, Generic, TypeVar
 
 import aiohttp
 
-from .const import DEFAULT_TIMEOUT
+from .breaker import BreakerState, CircuitBreaker
+from .const import (
+    DEFAULT_FAN_OUT_CONCURRENCY,
+    DEFAULT_RESPONSE_CACHE_SIZE,
+    DEFAULT_RESPONSE_CACHE_TTL,
+    DEFAULT_TIMEOUT,
+    FAN_OUT_RETRY_DELAY,
+    JSON_OFFLOAD_BYTES,
+    REQUEST_RETRIES,
+    REQUEST_RETRY_BACKOFF,
+    STREAM_CHUNK_SIZE,
+)
+from .metrics import MetricsRegistry, endpoint_name
+from .streaming import JsonArrayStream
 
 _LOGGER = logging.getLogger(__name__)
 
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD"})
+
+_K = TypeVar("_K", bound=Hashable)
+_V = TypeVar("_V")
+
+# Runs a blocking callable off the event loop, like hass.async_add_executor_job.
+ExecutorJob = Callable[..., Awaitable[Any]]
+
 
 class CannotConnectError(Exception):
     """Raised when a connection or timeout error occurs."""
 
 
+class CircuitOpenError(CannotConnectError):
+    """Raised without contacting the server while its circuit breaker is open."""
+
+
 class InvalidAuthError(Exception):
     """Raised when the API returns a 401 or 403 response."""
 
@@ -28,6 +59,91 @@ class ServerError(Exception):
     the request but cannot fulfill it.
     """
 
+    def __init__(self, message: str, status: int = 0) -> None:
+        """Initialize the error with the HTTP status, if known."""
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass(slots=True)
+class CachedResponse:
+    """A decoded response body with its validators."""
+
+    etag: str | None
+    last_modified: str | None
+    body: Any
+    size: int
+    validated_at: float
+
+
+@dataclass(slots=True)
+class FanOutResult(Generic[_K, _V]):
+    """Outcome of a fan-out: the values fetched and the keys that failed."""
+
+    results: dict[_K, _V] = field(default_factory=dict)
+    errors: dict[_K, Exception] = field(default_factory=dict)
+
+    @property
+    def complete(self) -> bool:
+        """Return True if every key was fetched."""
+        return not self.errors
+
+
+class ResponseCache:
+    """Validator-keyed cache of decoded GET responses.
+
+    Entries expire ``ttl`` seconds after they were last confirmed by the
+    server, and the least recently used entries are evicted once the raw body
+    sizes add up to more than ``max_bytes``.
+    """
+
+    def __init__(self, ttl: float, max_bytes: int) -> None:
+        """Initialize the cache."""
+        self._ttl = ttl
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, CachedResponse] = OrderedDict()
+        self._total_bytes = 0
+
+    def __len__(self) -> int:
+        """Return the number of cached responses."""
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> CachedResponse | None:
+        """Return a live entry for the key, dropping it if expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry.validated_at > self._ttl:
+            self._pop(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def store(
+        self,
+        key: Hashable,
+        etag: str | None,
+        last_modified: str | None,
+        body: Any,
+        size: int,
+    ) -> None:
+        """Store a response that carried at least one validator."""
+        self._pop(key)
+        if size > self._max_bytes:
+            return
+        self._entries[key] = CachedResponse(
+            etag, last_modified, body, size, time.monotonic()
+        )
+        self._total_bytes += size
+        while self._total_bytes > self._max_bytes:
+            self._pop(next(iter(self._entries)))
+
+    def _pop(self, key: Hashable) -> None:
+        """Remove an entry if present."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total_bytes -= entry.size
+
 
 class ApiClient:
     """Generic API client with configurable auth, timeout, and error handling."""
@@ -40,13 +156,25 @@ class ApiClient:
         session: aiohttp.ClientSession,
         use_ssl: bool = False,
         timeout: int = DEFAULT_TIMEOUT,
+        cache_ttl: float = DEFAULT_RESPONSE_CACHE_TTL,
+        cache_max_bytes: int = DEFAULT_RESPONSE_CACHE_SIZE,
+        executor: ExecutorJob | None = None,
     ) -> None:
-        """Initialize the API client."""
+        """Initialize the API client.
+
+        With an ``executor``, JSON bodies larger than ``JSON_OFFLOAD_BYTES``
+        are decoded off the event loop.
+        """
         scheme = "https" if use_ssl else "http"
         self._base_url = f"{scheme}://{host}:{port}"
         self._api_key = api_key
         self._session = session
         self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._inflight: dict[Hashable, asyncio.Future[Any]] = {}
+        self._cache = ResponseCache(cache_ttl, cache_max_bytes)
+        self._executor = executor
+        self.breaker = CircuitBreaker()
+        self.metrics = MetricsRegistry()
 
     def _get_auth_headers(self) -> dict[str, str]:
         """Return authorization headers.
@@ -57,12 +185,69 @@ class ApiClient:
             return {}
         return {"Authorization": f"Bearer {self._api_key}"}
 
-    async def _request(
-        self, method: str, endpoint: str, **kwargs: Any
-    ) -> dict[str, Any]:
-        """Make an authenticated request to the API."""
+    async def _async_send(
+        self,
+        method: str,
+        endpoint: str,
+        extra_headers: dict[str, str] | None = None,
+        *,
+        idempotent: bool | None = None,
+        **kwargs: Any,
+    ) -> aiohttp.ClientResponse:
+        """Send an authenticated request through the circuit breaker.
+
+        Idempotent requests (GET/HEAD, or any method when ``idempotent`` is
+        passed) that time out, fail to connect or get a 5xx answer are retried
+        with exponential backoff and full jitter until the retries run out or
+        the breaker opens. While the breaker is open requests fail fast with
+        ``CircuitOpenError`` instead of reaching the server.
+        """
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        retries = REQUEST_RETRIES if idempotent else 0
+        attempt = 0
+        while True:
+            if not self.breaker.allow_request():
+                raise CircuitOpenError(
+                    "Server marked unhealthy, "
+                    f"next probe in {self.breaker.retry_in:.0f}s"
+                )
+            try:
+                response = await self._async_send_once(
+                    method, endpoint, extra_headers, **kwargs
+                )
+            except ServerError as err:
+                if err.status < 500:
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                if attempt == retries or self.breaker.state is BreakerState.OPEN:
+                    raise
+            except CannotConnectError:
+                self.breaker.record_failure()
+                if attempt == retries or self.breaker.state is BreakerState.OPEN:
+                    raise
+            except InvalidAuthError:
+                self.breaker.record_success()
+                raise
+            else:
+                self.breaker.record_success()
+                return response
+            await asyncio.sleep(random.uniform(0, REQUEST_RETRY_BACKOFF * 2**attempt))
+            attempt += 1
+
+    async def _async_send_once(
+        self,
+        method: str,
+        endpoint: str,
+        extra_headers: dict[str, str] | None = None,
+        **kwargs: Any,
+    ) -> aiohttp.ClientResponse:
+        """Send one authenticated request and map transport/HTTP errors."""
         url = f"{self._base_url}{endpoint}"
         headers = self._get_auth_headers()
+        if extra_headers:
+            headers.update(extra_headers)
         try:
             response = await self._session.request(
                 method,
@@ -79,16 +264,246 @@ class ApiClient:
             raise CannotConnectError("Request timed out") from err
 
         if response.status in (401, 403):
+            response.release()
             raise InvalidAuthError(
                 f"Authentication failed (HTTP {response.status})"
             )
 
         if response.status >= 400:
+            response.release()
             raise ServerError(
-                f"Server returned HTTP {response.status}: {response.reason}"
+                f"Server returned HTTP {response.status}: {response.reason}",
+                status=response.status,
             )
 
-        return await response.json()
+        return response
+
+    async def _single_flight(
+        self, key: Hashable, factory: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Share one in-flight call between all concurrent callers of a key.
+
+        The call runs in its own task so a cancelled caller does not cancel it
+        for the others. Every waiter receives the same result object, which
+        must therefore be treated as read-only.
+        """
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(factory())
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._flight_done(key, done))
+        return await asyncio.shield(future)
+
+    def _flight_done(self, key: Hashable, future: asyncio.Future[Any]) -> None:
+        """Forget a finished flight and mark its exception as retrieved."""
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if not future.cancelled():
+            future.exception()
+
+    async def _request(
+        self,
+        method: str,
+        endpoint: str,
+        *,
+        idempotent: bool | None = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Make an authenticated request to the API.
+
+        Concurrent identical idempotent requests (GET/HEAD, or any method when
+        ``idempotent`` is passed) are coalesced into a single upstream call,
+        and GET responses are revalidated against the response cache.
+        """
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        if not idempotent:
+            return await self._async_request_json(method, endpoint, None, **kwargs)
+        key = (method, endpoint, json.dumps(kwargs, sort_keys=True, default=str))
+        return await self._single_flight(
+            key, lambda: self._async_request_json(method, endpoint, key, **kwargs)
+        )
+
+    async def _async_request_json(
+        self, method: str, endpoint: str, key: Hashable | None, **kwargs: Any
+    ) -> Any:
+        """Send a request and decode its JSON body.
+
+        GET requests with a cached body are sent with If-None-Match and
+        If-Modified-Since; a 304 answer returns the cached object without
+        downloading or decoding anything.
+        """
+        cacheable = method == "GET" and key is not None
+        cached = self._cache.get(key) if cacheable else None
+        extra_headers: dict[str, str] = {}
+        if cached is not None:
+            if cached.etag:
+                extra_headers[aiohttp.hdrs.IF_NONE_MATCH] = cached.etag
+            if cached.last_modified:
+                extra_headers[aiohttp.hdrs.IF_MODIFIED_SINCE] = cached.last_modified
+
+        with self.metrics.track(endpoint_name(method, endpoint)) as stats:
+            response = await self._async_send(
+                method, endpoint, extra_headers, idempotent=key is not None, **kwargs
+            )
+            if response.status == 304:
+                response.release()
+                if cached is None:
+                    # Nothing was cached, so no validators were sent.
+                    raise ServerError(
+                        f"Unexpected 304 from {endpoint}", status=response.status
+                    )
+                stats.cache_hits += 1
+                cached.validated_at = time.monotonic()
+                return cached.body
+            if cacheable:
+                stats.cache_misses += 1
+
+            try:
+                raw = await response.read()
+                stats.bytes += len(raw)
+                decode_started = time.perf_counter()
+                if self._executor is not None and len(raw) > JSON_OFFLOAD_BYTES:
+                    body = await self._executor(json.loads, raw)
+                else:
+                    body = json.loads(raw)
+                stats.json.observe(time.perf_counter() - decode_started)
+            except ValueError as err:
+                raise ServerError(f"Malformed JSON from {endpoint}: {err}") from err
+            except aiohttp.ClientError as err:
+                raise CannotConnectError(f"Client error: {err}") from err
+            except asyncio.TimeoutError as err:
+                raise CannotConnectError("Request timed out") from err
+        if cacheable:
+            etag = response.headers.get(aiohttp.hdrs.ETAG)
+            last_modified = response.headers.get(aiohttp.hdrs.LAST_MODIFIED)
+            if etag or last_modified:
+                self._cache.store(key, etag, last_modified, body, len(raw))
+        return body
+
+    async def async_iter_json(
+        self, stream: JsonArrayStream, method: str, endpoint: str, **kwargs: Any
+    ) -> AsyncIterator[Any]:
+        """Yield the elements of a JSON array while the response downloads.
+
+        The body is never buffered whole: chunks are decoded as they arrive
+        and elements are yielded one by one. Once iteration finishes the rest
+        of the document is available as ``stream.envelope``. With an executor,
+        bodies of unknown length or larger than ``JSON_OFFLOAD_BYTES`` are
+        decoded off the event loop; chunks that are already buffered would
+        otherwise be decoded back to back without yielding to it.
+        """
+        # Not metrics.track(): its latency would include the time the
+        # consumer spends on each element between our yields.
+        stats = self.metrics.endpoint(endpoint_name(method, endpoint))
+        stats.requests += 1
+        stats.in_flight += 1
+        busy = 0.0
+        resumed = time.perf_counter()
+        try:
+            response = await self._async_send(method, endpoint, **kwargs)
+            decoding = 0.0
+            size = response.content_length
+            offload = self._executor is not None and (
+                size is None or size > JSON_OFFLOAD_BYTES
+            )
+            try:
+                async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                    stats.bytes += len(chunk)
+                    decode_started = time.perf_counter()
+                    if offload:
+                        items = await self._executor(stream.feed, chunk)
+                    else:
+                        items = stream.feed(chunk)
+                    decoding += time.perf_counter() - decode_started
+                    for item in items:
+                        busy += time.perf_counter() - resumed
+                        try:
+                            yield item
+                        finally:
+                            resumed = time.perf_counter()
+                stream.close()
+            except ValueError as err:
+                raise ServerError(f"Malformed JSON from {endpoint}: {err}") from err
+            except aiohttp.ClientError as err:
+                raise CannotConnectError(f"Client error: {err}") from err
+            except asyncio.TimeoutError as err:
+                raise CannotConnectError("Request timed out") from err
+            finally:
+                response.release()
+                stats.json.observe(decoding)
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            stats.in_flight -= 1
+            stats.latency.observe(busy + time.perf_counter() - resumed)
+
+    async def async_ws_connect(
+        self, endpoint: str, **kwargs: Any
+    ) -> aiohttp.ClientWebSocketResponse:
+        """Open an authenticated WebSocket to the API."""
+        url = f"{self._base_url}{endpoint}"
+        try:
+            return await self._session.ws_connect(
+                url, headers=self._get_auth_headers(), **kwargs
+            )
+        except aiohttp.WSServerHandshakeError as err:
+            if err.status in (401, 403):
+                raise InvalidAuthError(
+                    f"Authentication failed (HTTP {err.status})"
+                ) from err
+            raise CannotConnectError(f"WebSocket handshake failed: {err}") from err
+        except aiohttp.ClientError as err:
+            raise CannotConnectError(f"Client error: {err}") from err
+        except asyncio.TimeoutError as err:
+            raise CannotConnectError("WebSocket connect timed out") from err
+
+    async def async_fan_out(
+        self,
+        keys: Iterable[_K],
+        fetch: Callable[[_K], Awaitable[_V]],
+        *,
+        concurrency: int = DEFAULT_FAN_OUT_CONCURRENCY,
+        retries: int = 0,
+    ) -> FanOutResult[_K, _V]:
+        """Run ``fetch`` for every key with at most ``concurrency`` in flight.
+
+        Keys that fail with a ``CannotConnectError`` or ``ServerError`` are
+        reported in ``errors`` while the rest of the results are kept. Requests
+        made through this client already retry transient failures, so keys are
+        only retried here, with exponential backoff and while the circuit
+        breaker is closed, when ``retries`` is passed for a ``fetch`` that does
+        not. An ``InvalidAuthError`` cancels the remaining fetches and is
+        raised.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        outcome: FanOutResult[_K, _V] = FanOutResult()
+
+        async def _run(key: _K) -> None:
+            for attempt in range(retries + 1):
+                async with semaphore:
+                    try:
+                        outcome.results[key] = await fetch(key)
+                    except CannotConnectError as err:
+                        if attempt == retries or isinstance(err, CircuitOpenError):
+                            outcome.errors[key] = err
+                            return
+                    except ServerError as err:
+                        outcome.errors[key] = err
+                        return
+                    else:
+                        return
+                # Back off without the slot so other keys keep fetching.
+                await asyncio.sleep(FAN_OUT_RETRY_DELAY * 2**attempt)
+
+        try:
+            async with asyncio.TaskGroup() as group:
+                for key in keys:
+                    group.create_task(_run(key))
+        except* InvalidAuthError as errors:
+            raise errors.exceptions[0] from None
+        return outcome
 
     async def async_test_connection(self) -> bool:
         """Test the connection to the API.
@@ -98,9 +513,100 @@ class ApiClient:
         await self._request("GET", "/health")
         return True
 
-    async def async_get_data(self) -> dict[str, Any]:
-        """Fetch data from the API.
+    async def async_get_statistics(self) -> dict[str, Any]:
+        """Fetch server-wide photo, video and storage totals.
+
+        The response carries ``photos``, ``videos`` and ``usage`` in bytes,
+        plus a ``usageByUser`` breakdown. It needs an admin API key.
+        """
+        return await self._request("GET", "/api/server/statistics")
+
+    async def async_get_asset_statistics(self) -> dict[str, Any]:
+        """Fetch the ``images``, ``videos`` and ``total`` counts of the key's user.
+
+        Unlike ``async_get_statistics`` this works with any API key, but it
+        reports no storage usage.
+        """
+        return await self._request("GET", "/api/assets/statistics")
+
+    async def async_get_thumbnail(
+        self, asset_id: str, size: str = "thumbnail"
+    ) -> tuple[bytes, str]:
+        """Fetch the rendered thumbnail for an asset.
+
+        Returns the raw image bytes and the content type reported by Immich.
+        """
+
+        endpoint = f"/api/assets/{asset_id}/thumbnail"
+
+        async def _fetch() -> tuple[bytes, str]:
+            with self.metrics.track(endpoint_name("GET", endpoint)) as stats:
+                response = await self._async_send(
+                    "GET", endpoint, params={"size": size}
+                )
+                try:
+                    data = await response.read()
+                except aiohttp.ClientError as err:
+                    raise CannotConnectError(f"Client error: {err}") from err
+                except asyncio.TimeoutError as err:
+                    raise CannotConnectError("Request timed out") from err
+                stats.bytes += len(data)
+            return data, response.content_type
+
+        return await self._single_flight(("thumbnail", asset_id, size), _fetch)
+
+    async def async_get_my_user(self) -> dict[str, Any]:
+        """Fetch the user that owns the API key."""
+        return await self._request("GET", "/api/users/me")
+
+    async def async_get_albums(self) -> list[dict[str, Any]]:
+        """Fetch all albums visible to the user, without their assets."""
+        return await self._request("GET", "/api/albums")
+
+    def async_iter_album_assets(self, album_id: str) -> AsyncIterator[dict[str, Any]]:
+        """Stream the assets of one album."""
+        return self.async_iter_json(
+            JsonArrayStream(("assets",)), "GET", f"/api/albums/{album_id}"
+        )
+
+    def async_iter_full_sync(
+        self,
+        user_id: str,
+        updated_until: str,
+        limit: int,
+        last_id: str | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Stream one page of the user's assets, ordered by id.
+
+        Pass the id of the last asset of the previous page as ``last_id`` to
+        continue; an empty or short page means the listing is complete.
+        """
+        payload: dict[str, Any] = {
+            "userId": user_id,
+            "updatedUntil": updated_until,
+            "limit": limit,
+        }
+        if last_id is not None:
+            payload["lastId"] = last_id
+        return self.async_iter_json(
+            JsonArrayStream(),
+            "POST",
+            "/api/sync/full-sync",
+            idempotent=True,
+            json=payload,
+        )
+
+    async def async_delta_sync(
+        self, user_id: str, updated_after: str
+    ) -> dict[str, Any]:
+        """Fetch assets upserted or deleted since a watermark.
 
-        TODO: Replace /api/data with the actual data endpoint.
+        The response carries ``upserted`` assets, ``deleted`` asset ids and a
+        ``needsFullSync`` flag for when the server can no longer answer a delta.
         """
-        return await self._request("GET", "/api/data")
+        return await self._request(
+            "POST",
+            "/api/sync/delta-sync",
+            idempotent=True,
+            json={"updatedAfter": updated_after, "userIds": [user_id]},
+        )
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+from typing import Any
+
 from homeassistant.components.binary_sensor import (
     BinarySensorDeviceClass,
     BinarySensorEntity,
@@ -12,6 +14,7 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from . import ImmichBrowserConfigEntry
+from .breaker import BreakerState
 from .const import DOMAIN
 from .coordinator import TemplateCoordinator
 
@@ -29,7 +32,11 @@ async def async_setup_entry(
 
 
 class TemplateStatusSensor(CoordinatorEntity[TemplateCoordinator], BinarySensorEntity):
-    """Binary sensor indicating service connectivity."""
+    """Binary sensor indicating service connectivity.
+
+    The client's circuit breaker state is exposed as attributes, so an open
+    breaker shows the server as unreachable without waiting on timeouts.
+    """
 
     _attr_has_entity_name = True
     _attr_device_class = BinarySensorDeviceClass.CONNECTIVITY
@@ -53,4 +60,16 @@ class TemplateStatusSensor(CoordinatorEntity[TemplateCoordinator], BinarySensorE
     @property
     def is_on(self) -> bool:
         """Return True if the service is reachable."""
-        return self.coordinator.last_update_success
+        return (
+            self.coordinator.last_update_success
+            and self.coordinator.client.breaker.state is not BreakerState.OPEN
+        )
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the circuit breaker state."""
+        breaker = self.coordinator.client.breaker
+        return {
+            "circuit_breaker": breaker.state,
+            "consecutive_failures": breaker.failures,
+        }
@@ -0,0 +1,92 @@
+"""Circuit breaker guarding requests to the Immich server."""
+
+from __future__ import annotations
+
+import time
+from enum import StrEnum
+
+from .const import (
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_MAX_RESET_TIMEOUT,
+    BREAKER_RESET_TIMEOUT,
+)
+
+
+class BreakerState(StrEnum):
+    """State of a circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Short-circuit requests while the server is unhealthy.
+
+    ``failure_threshold`` consecutive failures open the breaker. Once
+    ``reset_timeout`` has passed a single half-open probe is let through: its
+    success closes the breaker again, its failure reopens it for twice as long,
+    up to ``max_reset_timeout``.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_TIMEOUT,
+        max_reset_timeout: float = BREAKER_MAX_RESET_TIMEOUT,
+    ) -> None:
+        """Initialize the breaker."""
+        self._failure_threshold = failure_threshold
+        self._base_reset_timeout = reset_timeout
+        self._max_reset_timeout = max_reset_timeout
+        self._reset_timeout = reset_timeout
+        self._opened_at = 0.0
+        self._probing = False
+        self._probe_started = 0.0
+        self.state = BreakerState.CLOSED
+        self.failures = 0
+
+    @property
+    def retry_in(self) -> float:
+        """Return the seconds until an open breaker lets a probe through."""
+        if self.state is not BreakerState.OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self._reset_timeout - time.monotonic())
+
+    def allow_request(self) -> bool:
+        """Return True if a request may be sent now."""
+        if self.state is BreakerState.OPEN:
+            if self.retry_in > 0:
+                return False
+            self.state = BreakerState.HALF_OPEN
+            self._probing = False
+        if self.state is BreakerState.HALF_OPEN:
+            now = time.monotonic()
+            # A probe that never reported back (e.g. cancelled) is replaced.
+            if self._probing and now - self._probe_started < self._reset_timeout:
+                return False
+            self._probing = True
+            self._probe_started = now
+        return True
+
+    def record_success(self) -> None:
+        """Record a request the server answered."""
+        self.state = BreakerState.CLOSED
+        self.failures = 0
+        self._probing = False
+        self._reset_timeout = self._base_reset_timeout
+
+    def record_failure(self) -> None:
+        """Record a request that failed because the server is unhealthy."""
+        self.failures += 1
+        if self.state is BreakerState.HALF_OPEN:
+            self._reset_timeout = min(self._reset_timeout * 2, self._max_reset_timeout)
+            self._open()
+        elif self.failures >= self._failure_threshold:
+            self._open()
+
+    def _open(self) -> None:
+        """Open the breaker from now."""
+        self.state = BreakerState.OPEN
+        self._opened_at = time.monotonic()
+        self._probing = False
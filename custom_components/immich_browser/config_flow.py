@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import Mapping
 from typing import Any
 
 import voluptuous as vol
@@ -13,7 +14,7 @@ from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
 from .api import ApiClient, CannotConnectError as ApiCannotConnect, InvalidAuthError as ApiInvalidAuth
-from .const import CONF_USE_SSL, DEFAULT_PORT, DOMAIN
+from .const import CONF_PUSH_UPDATES, CONF_USE_SSL, DEFAULT_PORT, DOMAIN
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -24,6 +25,7 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
         vol.Required(CONF_PORT, default=DEFAULT_PORT): int,
         vol.Optional(CONF_USE_SSL, default=False): bool,
         vol.Optional(CONF_API_KEY, default=""): str,
+        vol.Optional(CONF_PUSH_UPDATES, default=False): bool,
     }
 )
 
@@ -107,6 +109,39 @@ class TemplateConfigFlow(ConfigFlow, domain=DOMAIN):
             errors=errors,
         )
 
+    async def async_step_reauth(
+        self, entry_data: Mapping[str, Any]
+    ) -> ConfigFlowResult:
+        """Handle an API key that Immich no longer accepts."""
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Ask for a new API key and reload the entry with it."""
+        errors: dict[str, str] = {}
+        entry = self._get_reauth_entry()
+
+        if user_input is not None:
+            merged = {**entry.data, **user_input}
+            try:
+                await _async_validate_connection(self.hass, merged)
+            except CannotConnect:
+                errors["base"] = "cannot_connect"
+            except InvalidAuth:
+                errors["base"] = "invalid_auth"
+            except Exception:
+                _LOGGER.exception("Unexpected exception")
+                errors["base"] = "unknown"
+            else:
+                return self.async_update_reload_and_abort(entry, data=merged)
+
+        return self.async_show_form(
+            step_id="reauth_confirm",
+            data_schema=vol.Schema({vol.Required(CONF_API_KEY): str}),
+            errors=errors,
+        )
+
 
 
 class OptionsFlowHandler(OptionsFlow):
@@ -158,6 +193,10 @@ class OptionsFlowHandler(OptionsFlow):
                         CONF_API_KEY,
                         default=self.config_entry.data.get(CONF_API_KEY, ""),
                     ): str,
+                    vol.Optional(
+                        CONF_PUSH_UPDATES,
+                        default=self.config_entry.data.get(CONF_PUSH_UPDATES, False),
+                    ): bool,
                 }
             ),
             errors=errors,
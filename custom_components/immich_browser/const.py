@@ -5,8 +5,57 @@ DOMAIN = "immich_browser"
 DEFAULT_PORT = 8080
 DEFAULT_SCAN_INTERVAL = 30
 DEFAULT_SECONDARY_SCAN_INTERVAL = 300
+MIN_SCAN_INTERVAL = 10
+MAX_SCAN_INTERVAL = 600
+MIN_SECONDARY_SCAN_INTERVAL = 60
+MAX_SECONDARY_SCAN_INTERVAL = 1800
+SCAN_INTERVAL_BACKOFF = 2.0
+SCAN_INTERVAL_JITTER = 0.1
 DEFAULT_TIMEOUT = 30
+REQUEST_RETRIES = 2
+REQUEST_RETRY_BACKOFF = 0.5
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_TIMEOUT = 30
+BREAKER_MAX_RESET_TIMEOUT = 600
+DEFAULT_CONNECTION_LIMIT_PER_HOST = 8
+DEFAULT_KEEPALIVE_TIMEOUT = 60
+DEFAULT_DNS_CACHE_TTL = 300
+DEFAULT_RESPONSE_CACHE_TTL = 3600
+DEFAULT_RESPONSE_CACHE_SIZE = 16 * 1024 * 1024
+DEFAULT_SYNC_PAGE_SIZE = 5000
+DEFAULT_FAN_OUT_CONCURRENCY = 6
+FAN_OUT_RETRY_DELAY = 0.5
+STREAM_CHUNK_SIZE = 64 * 1024
+# JSON bodies and index rebuilds past these sizes are handled in the executor.
+JSON_OFFLOAD_BYTES = 256 * 1024
+INDEX_OFFLOAD_MIN_ASSETS = 5000
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+DEFAULT_PREFETCH_AHEAD = 50
+PREFETCH_WORKERS = 2
+PREFETCH_MAX_PENDING = 200
+DEFAULT_THUMBNAIL_CACHE_SIZE = 256 * 1024 * 1024
+DEFAULT_THUMBNAIL_MAX_AGE = 7 * 24 * 3600
+PUSH_RECONNECT_MIN = 1
+PUSH_RECONNECT_MAX = 300
+# Receive timeout until the server announces pingInterval + pingTimeout.
+PUSH_RECEIVE_TIMEOUT = 45
+SNAPSHOT_SAVE_DELAY = 30
+# Rolling window behind the derived throughput sensors.
+STATS_RATE_WINDOW = 24 * 3600
+MAX_METRIC_ENDPOINTS = 64
 
 CONF_USE_SSL = "use_ssl"
+CONF_PUSH_UPDATES = "push_updates"
 
 FRONTEND_SCRIPT_URL = f"/{DOMAIN}/{DOMAIN}-card.js"
+THUMBNAIL_URL = f"/api/{DOMAIN}/thumbnail/{{asset_id}}"
+THUMBNAIL_BUNDLE_URL = f"/api/{DOMAIN}/thumbnails"
+MAX_BUNDLE_ASSETS = 100
+# Edge lengths of the card's thumbnail buckets, re-encoded from Immich's
+# renditions; "thumbnail" has a short edge of IMMICH_THUMBNAIL_EDGE pixels.
+THUMBNAIL_BUCKETS = (128, 256, 512)
+IMMICH_THUMBNAIL_EDGE = 250
+THUMBNAIL_SIZES = ("thumbnail", "preview", *map(str, THUMBNAIL_BUCKETS))
+THUMBNAIL_WEBP_QUALITY = 75
+RESIZE_CONCURRENCY = 2
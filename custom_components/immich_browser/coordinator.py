@@ -7,23 +7,42 @@ from datetime import timedelta
 from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_API_KEY, CONF_HOST, CONF_PORT
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.exceptions import ConfigEntryAuthFailed
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
-from .api import ApiClient, CannotConnectError
-from .const import CONF_USE_SSL, DEFAULT_SCAN_INTERVAL, DOMAIN
+from .api import ApiClient, CannotConnectError, InvalidAuthError, ServerError
+from .const import (
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+    MAX_SCAN_INTERVAL,
+    MIN_SCAN_INTERVAL,
+)
+from .scheduler import AdaptiveInterval
+from .snapshot import LibrarySnapshot
+from .sync import LibrarySync, SyncDelta
 
 _LOGGER = logging.getLogger(__name__)
 
 
 class TemplateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
-    """Coordinator to manage data fetching from the service."""
+    """Coordinator that keeps the album/asset index in sync with Immich.
+
+    ``data`` holds the compact summary from ``LibrarySync.summary``; the full
+    index lives on ``library`` and ``last_delta`` describes the latest poll.
+    The update interval adapts to how often polls find changes. With a
+    ``snapshot`` the index is saved to HA storage whenever a poll changes it.
+    """
 
     config_entry: ConfigEntry
 
-    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        client: ApiClient,
+        snapshot: LibrarySnapshot | None = None,
+    ) -> None:
         """Initialize the coordinator."""
         super().__init__(
             hass,
@@ -32,18 +51,44 @@ class TemplateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
             update_interval=timedelta(seconds=DEFAULT_SCAN_INTERVAL),
         )
         self.config_entry = entry
-        session = async_get_clientsession(hass)
-        self.client = ApiClient(
-            host=entry.data[CONF_HOST],
-            port=entry.data[CONF_PORT],
-            api_key=entry.data.get(CONF_API_KEY, ""),
-            session=session,
-            use_ssl=entry.data.get(CONF_USE_SSL, False),
+        self.client = client
+        self.library = LibrarySync(self.client, executor=hass.async_add_executor_job)
+        self.last_delta: SyncDelta | None = None
+        self._delta_payload: dict[str, Any] | None = None
+        self.interval = AdaptiveInterval(
+            DEFAULT_SCAN_INTERVAL, MIN_SCAN_INTERVAL, MAX_SCAN_INTERVAL
         )
+        self.snapshot = snapshot
+        if snapshot is not None:
+            snapshot.register("library", self.library.as_snapshot)
+
+    async def async_restore(self, data: dict[str, Any]) -> None:
+        """Serve an index saved by a previous run until the next sync."""
+        await self.library.async_restore(data)
+        self.async_set_updated_data(self.library.summary())
+
+    def delta_payload(self) -> dict[str, Any] | None:
+        """Return the latest non-empty delta serialized for subscribers.
+
+        The payload is built once per update and shared by every subscriber.
+        """
+        if self.last_delta is None or self.last_delta.is_empty:
+            return None
+        if self._delta_payload is None:
+            self._delta_payload = self.library.delta_payload(self.last_delta)
+        return self._delta_payload
 
     async def _async_update_data(self) -> dict[str, Any]:
-        """Fetch data from the service."""
+        """Fetch changes since the last poll and merge them into the index."""
+        self.last_delta = self._delta_payload = None
         try:
-            return await self.client.async_get_data()
-        except CannotConnectError as err:
+            self.last_delta = await self.library.async_sync()
+        except InvalidAuthError as err:
+            raise ConfigEntryAuthFailed(f"Authentication failed: {err}") from err
+        except (CannotConnectError, ServerError) as err:
             raise UpdateFailed(f"Error communicating with API: {err}") from err
+        changed = not self.last_delta.is_empty
+        if changed and self.snapshot is not None:
+            self.snapshot.async_schedule_save()
+        self.update_interval = self.interval.record(changed)
+        return self.library.summary()
@@ -7,23 +7,47 @@ from datetime import timedelta
 from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_API_KEY, CONF_HOST, CONF_PORT
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
-from .api import ApiClient, CannotConnectError
-from .const import DEFAULT_SECONDARY_SCAN_INTERVAL, DOMAIN
+from .api import ApiClient, CannotConnectError, InvalidAuthError, ServerError
+from .const import (
+    DEFAULT_SECONDARY_SCAN_INTERVAL,
+    DOMAIN,
+    MAX_SECONDARY_SCAN_INTERVAL,
+    MIN_SECONDARY_SCAN_INTERVAL,
+    STATS_RATE_WINDOW,
+)
+from .rates import RateWindow
+from .scheduler import AdaptiveInterval
+from .snapshot import LibrarySnapshot
 
 _LOGGER = logging.getLogger(__name__)
 
+# Server totals kept from /api/server/statistics; usageByUser is dropped.
+STATISTICS_KEYS = ("photos", "videos", "usage")
+
 
 class TemplateSecondaryCoordinator(DataUpdateCoordinator[dict[str, Any]]):
-    """Secondary coordinator for slower-changing data."""
+    """Secondary coordinator for server statistics.
+
+    Each poll makes one ``/api/server/statistics`` call. Alongside the totals
+    it publishes ``assets_per_hour`` and ``storage_growth_per_day``, the net
+    rates over the last ``STATS_RATE_WINDOW`` seconds of polls. Server
+    statistics need an admin key; for other keys it falls back to the user's
+    own asset counts, with ``usage`` left as None.
+    """
 
     config_entry: ConfigEntry
 
-    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        client: ApiClient,
+        snapshot: LibrarySnapshot | None = None,
+    ) -> None:
         """Initialize the secondary coordinator."""
         super().__init__(
             hass,
@@ -32,17 +56,81 @@ class TemplateSecondaryCoordinator(DataUpdateCoordinator[dict[str, Any]]):
             update_interval=timedelta(seconds=DEFAULT_SECONDARY_SCAN_INTERVAL),
         )
         self.config_entry = entry
-        session = async_get_clientsession(hass)
-        self.client = ApiClient(
-            host=entry.data[CONF_HOST],
-            port=entry.data[CONF_PORT],
-            api_key=entry.data[CONF_API_KEY],
-            session=session,
+        self.client = client
+        self.interval = AdaptiveInterval(
+            DEFAULT_SECONDARY_SCAN_INTERVAL,
+            MIN_SECONDARY_SCAN_INTERVAL,
+            MAX_SECONDARY_SCAN_INTERVAL,
         )
+        self.asset_rate = RateWindow(STATS_RATE_WINDOW)
+        self.storage_rate = RateWindow(STATS_RATE_WINDOW)
+        self.sampled_at: float | None = None
+        self._server_statistics = True
+        self.snapshot = snapshot
+        if snapshot is not None:
+            snapshot.register("secondary", self._as_snapshot)
+
+    def _as_snapshot(self) -> dict[str, Any] | None:
+        """Return the data to save, with the time its totals were sampled."""
+        if self.data is None:
+            return None
+        return {**self.data, "sampled_at": self.sampled_at}
+
+    @callback
+    def async_restore(self, data: dict[str, Any]) -> None:
+        """Serve data saved by a previous run until the next poll.
+
+        The saved totals also seed the rate windows, so the derived rates are
+        available from the first poll after a restart.
+        """
+        data = dict(data)
+        if (sampled_at := data.pop("sampled_at", None)) is not None:
+            self._record(sampled_at, data)
+        self.async_set_updated_data(data)
+
+    def _record(self, sampled_at: float, totals: dict[str, Any]) -> None:
+        """Add one set of totals to the rate windows."""
+        self.sampled_at = sampled_at
+        self.asset_rate.add(sampled_at, totals["photos"] + totals["videos"])
+        if totals["usage"] is not None:
+            self.storage_rate.add(sampled_at, totals["usage"])
+
+    async def _async_fetch_totals(self) -> dict[str, Any]:
+        """Return server totals, or the user's own counts without admin rights."""
+        if self._server_statistics:
+            try:
+                statistics = await self.client.async_get_statistics()
+            except InvalidAuthError:
+                _LOGGER.info(
+                    "API key cannot read server statistics, "
+                    "reporting the key owner's assets instead"
+                )
+                self._server_statistics = False
+            else:
+                return {key: statistics.get(key, 0) for key in STATISTICS_KEYS}
+        statistics = await self.client.async_get_asset_statistics()
+        return {
+            "photos": statistics.get("images", 0),
+            "videos": statistics.get("videos", 0),
+            "usage": None,
+        }
 
     async def _async_update_data(self) -> dict[str, Any]:
-        """Fetch data from the service."""
+        """Fetch the statistics and update the derived rates."""
         try:
-            return await self.client.async_get_data()
-        except CannotConnectError as err:
+            totals = await self._async_fetch_totals()
+        except (CannotConnectError, InvalidAuthError, ServerError) as err:
             raise UpdateFailed(f"Secondary coordinator error: {err}") from err
+        sampled_at = dt_util.utcnow().timestamp()
+        self._record(sampled_at, totals)
+        data = {
+            **totals,
+            "assets_per_hour": self.asset_rate.rate(3600),
+            "storage_growth_per_day": self.storage_rate.rate(86400),
+        }
+        previous = self.data or {}
+        changed = any(previous.get(key) != totals[key] for key in STATISTICS_KEYS)
+        if changed and self.snapshot is not None:
+            self.snapshot.async_schedule_save()
+        self.update_interval = self.interval.record(changed)
+        return data
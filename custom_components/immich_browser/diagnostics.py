@@ -0,0 +1,51 @@
+"""Diagnostics support for Immich Browser."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.const import CONF_API_KEY
+from homeassistant.core import HomeAssistant
+
+from . import ImmichBrowserConfigEntry
+from .thumbnails import DATA_THUMBNAIL_CACHE
+
+TO_REDACT = {CONF_API_KEY}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ImmichBrowserConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry.
+
+    Latency, byte and cache counters cover the time since the entry was
+    loaded; the thumbnail cache is shared by every entry.
+    """
+    runtime = entry.runtime_data
+    client = runtime.client
+    library = runtime.coordinator.library
+    diagnostics: dict[str, Any] = {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "circuit_breaker": {
+            "state": client.breaker.state,
+            "consecutive_failures": client.breaker.failures,
+            "retry_in": round(client.breaker.retry_in, 1),
+        },
+        "library": {
+            "assets": len(library.assets),
+            "albums": len(library.albums),
+            "watermark": library.watermark,
+        },
+        "api": client.metrics.as_dict(),
+        "websocket": runtime.metrics.as_dict(),
+    }
+    if (cache := hass.data.get(DATA_THUMBNAIL_CACHE)) is not None:
+        diagnostics["thumbnail_cache"] = {
+            "entries": len(cache),
+            "bytes": cache.total_bytes,
+            "hits": cache.hits,
+            "misses": cache.misses,
+            "resize": cache.metrics.as_dict(),
+        }
+    return diagnostics
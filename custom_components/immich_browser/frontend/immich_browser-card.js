@@ -13,6 +13,189 @@ const css = LitElement.prototype.css;
 
 const CARD_VERSION = "0.1.0";
 
+const THUMBNAIL_URL = "/api/immich_browser/thumbnail";
+const THUMBNAIL_BUNDLE_URL = "/api/immich_browser/thumbnails";
+const MAX_BUNDLE_ASSETS = 100;
+const PLACEHOLDER_CACHE_SIZE = 1000;
+const DEFAULT_PAGE_SIZE = 100;
+const MIN_CELL_SIZE = 96;
+const GRID_GAP = 4;
+const OVERSCAN_ROWS = 2;
+// Loaded pages kept on each side of the ones in view; the rest are dropped
+// and fetched again from their cursor when scrolled back to.
+const RETAINED_PAGES = 2;
+// Config keys that select what the grid pages through.
+const ALBUM_CONFIG_KEYS = ["album_id", "entry_id", "page_size"];
+const MAX_THUMBNAILS = 300;
+// Edge lengths the integration re-encodes thumbnails to, smallest first.
+const THUMBNAIL_BUCKETS = [128, 256, 512];
+
+/**
+ * ThumbHash decoding (https://evanw.github.io/thumbhash/, MIT).
+ *
+ * Immich stores a base64 ThumbHash per asset; decoding it locally gives a
+ * blurred placeholder for each grid cell without any HTTP request.
+ */
+function thumbHashToApproximateAspectRatio(hash) {
+  const header = hash[3];
+  const hasAlpha = hash[2] & 0x80;
+  const isLandscape = hash[4] & 0x80;
+  const lx = isLandscape ? (hasAlpha ? 5 : 7) : header & 7;
+  const ly = isLandscape ? header & 7 : hasAlpha ? 5 : 7;
+  return lx / ly;
+}
+
+function thumbHashToRGBA(hash) {
+  const { PI, min, max, cos, round } = Math;
+  const header24 = hash[0] | (hash[1] << 8) | (hash[2] << 16);
+  const header16 = hash[3] | (hash[4] << 8);
+  const lDc = (header24 & 63) / 63;
+  const pDc = ((header24 >> 6) & 63) / 31.5 - 1;
+  const qDc = ((header24 >> 12) & 63) / 31.5 - 1;
+  const lScale = ((header24 >> 18) & 31) / 31;
+  const hasAlpha = header24 >> 23;
+  const pScale = ((header16 >> 3) & 63) / 63;
+  const qScale = ((header16 >> 9) & 63) / 63;
+  const isLandscape = header16 >> 15;
+  const lx = max(3, isLandscape ? (hasAlpha ? 5 : 7) : header16 & 7);
+  const ly = max(3, isLandscape ? header16 & 7 : hasAlpha ? 5 : 7);
+  const aDc = hasAlpha ? (hash[5] & 15) / 15 : 1;
+  const aScale = (hash[5] >> 4) / 15;
+
+  // Read the AC factors, boosting saturation to make up for quantization.
+  const acStart = hasAlpha ? 6 : 5;
+  let acIndex = 0;
+  const decodeChannel = (nx, ny, scale) => {
+    const ac = [];
+    for (let cy = 0; cy < ny; cy++) {
+      for (let cx = cy ? 0 : 1; cx * ny < nx * (ny - cy); cx++) {
+        const nibble =
+          (hash[acStart + (acIndex >> 1)] >> ((acIndex & 1) << 2)) & 15;
+        acIndex++;
+        ac.push((nibble / 7.5 - 1) * scale);
+      }
+    }
+    return ac;
+  };
+  const lAc = decodeChannel(lx, ly, lScale);
+  const pAc = decodeChannel(3, 3, pScale * 1.25);
+  const qAc = decodeChannel(3, 3, qScale * 1.25);
+  const aAc = hasAlpha && decodeChannel(5, 5, aScale);
+
+  const ratio = thumbHashToApproximateAspectRatio(hash);
+  const w = round(ratio > 1 ? 32 : 32 * ratio);
+  const h = round(ratio > 1 ? 32 / ratio : 32);
+  const rgba = new Uint8ClampedArray(w * h * 4);
+  const fx = [];
+  const fy = [];
+  for (let y = 0, i = 0; y < h; y++) {
+    for (let x = 0; x < w; x++, i += 4) {
+      let l = lDc;
+      let p = pDc;
+      let q = qDc;
+      let a = aDc;
+
+      for (let cx = 0, n = max(lx, hasAlpha ? 5 : 3); cx < n; cx++) {
+        fx[cx] = cos((PI / w) * (x + 0.5) * cx);
+      }
+      for (let cy = 0, n = max(ly, hasAlpha ? 5 : 3); cy < n; cy++) {
+        fy[cy] = cos((PI / h) * (y + 0.5) * cy);
+      }
+
+      for (let cy = 0, j = 0; cy < ly; cy++) {
+        const fy2 = fy[cy] * 2;
+        for (let cx = cy ? 0 : 1; cx * ly < lx * (ly - cy); cx++, j++) {
+          l += lAc[j] * fx[cx] * fy2;
+        }
+      }
+      for (let cy = 0, j = 0; cy < 3; cy++) {
+        const fy2 = fy[cy] * 2;
+        for (let cx = cy ? 0 : 1; cx < 3 - cy; cx++, j++) {
+          const f = fx[cx] * fy2;
+          p += pAc[j] * f;
+          q += qAc[j] * f;
+        }
+      }
+      if (hasAlpha) {
+        for (let cy = 0, j = 0; cy < 5; cy++) {
+          const fy2 = fy[cy] * 2;
+          for (let cx = cy ? 0 : 1; cx < 5 - cy; cx++, j++) {
+            a += aAc[j] * fx[cx] * fy2;
+          }
+        }
+      }
+
+      const b = l - (2 / 3) * p;
+      const r = (3 * l - b + q) / 2;
+      const g = r - q;
+      rgba[i] = max(0, 255 * min(1, r));
+      rgba[i + 1] = max(0, 255 * min(1, g));
+      rgba[i + 2] = max(0, 255 * min(1, b));
+      rgba[i + 3] = max(0, 255 * min(1, a));
+    }
+  }
+  return { w, h, rgba };
+}
+
+const placeholderCache = new Map();
+
+/**
+ * Unpack a thumbnail bundle while it streams in. Each item is a big-endian
+ * header (uint16 asset id length, uint16 content type length, uint32 image
+ * length) followed by the asset id, the content type and the image bytes.
+ */
+async function* readBundle(stream) {
+  const reader = stream.getReader();
+  const decoder = new TextDecoder();
+  let buffer = new Uint8Array(0);
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) return;
+    const joined = new Uint8Array(buffer.length + value.length);
+    joined.set(buffer);
+    joined.set(value, buffer.length);
+    buffer = joined;
+    let offset = 0;
+    while (buffer.length - offset >= 8) {
+      const header = new DataView(buffer.buffer, buffer.byteOffset + offset, 8);
+      const idLength = header.getUint16(0);
+      const typeLength = header.getUint16(2);
+      let position = offset + 8;
+      const end = position + idLength + typeLength + header.getUint32(4);
+      if (buffer.length < end) break;
+      const assetId = decoder.decode(buffer.subarray(position, (position += idLength)));
+      const type = decoder.decode(buffer.subarray(position, (position += typeLength)));
+      yield { assetId, blob: new Blob([buffer.slice(position, end)], { type }) };
+      offset = end;
+    }
+    buffer = buffer.subarray(offset);
+  }
+}
+
+/** Return a data URL for a base64 ThumbHash, or null if there is none. */
+function thumbhashPlaceholder(thumbhash) {
+  if (!thumbhash) return null;
+  const cached = placeholderCache.get(thumbhash);
+  if (cached) return cached;
+  let url;
+  try {
+    const hash = Uint8Array.from(atob(thumbhash), (c) => c.charCodeAt(0));
+    const { w, h, rgba } = thumbHashToRGBA(hash);
+    const canvas = document.createElement("canvas");
+    canvas.width = w;
+    canvas.height = h;
+    canvas.getContext("2d").putImageData(new ImageData(rgba, w, h), 0, 0);
+    url = canvas.toDataURL();
+  } catch (err) {
+    return null;
+  }
+  if (placeholderCache.size >= PLACEHOLDER_CACHE_SIZE) {
+    placeholderCache.delete(placeholderCache.keys().next().value);
+  }
+  placeholderCache.set(thumbhash, url);
+  return url;
+}
+
 console.info(
   `%c IMMICH-BROWSER-CARD %c v${CARD_VERSION} `,
   "color: orange; font-weight: bold; background: black",
@@ -24,9 +207,21 @@ class ImmichBrowserCard extends LitElement {
     return {
       hass: { type: Object },
       config: { type: Object },
+      _pages: { state: true },
+      _error: { state: true },
     };
   }
 
+  constructor() {
+    super();
+    this._resetAlbum();
+    this._columns = 1;
+    this._cellSize = MIN_CELL_SIZE;
+    this._viewportHeight = 0;
+    this._scrollFrame = null;
+    this._resizeObserver = new ResizeObserver(() => this._measure());
+  }
+
   static getConfigElement() {
     return document.createElement("immich-browser-card-editor");
   }
@@ -50,12 +245,322 @@ class ImmichBrowserCard extends LitElement {
     if (!config) {
       throw new Error("Invalid configuration");
     }
+    const previous = this.config;
+    if (previous && ALBUM_CONFIG_KEYS.some((key) => previous[key] !== config[key])) {
+      this._cancelPrefetch();
+      this._resetAlbum();
+    }
     this.config = {
       header: "Immich Browser",
       ...config,
     };
   }
 
+  updated() {
+    if (!this.hass || !this.config?.album_id) return;
+    const scroller = this.shadowRoot.querySelector(".scroller");
+    if (scroller && scroller !== this._scroller) {
+      this._resizeObserver.disconnect();
+      this._resizeObserver.observe(scroller);
+      this._scroller = scroller;
+      this._measure();
+    }
+    if (this._pages === undefined) {
+      this._pageSize = this.config.page_size || DEFAULT_PAGE_SIZE;
+      this._loadPage(0);
+      return;
+    }
+    this._loadVisible();
+  }
+
+  disconnectedCallback() {
+    super.disconnectedCallback();
+    this._resizeObserver.disconnect();
+    this._scroller = undefined;
+    if (this._scrollFrame !== null) {
+      cancelAnimationFrame(this._scrollFrame);
+      this._scrollFrame = null;
+    }
+    this._cancelPrefetch();
+    this._resetAlbum();
+  }
+
+  /** Tell the integration to stop warming thumbnails for this album. */
+  _cancelPrefetch() {
+    if (!this.hass || !this.config?.album_id || this._pages === undefined) return;
+    this.hass
+      .callWS({
+        type: "immich_browser/cancel_prefetch",
+        album_id: this.config.album_id,
+      })
+      .catch(() => {});
+  }
+
+  _resetAlbum() {
+    for (const url of this._thumbnails?.values() || []) {
+      URL.revokeObjectURL(url);
+    }
+    this._thumbnails = new Map();
+    this._pendingThumbnails = new Set();
+    // Bumped on every reset so pages requested before it are ignored.
+    this._generation = (this._generation || 0) + 1;
+    this._pages = undefined;
+    this._pageCursors = [null];
+    this._pageSize = DEFAULT_PAGE_SIZE;
+    this._loadingPages = new Set();
+    this._total = 0;
+    this._error = undefined;
+    this._scrollTop = 0;
+    this._window = { first: 0, last: 0 };
+  }
+
+  _measure() {
+    const scroller = this._scroller;
+    if (!scroller) return;
+    const width = scroller.clientWidth;
+    this._columns = Math.max(
+      1,
+      Math.floor((width + GRID_GAP) / (MIN_CELL_SIZE + GRID_GAP))
+    );
+    this._cellSize = (width - GRID_GAP * (this._columns - 1)) / this._columns;
+    this._viewportHeight = scroller.clientHeight;
+    this._updateWindow(true);
+  }
+
+  _onScroll(ev) {
+    this._scrollTop = ev.target.scrollTop;
+    if (this._scrollFrame !== null) return;
+    this._scrollFrame = requestAnimationFrame(() => {
+      this._scrollFrame = null;
+      this._updateWindow(false);
+    });
+  }
+
+  /** Recompute the rendered row range; re-render only when it changes. */
+  _updateWindow(force) {
+    const rowHeight = this._cellSize + GRID_GAP;
+    const rows = Math.ceil(this._total / this._columns);
+    const first = Math.max(
+      0,
+      Math.floor(this._scrollTop / rowHeight) - OVERSCAN_ROWS
+    );
+    const last = Math.min(
+      rows,
+      Math.ceil((this._scrollTop + this._viewportHeight) / rowHeight) +
+        OVERSCAN_ROWS
+    );
+    if (force || first !== this._window.first || last !== this._window.last) {
+      this._window = { first, last };
+      this.requestUpdate();
+    }
+  }
+
+  /** Fetch page ``index``; its cursor comes from the page before it. */
+  async _loadPage(index) {
+    if (this._loadingPages.has(index)) return;
+    const generation = this._generation;
+    const loadingPages = this._loadingPages;
+    loadingPages.add(index);
+    try {
+      const page = await this.hass.callWS({
+        type: "immich_browser/album_assets",
+        ...(this.config.entry_id ? { entry_id: this.config.entry_id } : {}),
+        album_id: this.config.album_id,
+        cursor: this._pageCursors[index],
+        page_size: this._pageSize,
+        thumbnail_size: this._thumbnailSize(),
+      });
+      if (generation !== this._generation) return;
+      const pages = this._pages || new Map();
+      pages.set(index, page.assets);
+      this._pages = pages;
+      this._pageCursors[index + 1] = page.next_cursor;
+      this._total = page.total;
+      this._error = undefined;
+      this._updateWindow(true);
+    } catch (err) {
+      if (generation !== this._generation) return;
+      this._pages = this._pages || new Map();
+      this._error = err.message || String(err);
+    } finally {
+      loadingPages.delete(index);
+    }
+  }
+
+  _assetAt(index) {
+    const page = this._pages.get(Math.floor(index / this._pageSize));
+    return page?.[index % this._pageSize];
+  }
+
+  /** Smallest thumbnail bucket that covers a cell at the screen's density. */
+  _thumbnailSize() {
+    const pixels = this._cellSize * (window.devicePixelRatio || 1);
+    const bucket = THUMBNAIL_BUCKETS.find((edge) => edge >= pixels);
+    return bucket ? String(bucket) : "preview";
+  }
+
+  /**
+   * Fetch the pages and thumbnails of the rendered cells, plus the next page
+   * when near it, and drop pages far outside the window.
+   */
+  _loadVisible() {
+    const start = this._window.first * this._columns;
+    const end = Math.min(this._window.last * this._columns, this._total);
+    const firstPage = Math.floor(start / this._pageSize);
+    const lastPage = Math.floor(
+      (end + this._columns * OVERSCAN_ROWS) / this._pageSize
+    );
+    for (let index = firstPage; index <= lastPage && !this._error; index++) {
+      // Pages not yet reached get their cursor once the page before them
+      // arrives; a null cursor past page 0 means the album ended.
+      const cursor = this._pageCursors[index];
+      if (this._pages.has(index) || cursor === undefined) continue;
+      if (index === 0 || cursor !== null) this._loadPage(index);
+    }
+    for (const index of this._pages.keys()) {
+      if (
+        index < firstPage - RETAINED_PAGES ||
+        index > lastPage + RETAINED_PAGES
+      ) {
+        this._pages.delete(index);
+      }
+    }
+    const visible = new Set();
+    const wanted = [];
+    for (let i = start; i < end; i++) {
+      const assetId = this._assetAt(i)?.id;
+      if (assetId === undefined) continue;
+      visible.add(assetId);
+      if (!this._thumbnails.has(assetId) && !this._pendingThumbnails.has(assetId)) {
+        wanted.push(assetId);
+      }
+    }
+    for (let i = 0; i < wanted.length; i += MAX_BUNDLE_ASSETS) {
+      this._loadBundle(wanted.slice(i, i + MAX_BUNDLE_ASSETS));
+    }
+    this._evictThumbnails(visible);
+  }
+
+  /**
+   * Fetch many thumbnails in one request and show each as it arrives.
+   * Any the bundle left out are retried one by one.
+   */
+  async _loadBundle(assetIds) {
+    for (const assetId of assetIds) this._pendingThumbnails.add(assetId);
+    const remaining = new Set(assetIds);
+    try {
+      const response = await this.hass.fetchWithAuth(THUMBNAIL_BUNDLE_URL, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({
+          asset_ids: assetIds,
+          size: this._thumbnailSize(),
+          ...(this.config.entry_id ? { entry_id: this.config.entry_id } : {}),
+        }),
+      });
+      if (response.ok) {
+        for await (const { assetId, blob } of readBundle(response.body)) {
+          if (!remaining.delete(assetId)) continue;
+          this._pendingThumbnails.delete(assetId);
+          this._thumbnails.set(assetId, URL.createObjectURL(blob));
+          this.requestUpdate();
+        }
+      }
+    } catch (err) {
+      // Fall through to single requests for whatever did not arrive.
+    }
+    for (const assetId of remaining) {
+      this._pendingThumbnails.delete(assetId);
+      this._loadThumbnail(assetId);
+    }
+  }
+
+  async _loadThumbnail(assetId) {
+    if (this._thumbnails.has(assetId) || this._pendingThumbnails.has(assetId)) {
+      return;
+    }
+    this._pendingThumbnails.add(assetId);
+    try {
+      const query = new URLSearchParams({ size: this._thumbnailSize() });
+      if (this.config.entry_id) query.set("entry_id", this.config.entry_id);
+      const response = await this.hass.fetchWithAuth(
+        `${THUMBNAIL_URL}/${assetId}?${query}`
+      );
+      if (!response.ok) return;
+      const url = URL.createObjectURL(await response.blob());
+      this._thumbnails.set(assetId, url);
+      this.requestUpdate();
+    } catch (err) {
+      // Leave the ThumbHash placeholder in place.
+    } finally {
+      this._pendingThumbnails.delete(assetId);
+    }
+  }
+
+  /** Release the oldest off-screen object URLs beyond MAX_THUMBNAILS. */
+  _evictThumbnails(visible) {
+    for (const [assetId, url] of this._thumbnails) {
+      if (this._thumbnails.size <= MAX_THUMBNAILS) break;
+      if (visible.has(assetId)) continue;
+      URL.revokeObjectURL(url);
+      this._thumbnails.delete(assetId);
+    }
+  }
+
+  _renderCell(asset) {
+    if (!asset) {
+      return html`<div class="cell"></div>`;
+    }
+    const thumbnail = this._thumbnails.get(asset.id);
+    const placeholder = thumbhashPlaceholder(asset.thumbhash);
+    return html`
+      <div
+        class="cell"
+        style="${placeholder ? `background-image: url(${placeholder})` : ""}"
+      >
+        ${thumbnail ? html`<img src="${thumbnail}" alt="" />` : ""}
+      </div>
+    `;
+  }
+
+  _renderAlbum() {
+    if (this._error) {
+      return html`<ha-alert alert-type="error">${this._error}</ha-alert>`;
+    }
+    if (this._pages === undefined) {
+      return html`<div class="loading"><ha-spinner size="small"></ha-spinner></div>`;
+    }
+    // Only the rows in view plus the overscan are rendered. The cells are
+    // rendered positionally, so Lit reuses the same DOM nodes as the window
+    // moves and only rewrites their image sources.
+    const rowHeight = this._cellSize + GRID_GAP;
+    const rows = Math.ceil(this._total / this._columns);
+    const start = this._window.first * this._columns;
+    const end = Math.min(this._window.last * this._columns, this._total);
+    const cells = [];
+    for (let i = start; i < end; i++) {
+      cells.push(this._renderCell(this._assetAt(i)));
+    }
+    return html`
+      <div
+        class="scroller"
+        style="${this.config.grid_height ? `height: ${this.config.grid_height}` : ""}"
+        @scroll="${this._onScroll}"
+      >
+        <div class="spacer" style="height: ${Math.max(0, rows * rowHeight - GRID_GAP)}px">
+          <div
+            class="window"
+            style="transform: translateY(${this._window.first * rowHeight}px);
+              grid-template-columns: repeat(${this._columns}, 1fr);
+              grid-auto-rows: ${this._cellSize}px"
+          >
+            ${cells}
+          </div>
+        </div>
+      </div>
+    `;
+  }
+
   getCardSize() {
     return 3;
   }
@@ -80,6 +585,14 @@ class ImmichBrowserCard extends LitElement {
       `;
     }
 
+    if (this.config.album_id) {
+      return html`
+        <ha-card header="${this.config.header || ""}">
+          <div class="card-content">${this._renderAlbum()}</div>
+        </ha-card>
+      `;
+    }
+
     const entityId = this.config.entity;
 
     if (!entityId) {
@@ -147,6 +660,36 @@ class ImmichBrowserCard extends LitElement {
         font-weight: bold;
         color: var(--primary-color);
       }
+      .scroller {
+        height: 400px;
+        overflow-y: auto;
+        contain: strict;
+      }
+      .spacer {
+        position: relative;
+      }
+      .window {
+        position: absolute;
+        top: 0;
+        left: 0;
+        right: 0;
+        display: grid;
+        gap: 4px;
+        will-change: transform;
+      }
+      .cell {
+        overflow: hidden;
+        border-radius: 4px;
+        background-color: var(--secondary-background-color);
+        background-size: cover;
+        background-position: center;
+      }
+      .cell img {
+        width: 100%;
+        height: 100%;
+        object-fit: cover;
+        display: block;
+      }
       .empty {
         color: var(--secondary-text-color);
         font-style: italic;
@@ -191,6 +734,11 @@ class ImmichBrowserCardEditor extends LitElement {
           @value-changed="${this._entityChanged}"
           allow-custom-entity
         ></ha-entity-picker>
+        <ha-textfield
+          label="Album ID"
+          .value="${this.config.album_id || ""}"
+          @input="${this._albumChanged}"
+        ></ha-textfield>
       </div>
     `;
   }
@@ -203,6 +751,10 @@ class ImmichBrowserCardEditor extends LitElement {
     this._updateConfig("entity", ev.detail.value);
   }
 
+  _albumChanged(ev) {
+    this._updateConfig("album_id", ev.target.value);
+  }
+
   _updateConfig(key, value) {
     if (!this.config) return;
     const newConfig = { ...this.config, [key]: value };
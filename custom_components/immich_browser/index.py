@@ -0,0 +1,129 @@
+"""In-memory asset indexes for the Immich Browser integration."""
+
+from __future__ import annotations
+
+import heapq
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Iterable, Iterator
+from itertools import islice
+from typing import TypeVar
+
+_T = TypeVar("_T", bound=str)
+
+CURSOR_SEPARATOR = "|"
+
+# Longest run sorted in one call when building a timeline; see AssetTimeline.
+SORT_RUN_LENGTH = 8192
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(*position: str) -> str:
+    """Encode the position after an asset as an opaque cursor.
+
+    A position is ``(sort_key, asset_id)``, optionally followed by the source
+    that breaks ties between merged timelines.
+    """
+    return CURSOR_SEPARATOR.join(position)
+
+
+def decode_cursor(cursor: str, parts: int = 2) -> tuple[str, ...]:
+    """Decode a cursor of ``parts`` fields produced by ``encode_cursor``."""
+    position = tuple(cursor.split(CURSOR_SEPARATOR))
+    if len(position) != parts or not all(position[1:]):
+        raise InvalidCursorError(f"Invalid cursor: {cursor!r}")
+    return position
+
+
+def merge_newest_first(
+    streams: Iterable[Iterable[tuple[str, str, _T]]], limit: int
+) -> tuple[list[tuple[str, str, _T]], str | None]:
+    """Merge newest-first streams into one page with a k-way merge.
+
+    Each stream yields ``(sort_key, asset_id, source)`` newest first. Only
+    ``limit + 1`` items are pulled in total, so a page costs O(limit log k)
+    for k streams regardless of how long they are. The next cursor includes
+    the source, so equal positions in different streams are not skipped.
+    """
+    merged = list(islice(heapq.merge(*streams, reverse=True), limit + 1))
+    if len(merged) <= limit:
+        return merged, None
+    del merged[limit:]
+    return merged, encode_cursor(*merged[-1])
+
+
+class AssetTimeline:
+    """Asset ids ordered newest first, paged with keyset cursors.
+
+    Entries are ``(sort_key, asset_id)`` tuples kept in ascending order, so a
+    cursor is located with a binary search and a page is a slice read from the
+    end. Cursors stay valid while assets are added or removed around them.
+    """
+
+    __slots__ = ("_entries",)
+
+    def __init__(self, entries: Iterable[tuple[str, str]] = ()) -> None:
+        """Initialize the timeline.
+
+        Long inputs are sorted in runs that are then merged. A single sort
+        holds the GIL until it finishes, which would stall the event loop even
+        while a large index is built in the executor; the merge lets threads
+        switch between elements.
+        """
+        items = list(entries)
+        if len(items) > SORT_RUN_LENGTH:
+            runs = [
+                sorted(items[start : start + SORT_RUN_LENGTH])
+                for start in range(0, len(items), SORT_RUN_LENGTH)
+            ]
+            items = list(heapq.merge(*runs))
+        else:
+            items.sort()
+        self._entries: list[tuple[str, str]] = items
+
+    def __len__(self) -> int:
+        """Return the number of assets on the timeline."""
+        return len(self._entries)
+
+    def add(self, sort_key: str, asset_id: str) -> None:
+        """Insert an asset at its position."""
+        insort(self._entries, (sort_key, asset_id))
+
+    def discard(self, sort_key: str, asset_id: str) -> None:
+        """Remove an asset if present."""
+        index = bisect_left(self._entries, (sort_key, asset_id))
+        if index < len(self._entries) and self._entries[index] == (sort_key, asset_id):
+            del self._entries[index]
+
+    def asset_ids(self) -> list[str]:
+        """Return all asset ids, newest first."""
+        return [asset_id for _, asset_id in reversed(self._entries)]
+
+    def iter_from(
+        self, start: tuple[str, ...] | None = None
+    ) -> Iterator[tuple[str, str]]:
+        """Lazily yield entries newest first, from ``start`` inclusive.
+
+        Locating ``start`` is a binary search; each further entry is O(1),
+        so a consumer that stops after a page pays only for that page.
+        """
+        entries = self._entries
+        index = len(entries) if start is None else bisect_right(entries, start)
+        for position in range(index - 1, -1, -1):
+            yield entries[position]
+
+    def page(
+        self, cursor: str | None, limit: int
+    ) -> tuple[list[tuple[str, str]], str | None]:
+        """Return up to ``limit`` entries after ``cursor`` and the next cursor."""
+        if cursor is None:
+            end = len(self._entries)
+        else:
+            end = bisect_left(self._entries, decode_cursor(cursor))
+        start = max(0, end - limit)
+        entries = self._entries[start:end]
+        entries.reverse()
+        next_cursor = encode_cursor(*entries[-1]) if start > 0 and entries else None
+        return entries, next_cursor
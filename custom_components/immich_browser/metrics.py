@@ -0,0 +1,184 @@
+"""Latency and traffic metrics for the Immich Browser hot paths."""
+
+from __future__ import annotations
+
+import re
+import time
+from bisect import bisect_left
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+from .const import MAX_METRIC_ENDPOINTS
+
+# Upper bounds of the latency buckets in milliseconds; the last bucket is open.
+LATENCY_BUCKETS_MS: tuple[float, ...] = (
+    1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000,
+)  # fmt: skip
+
+OTHER_ENDPOINT = "other"
+
+_ID_SEGMENT_RE = re.compile(
+    r"/[0-9a-fA-F]{8}(?:-[0-9a-fA-F]{4}){3}-[0-9a-fA-F]{12}(?=/|$)"
+)
+
+
+def endpoint_name(method: str, endpoint: str) -> str:
+    """Return the metrics name of a request, with ids collapsed to ``{id}``."""
+    return f"{method} {_ID_SEGMENT_RE.sub('/{id}', endpoint)}"
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with interpolated percentiles.
+
+    Memory and ``observe`` cost stay constant no matter how many samples are
+    recorded, so it can sit on every request.
+    """
+
+    __slots__ = ("buckets", "count", "max_ms", "total_ms")
+
+    def __init__(self) -> None:
+        """Initialize an empty histogram."""
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Record one duration."""
+        ms = seconds * 1000
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def merge(self, other: LatencyHistogram) -> None:
+        """Add another histogram's samples to this one."""
+        for index, count in enumerate(other.buckets):
+            self.buckets[index] += count
+        self.count += other.count
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def percentile(self, percent: float) -> float | None:
+        """Return the estimated percentile in milliseconds, or None if empty.
+
+        The estimate interpolates linearly inside the bucket the rank falls
+        in, and never exceeds the largest observed value.
+        """
+        if not self.count:
+            return None
+        rank = self.count * percent / 100
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            if count and seen + count >= rank:
+                lower = LATENCY_BUCKETS_MS[index - 1] if index else 0.0
+                upper = (
+                    LATENCY_BUCKETS_MS[index]
+                    if index < len(LATENCY_BUCKETS_MS)
+                    else self.max_ms
+                )
+                upper = min(upper, self.max_ms)
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.max_ms
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the count, mean and p50/p95/p99 in milliseconds."""
+
+        def _round(value: float | None) -> float | None:
+            return None if value is None else round(value, 2)
+
+        return {
+            "count": self.count,
+            "mean_ms": _round(self.total_ms / self.count if self.count else None),
+            "p50_ms": _round(self.percentile(50)),
+            "p95_ms": _round(self.percentile(95)),
+            "p99_ms": _round(self.percentile(99)),
+            "max_ms": _round(self.max_ms if self.count else None),
+        }
+
+
+@dataclass(slots=True)
+class EndpointStats:
+    """Counters of one API endpoint or WebSocket command.
+
+    ``latency`` covers the whole call, ``json`` only the time spent decoding
+    or encoding its JSON, and ``bytes`` the size of the body received (API)
+    or sent (WebSocket).
+    """
+
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    json: LatencyHistogram = field(default_factory=LatencyHistogram)
+    requests: int = 0
+    errors: int = 0
+    bytes: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    in_flight: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters as a JSON-serializable dict."""
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "bytes": self.bytes,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "latency": self.latency.as_dict(),
+            "json": self.json.as_dict(),
+        }
+
+
+class MetricsRegistry:
+    """Per-endpoint stats, collected since the registry was created.
+
+    At most ``max_endpoints`` names are tracked; anything past that is
+    folded into ``other`` so unexpected paths cannot grow it without bound.
+    """
+
+    def __init__(self, max_endpoints: int = MAX_METRIC_ENDPOINTS) -> None:
+        """Initialize the registry."""
+        self._max_endpoints = max_endpoints
+        self._endpoints: dict[str, EndpointStats] = {}
+
+    def endpoint(self, name: str) -> EndpointStats:
+        """Return the stats of an endpoint, creating them on first use."""
+        stats = self._endpoints.get(name)
+        if stats is None:
+            if len(self._endpoints) >= self._max_endpoints:
+                name = OTHER_ENDPOINT
+            stats = self._endpoints.setdefault(name, EndpointStats())
+        return stats
+
+    @contextmanager
+    def track(self, name: str) -> Iterator[EndpointStats]:
+        """Time a call and count it as in flight until it finishes.
+
+        The call counts as an error if it raises.
+        """
+        stats = self.endpoint(name)
+        stats.requests += 1
+        stats.in_flight += 1
+        started = time.perf_counter()
+        try:
+            yield stats
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            stats.in_flight -= 1
+            stats.latency.observe(time.perf_counter() - started)
+
+    def summary(self) -> LatencyHistogram:
+        """Return the latency of every endpoint combined."""
+        combined = LatencyHistogram()
+        for stats in self._endpoints.values():
+            combined.merge(stats.latency)
+        return combined
+
+    def as_dict(self) -> dict[str, dict[str, Any]]:
+        """Return the stats of every endpoint."""
+        return {name: stats.as_dict() for name, stats in sorted(self._endpoints.items())}
@@ -0,0 +1,118 @@
+"""Compact in-memory records for the Immich Browser library index."""
+
+from __future__ import annotations
+
+import sys
+from typing import Any
+
+_intern = sys.intern
+
+
+class AssetRecord:
+    """The fields of an Immich asset that the integration actually uses.
+
+    Built once at ingest time from the API response, which is then dropped.
+    Ids and album ids are interned so the strings shared between the index,
+    the album timelines and the membership tuples are stored only once.
+    """
+
+    __slots__ = (
+        "albums",
+        "checksum",
+        "created_at",
+        "id",
+        "thumbhash",
+        "type",
+        "updated_at",
+    )
+
+    def __init__(
+        self,
+        asset_id: str,
+        asset_type: str,
+        created_at: str,
+        updated_at: str | None,
+        thumbhash: str | None,
+        albums: tuple[str, ...] = (),
+        checksum: str | None = None,
+    ) -> None:
+        """Initialize the record."""
+        self.id = asset_id
+        self.type = asset_type
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.thumbhash = thumbhash
+        self.albums = albums
+        self.checksum = checksum
+
+    @classmethod
+    def from_api(
+        cls, asset: dict[str, Any], albums: tuple[str, ...] = ()
+    ) -> AssetRecord:
+        """Build a record from an Immich asset response."""
+        return cls(
+            _intern(asset["id"]),
+            _intern(asset.get("type") or "OTHER"),
+            asset.get("fileCreatedAt") or "",
+            asset.get("updatedAt"),
+            asset.get("thumbhash"),
+            albums,
+            asset.get("checksum"),
+        )
+
+    @classmethod
+    def from_row(cls, row: list[Any]) -> AssetRecord:
+        """Build a record from a snapshot row written by ``as_row``.
+
+        Rows saved before checksums were kept have five fields.
+        """
+        asset_id, asset_type, created_at, updated_at, thumbhash, *rest = row
+        return cls(
+            _intern(asset_id),
+            _intern(asset_type),
+            created_at,
+            updated_at,
+            thumbhash,
+            checksum=rest[0] if rest else None,
+        )
+
+    def add_album(self, album_id: str) -> None:
+        """Record membership of an album."""
+        if album_id not in self.albums:
+            self.albums = (*self.albums, _intern(album_id))
+
+    def remove_album(self, album_id: str) -> None:
+        """Forget membership of an album."""
+        if album_id in self.albums:
+            self.albums = tuple(album for album in self.albums if album != album_id)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the record as sent over the WebSocket API.
+
+        The base64 ``thumbhash`` lets the card paint a placeholder before the
+        thumbnail itself arrives.
+        """
+        return {
+            "id": self.id,
+            "type": self.type,
+            "fileCreatedAt": self.created_at,
+            "thumbhash": self.thumbhash,
+        }
+
+    def as_row(self) -> list[Any]:
+        """Return the record as a compact snapshot row.
+
+        Album membership is not stored; it is rebuilt from the album timelines.
+        """
+        return [
+            self.id,
+            self.type,
+            self.created_at,
+            self.updated_at,
+            self.thumbhash,
+            self.checksum,
+        ]
+
+    def __repr__(self) -> str:
+        """Return a debug representation."""
+        return f"AssetRecord({self.id!r}, {self.type!r}, {self.created_at!r})"
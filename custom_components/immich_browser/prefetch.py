@@ -0,0 +1,130 @@
+"""Background thumbnail prefetching for the Immich Browser card."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from collections.abc import Hashable, Iterable
+from dataclasses import dataclass
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util.hass_dict import HassKey
+
+from .api import ApiClient, CannotConnectError, InvalidAuthError, ServerError
+from .breaker import BreakerState
+from .const import DOMAIN, PREFETCH_MAX_PENDING, PREFETCH_WORKERS
+from .models import AssetRecord
+from .thumbnails import ThumbnailCache, thumbnail_key
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_PREFETCHER: HassKey[ThumbnailPrefetcher] = HassKey(f"{DOMAIN}_prefetcher")
+
+
+@dataclass(slots=True)
+class _Batch:
+    """Thumbnails still to be prefetched for one client."""
+
+    client: ApiClient
+    size: str
+    records: deque[AssetRecord]
+
+
+class ThumbnailPrefetcher:
+    """Warm the thumbnail cache for the assets a client is about to scroll to.
+
+    Each owner (a card, keyed by WebSocket connection and album) has at most
+    one pending batch, and scheduling a new one replaces it, so only the
+    latest scroll position is prefetched. ``workers`` fetches run at a time,
+    taking owners round-robin, and the backlog is capped at ``max_pending``
+    by dropping the oldest batches. Nothing is fetched while the client's
+    circuit breaker is not closed, so prefetch never competes with recovery
+    probes.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        cache: ThumbnailCache,
+        workers: int = PREFETCH_WORKERS,
+        max_pending: int = PREFETCH_MAX_PENDING,
+    ) -> None:
+        """Initialize the prefetcher."""
+        self._hass = hass
+        self._cache = cache
+        self._max_workers = workers
+        self._max_pending = max_pending
+        self._pending: OrderedDict[Hashable, _Batch] = OrderedDict()
+        self._workers: set[asyncio.Task[None]] = set()
+
+    @property
+    def pending(self) -> int:
+        """Return the number of thumbnails waiting to be prefetched."""
+        return sum(len(batch.records) for batch in self._pending.values())
+
+    @callback
+    def async_schedule(
+        self,
+        owner: Hashable,
+        client: ApiClient,
+        records: Iterable[AssetRecord],
+        size: str,
+    ) -> None:
+        """Replace the owner's pending batch with uncached thumbnails."""
+        self._pending.pop(owner, None)
+        batch = deque(
+            record
+            for record in records
+            if thumbnail_key(record.id, size, record.checksum) not in self._cache
+        )
+        if not batch:
+            return
+        self._pending[owner] = _Batch(client, size, batch)
+        self._trim()
+        while len(self._workers) < min(self._max_workers, self.pending):
+            task = self._hass.async_create_background_task(
+                self._async_work(), f"{DOMAIN}_thumbnail_prefetch"
+            )
+            self._workers.add(task)
+            task.add_done_callback(self._workers.discard)
+
+    @callback
+    def async_cancel(self, owner: Hashable) -> None:
+        """Drop the owner's pending batch; fetches in flight still finish."""
+        self._pending.pop(owner, None)
+
+    def _trim(self) -> None:
+        """Drop the furthest-ahead assets of the oldest batches over budget."""
+        excess = self.pending - self._max_pending
+        while excess > 0:
+            owner, batch = next(iter(self._pending.items()))
+            batch.records.pop()
+            excess -= 1
+            if not batch.records:
+                del self._pending[owner]
+
+    async def _async_work(self) -> None:
+        """Fetch pending thumbnails until the backlog is empty."""
+        while self._pending:
+            owner, batch = next(iter(self._pending.items()))
+            record = batch.records.popleft()
+            if batch.records:
+                self._pending.move_to_end(owner)
+            else:
+                del self._pending[owner]
+            if batch.client.breaker.state is not BreakerState.CLOSED:
+                continue
+            if thumbnail_key(record.id, batch.size, record.checksum) in self._cache:
+                continue
+            try:
+                await self._cache.async_fetch(
+                    batch.client, record.id, batch.size, record.checksum
+                )
+            except (
+                CannotConnectError,
+                InvalidAuthError,
+                ServerError,
+                OSError,
+            ) as err:
+                _LOGGER.debug("Prefetch of %s failed: %s", record.id, err)
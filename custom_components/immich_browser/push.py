@@ -0,0 +1,145 @@
+"""Push listener for Immich's socket.io event stream."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections.abc import Callable
+from typing import Any
+
+import aiohttp
+
+from .api import ApiClient, CannotConnectError, InvalidAuthError
+from .const import PUSH_RECEIVE_TIMEOUT, PUSH_RECONNECT_MAX, PUSH_RECONNECT_MIN
+
+_LOGGER = logging.getLogger(__name__)
+
+EVENT_PATH = "/api/socket.io/"
+
+# Events that change the asset or album index.
+LIBRARY_EVENTS = frozenset(
+    {
+        "on_upload_success",
+        "on_asset_update",
+        "on_asset_delete",
+        "on_asset_trash",
+        "on_asset_restore",
+        "on_asset_hidden",
+        "on_asset_stack_update",
+    }
+)
+
+# Engine.IO v4 packet types, and the Socket.IO packet types carried in them.
+_EIO_OPEN = "0"
+_EIO_CLOSE = "1"
+_EIO_PING = "2"
+_EIO_PONG = "3"
+_EIO_MESSAGE = "4"
+_SIO_CONNECT = "0"
+_SIO_DISCONNECT = "1"
+_SIO_EVENT = "2"
+_SIO_CONNECT_ERROR = "4"
+
+_WS_CLOSED = frozenset(
+    {aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSING, aiohttp.WSMsgType.CLOSED}
+)
+
+
+class ImmichEventListener:
+    """Consume Immich's socket.io event stream, reconnecting with backoff.
+
+    Only the Engine.IO v4 WebSocket transport is spoken, which is all Immich
+    needs: the handshake, ping/pong and event packets on the default
+    namespace. Every event is handed to ``on_event`` as ``(name, payload)``.
+    A connection that stays silent for longer than the server's
+    ``pingInterval + pingTimeout`` is treated as dead and reconnected.
+    """
+
+    def __init__(
+        self, client: ApiClient, on_event: Callable[[str, Any], None]
+    ) -> None:
+        """Initialize the listener."""
+        self._client = client
+        self._on_event = on_event
+        self.connected = False
+        self._receive_timeout: float = PUSH_RECEIVE_TIMEOUT
+
+    async def async_run(self) -> None:
+        """Listen until cancelled."""
+        delay = PUSH_RECONNECT_MIN
+        while True:
+            try:
+                await self.async_listen()
+            except InvalidAuthError as err:
+                _LOGGER.warning("Immich event stream rejected the API key: %s", err)
+                delay = PUSH_RECONNECT_MAX
+            except CannotConnectError as err:
+                _LOGGER.debug("Immich event stream unavailable: %s", err)
+            except (aiohttp.ClientError, OSError, RuntimeError, ValueError) as err:
+                _LOGGER.warning("Immich event stream failed, reconnecting: %r", err)
+            if self.connected:
+                delay = PUSH_RECONNECT_MIN
+            self.connected = False
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, PUSH_RECONNECT_MAX)
+
+    async def async_listen(self) -> None:
+        """Consume one connection until the server closes it."""
+        websocket = await self._client.async_ws_connect(
+            EVENT_PATH, params={"EIO": "4", "transport": "websocket"}
+        )
+        self._receive_timeout = PUSH_RECEIVE_TIMEOUT
+        async with websocket:
+            while True:
+                try:
+                    message = await websocket.receive(self._receive_timeout)
+                except asyncio.TimeoutError as err:
+                    raise CannotConnectError(
+                        f"No ping from event stream in {self._receive_timeout:.0f}s"
+                    ) from err
+                if message.type in _WS_CLOSED:
+                    return
+                if message.type is aiohttp.WSMsgType.ERROR:
+                    raise CannotConnectError(f"Event stream error: {message.data}")
+                if message.type is not aiohttp.WSMsgType.TEXT:
+                    continue
+                if not await self._async_handle_packet(websocket, message.data):
+                    return
+
+    async def _async_handle_packet(
+        self, websocket: aiohttp.ClientWebSocketResponse, packet: str
+    ) -> bool:
+        """Handle one Engine.IO packet; return False when the stream ends."""
+        kind, body = packet[:1], packet[1:]
+        if kind == _EIO_OPEN:
+            handshake = json.loads(body)
+            if "pingInterval" in handshake and "pingTimeout" in handshake:
+                self._receive_timeout = (
+                    handshake["pingInterval"] + handshake["pingTimeout"]
+                ) / 1000
+            await websocket.send_str(_EIO_MESSAGE + _SIO_CONNECT)
+        elif kind == _EIO_PING:
+            await websocket.send_str(_EIO_PONG + body)
+        elif kind == _EIO_CLOSE:
+            return False
+        elif kind == _EIO_MESSAGE:
+            return self._handle_message(body)
+        return True
+
+    def _handle_message(self, message: str) -> bool:
+        """Handle one Socket.IO packet; return False when disconnected."""
+        kind, body = message[:1], message[1:]
+        if kind == _SIO_CONNECT:
+            self.connected = True
+            _LOGGER.debug("Connected to Immich event stream")
+        elif kind == _SIO_CONNECT_ERROR:
+            raise InvalidAuthError(f"Event stream connection refused: {body}")
+        elif kind == _SIO_DISCONNECT:
+            return False
+        elif kind == _SIO_EVENT:
+            # Skip an optional acknowledgement id before the JSON array.
+            data = json.loads(body.lstrip("0123456789"))
+            if data:
+                self._on_event(data[0], data[1] if len(data) > 1 else None)
+        return True
@@ -0,0 +1,47 @@
+"""Rolling rates of change for the Immich Browser statistics sensors."""
+
+from __future__ import annotations
+
+from collections import deque
+
+
+class RateWindow:
+    """Rate of change of a counter over a rolling time window.
+
+    Samples older than ``window`` seconds are dropped as new ones arrive, and
+    the rate is taken between the oldest and newest sample that remain, so
+    each update costs O(1) amortized however long the window is. The rate is
+    net: a counter that shrinks yields a negative rate.
+    """
+
+    __slots__ = ("_samples", "_window")
+
+    def __init__(self, window: float) -> None:
+        """Initialize the window."""
+        self._window = window
+        self._samples: deque[tuple[float, float]] = deque()
+
+    def __len__(self) -> int:
+        """Return the number of samples in the window."""
+        return len(self._samples)
+
+    def add(self, timestamp: float, value: float) -> None:
+        """Record ``value`` observed at ``timestamp`` (seconds).
+
+        Samples at or before the newest one are ignored, so replaying a
+        restored sample is harmless.
+        """
+        samples = self._samples
+        if samples and timestamp <= samples[-1][0]:
+            return
+        samples.append((timestamp, value))
+        horizon = timestamp - self._window
+        while samples[0][0] < horizon:
+            samples.popleft()
+
+    def rate(self, per: float = 1.0) -> float | None:
+        """Return the change per ``per`` seconds, or None until two samples."""
+        if len(self._samples) < 2:
+            return None
+        (first_at, first), (last_at, last) = self._samples[0], self._samples[-1]
+        return (last - first) / (last_at - first_at) * per
@@ -0,0 +1,52 @@
+"""WebP re-encoding of Immich renditions into the card's thumbnail buckets."""
+
+from __future__ import annotations
+
+import io
+
+from PIL import Image
+
+from .const import IMMICH_THUMBNAIL_EDGE, THUMBNAIL_BUCKETS, THUMBNAIL_WEBP_QUALITY
+
+BUCKET_EDGES: dict[str, int] = {str(edge): edge for edge in THUMBNAIL_BUCKETS}
+
+
+class ResizeError(Exception):
+    """Raised when a rendition cannot be decoded or re-encoded."""
+
+
+def source_size(edge: int) -> str:
+    """Return the smallest Immich rendition that covers a bucket."""
+    return "thumbnail" if edge <= IMMICH_THUMBNAIL_EDGE else "preview"
+
+
+def resize_to_webp(
+    data: bytes, edge: int, quality: int = THUMBNAIL_WEBP_QUALITY
+) -> bytes:
+    """Scale an image so its short edge is ``edge`` pixels and encode it as WebP.
+
+    Grid cells are square and cropped to fill, so the short edge is the one
+    that has to cover the cell. Images are never scaled up. Runs in the
+    executor.
+    """
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            # Lets JPEG decode at a reduced scale that still covers the bucket.
+            image.draft("RGB", (edge, edge))
+            width, height = image.size
+            scale = edge / min(width, height)
+            if scale < 1:
+                resized = image.resize(
+                    (max(1, round(width * scale)), max(1, round(height * scale))),
+                    Image.Resampling.LANCZOS,
+                    reducing_gap=2.0,
+                )
+            else:
+                resized = image.copy()
+        if resized.mode not in ("RGB", "RGBA"):
+            resized = resized.convert("RGBA" if "A" in resized.getbands() else "RGB")
+        output = io.BytesIO()
+        resized.save(output, "WEBP", quality=quality, method=4)
+    except (OSError, ValueError, Image.DecompressionBombError) as err:
+        raise ResizeError(str(err)) from err
+    return output.getvalue()
@@ -0,0 +1,50 @@
+"""Adaptive polling intervals for the Immich Browser coordinators."""
+
+from __future__ import annotations
+
+import random
+from datetime import timedelta
+
+from .const import SCAN_INTERVAL_BACKOFF, SCAN_INTERVAL_JITTER
+
+
+class AdaptiveInterval:
+    """Poll interval that follows the observed change rate.
+
+    Every poll that finds no changes multiplies the interval by ``backoff`` up
+    to ``maximum``; a poll that finds changes drops straight to ``minimum`` so
+    bursts such as a large import are tracked closely. Each returned interval
+    is spread by ``jitter`` so several entries do not poll in lockstep.
+    """
+
+    def __init__(
+        self,
+        initial: float,
+        minimum: float,
+        maximum: float,
+        backoff: float = SCAN_INTERVAL_BACKOFF,
+        jitter: float = SCAN_INTERVAL_JITTER,
+    ) -> None:
+        """Initialize the interval."""
+        self._minimum = minimum
+        self._maximum = maximum
+        self._backoff = backoff
+        self._jitter = jitter
+        self._current = initial
+        self.idle_polls = 0
+
+    @property
+    def seconds(self) -> float:
+        """Return the current interval before jitter."""
+        return self._current
+
+    def record(self, changed: bool) -> timedelta:
+        """Record the outcome of a poll and return the next interval."""
+        if changed:
+            self.idle_polls = 0
+            self._current = self._minimum
+        else:
+            self.idle_polls += 1
+            self._current = min(self._maximum, self._current * self._backoff)
+        spread = self._current * self._jitter
+        return timedelta(seconds=self._current + random.uniform(-spread, spread))
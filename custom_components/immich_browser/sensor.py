@@ -2,51 +2,226 @@
 
 from __future__ import annotations
 
-from homeassistant.components.sensor import SensorEntity
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EntityCategory, UnitOfInformation, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.helpers.typing import StateType
+from homeassistant.helpers.update_coordinator import (
+    CoordinatorEntity,
+    DataUpdateCoordinator,
+)
 
 from . import ImmichBrowserConfigEntry
 from .const import DOMAIN
 from .coordinator import TemplateCoordinator
+from .metrics import MetricsRegistry
 
 PARALLEL_UPDATES = 0
 
 
+@dataclass(frozen=True, kw_only=True)
+class ImmichSensorEntityDescription(SensorEntityDescription):
+    """Describes an Immich Browser sensor fed by coordinator data."""
+
+    value_fn: Callable[[dict[str, Any]], StateType]
+
+
+def _rate(key: str, scale: float = 1.0) -> Callable[[dict[str, Any]], StateType]:
+    """Return a reader for a derived rate, rounded so jitter is not written."""
+
+    def _value(data: dict[str, Any]) -> StateType:
+        value = data.get(key)
+        return None if value is None else round(value * scale, 2)
+
+    return _value
+
+
+STATISTICS_SENSORS: tuple[ImmichSensorEntityDescription, ...] = (
+    ImmichSensorEntityDescription(
+        key="photos",
+        name="Photos",
+        icon="mdi:image-multiple",
+        native_unit_of_measurement="photos",
+        state_class=SensorStateClass.TOTAL,
+        value_fn=lambda data: data.get("photos"),
+    ),
+    ImmichSensorEntityDescription(
+        key="videos",
+        name="Videos",
+        icon="mdi:video-outline",
+        native_unit_of_measurement="videos",
+        state_class=SensorStateClass.TOTAL,
+        value_fn=lambda data: data.get("videos"),
+    ),
+    ImmichSensorEntityDescription(
+        key="storage",
+        name="Storage used",
+        icon="mdi:harddisk",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        suggested_unit_of_measurement=UnitOfInformation.GIGABYTES,
+        suggested_display_precision=2,
+        state_class=SensorStateClass.TOTAL,
+        value_fn=lambda data: data.get("usage"),
+    ),
+    ImmichSensorEntityDescription(
+        key="assets_per_hour",
+        name="Assets added per hour",
+        icon="mdi:image-plus",
+        native_unit_of_measurement="assets/h",
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        value_fn=_rate("assets_per_hour"),
+    ),
+    ImmichSensorEntityDescription(
+        key="storage_growth_per_day",
+        name="Storage growth per day",
+        icon="mdi:chart-line",
+        native_unit_of_measurement=f"{UnitOfInformation.MEGABYTES}/d",
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        value_fn=_rate("storage_growth_per_day", 1e-6),
+    ),
+)
+
+LIBRARY_SENSORS: tuple[ImmichSensorEntityDescription, ...] = (
+    ImmichSensorEntityDescription(
+        key="albums",
+        name="Albums",
+        icon="mdi:folder-multiple-image",
+        native_unit_of_measurement="albums",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda data: data.get("album_count"),
+    ),
+)
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ImmichBrowserConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up sensor entities."""
-    coordinator = entry.runtime_data.coordinator
+    runtime = entry.runtime_data
 
-    # TODO: Create sensor entities based on your data
-    entities: list[TemplateSensor] = [
-        TemplateSensor(coordinator, entry, "status"),
+    entities: list[SensorEntity] = [
+        *(
+            ImmichStatisticSensor(runtime.coordinator_secondary, entry, description)
+            for description in STATISTICS_SENSORS
+        ),
+        *(
+            ImmichStatisticSensor(runtime.coordinator, entry, description)
+            for description in LIBRARY_SENSORS
+        ),
+        LatencySensor(
+            runtime.coordinator,
+            entry,
+            "api_latency",
+            "API latency",
+            lambda: runtime.client.metrics,
+        ),
+        LatencySensor(
+            runtime.coordinator,
+            entry,
+            "websocket_latency",
+            "WebSocket latency",
+            lambda: runtime.metrics,
+        ),
     ]
     async_add_entities(entities)
 
 
-class TemplateSensor(CoordinatorEntity[TemplateCoordinator], SensorEntity):
-    """Representation of a Template sensor."""
+class ImmichStatisticSensor(
+    CoordinatorEntity[DataUpdateCoordinator[dict[str, Any]]], SensorEntity
+):
+    """Library statistic read from coordinator data.
+
+    State is only written when the value or availability changes; polls that
+    find the same totals leave the recorder alone.
+    """
+
+    _attr_has_entity_name = True
+    entity_description: ImmichSensorEntityDescription
+
+    def __init__(
+        self,
+        coordinator: DataUpdateCoordinator[dict[str, Any]],
+        entry: ConfigEntry,
+        description: ImmichSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            entry_type=DeviceEntryType.SERVICE,
+            name=entry.title,
+            manufacturer="Immich Browser",
+        )
+        self._attr_native_value = self._read_value()
+        self._written_available = self.available
+
+    def _read_value(self) -> StateType:
+        """Return the value in the coordinator's current data."""
+        if self.coordinator.data is None:
+            return None
+        return self.entity_description.value_fn(self.coordinator.data)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only if the value or availability changed."""
+        value = self._read_value()
+        available = self.available
+        if value == self._attr_native_value and available == self._written_available:
+            return
+        self._attr_native_value = value
+        self._written_available = available
+        self.async_write_ha_state()
+
+
+class LatencySensor(CoordinatorEntity[TemplateCoordinator], SensorEntity):
+    """p95 latency across a metrics registry, refreshed on every poll.
+
+    The ``endpoints`` attribute breaks it down into p50/p95/p99 per API
+    endpoint or WebSocket command. Disabled by default, and the attribute is
+    kept out of the recorder.
+    """
 
     _attr_has_entity_name = True
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_suggested_display_precision = 1
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _unrecorded_attributes = frozenset({"endpoints"})
 
     def __init__(
         self,
         coordinator: TemplateCoordinator,
         entry: ConfigEntry,
         sensor_type: str,
+        name: str,
+        get_metrics: Callable[[], MetricsRegistry],
     ) -> None:
         """Initialize the sensor."""
         super().__init__(coordinator)
-        self._sensor_type = sensor_type
+        self._get_metrics = get_metrics
         self._attr_unique_id = f"{entry.entry_id}_{sensor_type}"
-        self._attr_name = sensor_type.replace("_", " ").title()
+        self._attr_name = name
         self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, entry.entry_id)},
             entry_type=DeviceEntryType.SERVICE,
@@ -55,8 +230,21 @@ class TemplateSensor(CoordinatorEntity[TemplateCoordinator], SensorEntity):
         )
 
     @property
-    def native_value(self) -> str | None:
-        """Return the state of the sensor."""
-        if self.coordinator.data is None:
-            return None
-        return self.coordinator.data.get(self._sensor_type)
+    def native_value(self) -> float | None:
+        """Return the p95 latency of every call so far."""
+        return self._get_metrics().summary().percentile(95)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return per-endpoint percentiles and traffic."""
+        endpoints = {}
+        for name, stats in self._get_metrics().as_dict().items():
+            latency = stats["latency"]
+            endpoints[name] = {
+                "requests": stats["requests"],
+                "in_flight": stats["in_flight"],
+                "p50_ms": latency["p50_ms"],
+                "p95_ms": latency["p95_ms"],
+                "p99_ms": latency["p99_ms"],
+            }
+        return {"endpoints": endpoints}
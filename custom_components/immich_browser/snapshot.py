@@ -0,0 +1,83 @@
+"""Persistent snapshot of the Immich Browser library index."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+from collections.abc import Callable, Mapping
+from typing import Any
+
+from homeassistant.const import CONF_API_KEY, CONF_HOST, CONF_PORT
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import CONF_USE_SSL, DOMAIN, SNAPSHOT_SAVE_DELAY
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+
+def _storage_key(entry_id: str) -> str:
+    """Return the storage key for an entry's snapshot."""
+    return f"{DOMAIN}.{entry_id}"
+
+
+def snapshot_source(entry_data: Mapping[str, Any]) -> str:
+    """Return the server and API key a snapshot of an entry belongs to.
+
+    The key is stored as a digest only.
+    """
+    scheme = "https" if entry_data.get(CONF_USE_SSL) else "http"
+    api_key = entry_data.get(CONF_API_KEY, "")
+    digest = hashlib.sha256(api_key.encode()).hexdigest()[:16]
+    return f"{scheme}://{entry_data[CONF_HOST]}:{entry_data[CONF_PORT]}#{digest}"
+
+
+class LibrarySnapshot:
+    """Versioned HA storage snapshot of an entry's coordinator state.
+
+    Each coordinator registers a named section provider; saves are delayed
+    and coalesced by the store, and the providers are only called when the
+    write actually happens. Snapshots are tagged with ``source`` so one
+    saved for another server or API key is never restored.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, source: str) -> None:
+        """Initialize the snapshot."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, _storage_key(entry_id), private=True
+        )
+        self._source = source
+        self._sections: dict[str, Callable[[], Any]] = {}
+
+    @callback
+    def register(self, name: str, provider: Callable[[], Any]) -> None:
+        """Register the provider of one snapshot section."""
+        self._sections[name] = provider
+
+    async def async_load(self) -> dict[str, Any] | None:
+        """Load the last saved snapshot, if any was saved for this source."""
+        data = await self._store.async_load()
+        if data is not None and data.get("source") != self._source:
+            _LOGGER.debug("Discarding snapshot saved for another connection")
+            return None
+        return data
+
+    @callback
+    def async_schedule_save(self) -> None:
+        """Save the snapshot after a short delay."""
+        self._store.async_delay_save(self._data, SNAPSHOT_SAVE_DELAY)
+
+    def _data(self) -> dict[str, Any]:
+        """Collect every registered section."""
+        return {
+            "source": self._source,
+            **{name: provider() for name, provider in self._sections.items()},
+        }
+
+
+async def async_remove_snapshot(hass: HomeAssistant, entry_id: str) -> None:
+    """Delete the stored snapshot of a removed entry."""
+    store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, _storage_key(entry_id))
+    await store.async_remove()
@@ -0,0 +1,155 @@
+"""Incremental decoding of large JSON arrays in Immich responses."""
+
+from __future__ import annotations
+
+import codecs
+import json
+import re
+from typing import Any
+
+_STRUCTURAL_RE = re.compile(r'["{}\[\]:,]')
+_NESTED_RE = re.compile(r'["{}\[\]]')
+_STRING_TAIL_RE = re.compile(r'(?:[^"\\]|\\.)*"', re.S)
+_SCALAR_RE = re.compile(r"[^,\]\s]+")
+_SEPARATORS = " \t\r\n,"
+
+
+class JsonArrayStream:
+    """Decode the elements of one JSON array as the response arrives.
+
+    ``path`` names the array by the object keys leading to it, e.g.
+    ``("assets",)`` for an album or ``()`` for a top-level array. ``feed``
+    returns the elements completed by each chunk, so at most one element and
+    one chunk are buffered at a time. Everything outside the array is kept
+    and decoded by ``close`` into ``envelope``, with the array left empty.
+    """
+
+    def __init__(self, path: tuple[str, ...] = ()) -> None:
+        """Initialize the stream."""
+        self._path = path
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._envelope: list[str] = []
+        # One entry per open container: [bracket, key of the current member].
+        self._stack: list[list[str | None]] = []
+        self._last_string: str | None = None
+        self._in_target = False
+        self._target_seen = False
+        self.envelope: Any = None
+
+    def feed(self, data: bytes) -> list[Any]:
+        """Consume a chunk and return the array elements it completed."""
+        self._buffer += self._decoder.decode(data)
+        items: list[Any] = []
+        pos = 0
+        while True:
+            if self._in_target:
+                pos = self._consume_elements(pos, items)
+                if self._in_target:
+                    break
+            else:
+                pos, complete = self._consume_envelope(pos)
+                if not complete:
+                    break
+        self._buffer = self._buffer[pos:]
+        return items
+
+    def close(self) -> Any:
+        """Finish the stream and return the decoded envelope."""
+        self._buffer += self._decoder.decode(b"", final=True)
+        if self._in_target or self._stack or self._buffer.strip():
+            raise ValueError("Truncated JSON response")
+        self.envelope = json.loads("".join(self._envelope))
+        return self.envelope
+
+    def _current_path(self) -> tuple[str, ...] | None:
+        """Return the key path of the open containers, if all are objects."""
+        if any(bracket != "{" for bracket, _ in self._stack):
+            return None
+        return tuple(key for _, key in self._stack)  # type: ignore[misc]
+
+    def _consume_envelope(self, pos: int) -> tuple[int, bool]:
+        """Copy one token outside the target array.
+
+        Returns the new position and False once more data is needed.
+        """
+        match = _STRUCTURAL_RE.search(self._buffer, pos)
+        if match is None:
+            self._envelope.append(self._buffer[pos:])
+            return len(self._buffer), False
+        index = match.start()
+        char = match.group()
+        end = index + 1
+        if char == '"':
+            tail = _STRING_TAIL_RE.match(self._buffer, end)
+            if tail is None:
+                self._envelope.append(self._buffer[pos:index])
+                return index, False
+            end = tail.end()
+            self._last_string = json.loads(self._buffer[index:end])
+        elif char == "{":
+            self._stack.append(["{", None])
+        elif char == "[":
+            if not self._target_seen and self._current_path() == self._path:
+                self._in_target = self._target_seen = True
+            else:
+                self._stack.append(["[", None])
+        elif char == ":":
+            self._stack[-1][1] = self._last_string
+        elif char == ",":
+            if self._stack and self._stack[-1][0] == "{":
+                self._stack[-1][1] = None
+        else:
+            self._stack.pop()
+        self._envelope.append(self._buffer[pos:end])
+        return end, True
+
+    def _consume_elements(self, pos: int, items: list[Any]) -> int:
+        """Decode complete elements of the target array starting at pos."""
+        buffer = self._buffer
+        while True:
+            while pos < len(buffer) and buffer[pos] in _SEPARATORS:
+                pos += 1
+            if pos >= len(buffer):
+                return pos
+            if buffer[pos] == "]":
+                self._in_target = False
+                self._envelope.append("]")
+                return pos + 1
+            end = self._element_end(pos)
+            if end is None:
+                return pos
+            items.append(json.loads(buffer[pos:end]))
+            pos = end
+
+    def _element_end(self, start: int) -> int | None:
+        """Return the end index of the element at start, if it is complete."""
+        buffer = self._buffer
+        char = buffer[start]
+        if char == '"':
+            tail = _STRING_TAIL_RE.match(buffer, start + 1)
+            return tail.end() if tail else None
+        if char not in "{[":
+            scalar = _SCALAR_RE.match(buffer, start)
+            if scalar is None or scalar.end() >= len(buffer):
+                return None
+            return scalar.end()
+        depth = 0
+        pos = start
+        while True:
+            match = _NESTED_RE.search(buffer, pos)
+            if match is None:
+                return None
+            char = match.group()
+            pos = match.end()
+            if char == '"':
+                tail = _STRING_TAIL_RE.match(buffer, pos)
+                if tail is None:
+                    return None
+                pos = tail.end()
+            elif char in "{[":
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return pos
@@ -0,0 +1,474 @@
+"""Incremental album/asset sync engine for the Immich Browser integration."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, TypeVar
+
+from homeassistant.util import dt as dt_util
+
+from .api import ApiClient, ExecutorJob
+from .const import DEFAULT_SYNC_PAGE_SIZE, INDEX_OFFLOAD_MIN_ASSETS
+from .index import AssetTimeline
+from .models import AssetRecord
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+ALBUM_FIELDS = (
+    "id",
+    "albumName",
+    "albumThumbnailAssetId",
+    "assetCount",
+    "startDate",
+    "endDate",
+    "updatedAt",
+    "shared",
+)
+
+
+def _format_timestamp(value: datetime) -> str:
+    """Format a datetime the way Immich serializes ``updatedAt``."""
+    return value.strftime("%Y-%m-%dT%H:%M:%S.") + f"{value.microsecond // 1000:03d}Z"
+
+
+def _compact_album(album: dict[str, Any]) -> dict[str, Any]:
+    """Strip an album response down to the fields the card uses."""
+    return {key: album.get(key) for key in ALBUM_FIELDS}
+
+
+def _timeline(records: Iterable[AssetRecord]) -> AssetTimeline:
+    """Build a timeline of records ordered by ``fileCreatedAt``."""
+    return AssetTimeline((record.created_at, record.id) for record in records)
+
+
+@dataclass(slots=True)
+class SyncDelta:
+    """Changes applied to the library index by one sync pass."""
+
+    full: bool = False
+    added: set[str] = field(default_factory=set)
+    changed: set[str] = field(default_factory=set)
+    removed: set[str] = field(default_factory=set)
+    albums_changed: set[str] = field(default_factory=set)
+    albums_removed: set[str] = field(default_factory=set)
+
+    @property
+    def is_empty(self) -> bool:
+        """Return True if the pass changed nothing."""
+        return not (
+            self.added
+            or self.changed
+            or self.removed
+            or self.albums_changed
+            or self.albums_removed
+        )
+
+
+def _index_full_sync(
+    delta: SyncDelta,
+    previous: dict[str, AssetRecord],
+    assets: dict[str, AssetRecord],
+    updated_until: str,
+) -> tuple[AssetTimeline, str]:
+    """Diff a full listing against the previous index and build its timeline.
+
+    Returns the new ``recent`` timeline and watermark. Only ``delta`` is
+    written to, so this can run in the executor while the event loop keeps
+    serving the previous index.
+    """
+    delta.full = True
+    for asset_id, record in assets.items():
+        old = previous.get(asset_id)
+        if old is None:
+            delta.added.add(asset_id)
+        elif old.updated_at != record.updated_at:
+            delta.changed.add(asset_id)
+    delta.removed = previous.keys() - assets.keys()
+    watermark = max(
+        (record.updated_at for record in assets.values() if record.updated_at),
+        default=updated_until,
+    )
+    return _timeline(assets.values()), watermark
+
+
+def _restore_index(
+    snapshot: dict[str, Any],
+) -> tuple[
+    dict[str, AssetRecord],
+    dict[str, AssetRecord],
+    dict[str, AssetTimeline],
+    AssetTimeline,
+]:
+    """Rebuild the records and timelines saved by ``LibrarySync.as_snapshot``.
+
+    Returns the owned assets, foreign assets, album timelines and ``recent``
+    timeline, all newly built, so this can run in the executor.
+    """
+    assets = {
+        record.id: record for record in map(AssetRecord.from_row, snapshot["assets"])
+    }
+    foreign_assets = {
+        record.id: record
+        for record in map(AssetRecord.from_row, snapshot["foreign_assets"])
+    }
+    album_assets: dict[str, AssetTimeline] = {}
+    for album_id, asset_ids in snapshot["album_assets"].items():
+        entries: list[tuple[str, str]] = []
+        for asset_id in asset_ids:
+            record = assets.get(asset_id) or foreign_assets.get(asset_id)
+            if record is not None:
+                record.add_album(album_id)
+                entries.append((record.created_at, record.id))
+        album_assets[album_id] = AssetTimeline(entries)
+    return assets, foreign_assets, album_assets, _timeline(assets.values())
+
+
+class LibrarySync:
+    """Local index of albums and assets kept current with delta syncs.
+
+    The first pass pages through the full asset listing; every later pass asks
+    Immich only for assets updated after the ``updatedAt`` watermark, so the
+    cost of a poll follows library churn rather than library size. Assets are
+    held as compact ``AssetRecord``s that also carry their album membership,
+    and ``recent`` orders the owned assets by ``fileCreatedAt``; delta syncs
+    update it in place rather than re-sorting the library.
+
+    With an ``executor``, rebuilds covering ``INDEX_OFFLOAD_MIN_ASSETS`` or
+    more assets run off the event loop. They build new structures that are
+    swapped in together once done, so readers see the old index or the new
+    one, never a mix.
+    """
+
+    def __init__(
+        self,
+        client: ApiClient,
+        page_size: int = DEFAULT_SYNC_PAGE_SIZE,
+        executor: ExecutorJob | None = None,
+    ) -> None:
+        """Initialize the sync engine."""
+        self._client = client
+        self._page_size = page_size
+        self._executor = executor
+        self._user_id: str | None = None
+        self.assets: dict[str, AssetRecord] = {}
+        self.albums: dict[str, dict[str, Any]] = {}
+        self.album_assets: dict[str, AssetTimeline] = {}
+        self.foreign_assets: dict[str, AssetRecord] = {}
+        self.recent = AssetTimeline()
+        self.watermark: str | None = None
+        self._retry_albums: set[str] = set()
+
+    async def async_sync(self) -> SyncDelta:
+        """Bring the index up to date and return what changed."""
+        if self._user_id is None:
+            user = await self._client.async_get_my_user()
+            self._user_id = user["id"]
+
+        delta = SyncDelta()
+        albums = await self._async_sync_albums(delta)
+        if self.watermark is None:
+            await self._async_full_sync(delta)
+        else:
+            await self._async_delta_sync(delta)
+        await self._async_sync_album_assets(delta, albums)
+        # Stored last: if a step fails, the next pass sees the same album
+        # changes again instead of skipping their timelines.
+        self.albums = albums
+        return delta
+
+    async def _async_run_job(
+        self, size: int, target: Callable[..., _T], *args: Any
+    ) -> _T:
+        """Run an index job of ``size`` assets, in the executor if it is large."""
+        if self._executor is None or size < INDEX_OFFLOAD_MIN_ASSETS:
+            return target(*args)
+        return await self._executor(target, *args)
+
+    async def _async_sync_albums(
+        self, delta: SyncDelta
+    ) -> dict[str, dict[str, Any]]:
+        """Fetch the album list, recording albums that changed, and return it."""
+        albums: dict[str, dict[str, Any]] = {}
+        for album in await self._client.async_get_albums():
+            compact = _compact_album(album)
+            previous = self.albums.get(compact["id"])
+            if previous is None or (
+                previous["updatedAt"],
+                previous["assetCount"],
+            ) != (compact["updatedAt"], compact["assetCount"]):
+                delta.albums_changed.add(compact["id"])
+            albums[compact["id"]] = compact
+        delta.albums_removed = self.albums.keys() - albums.keys()
+        return albums
+
+    async def _async_full_sync(self, delta: SyncDelta) -> None:
+        """Page through every asset and replace the index."""
+        assert self._user_id is not None
+        updated_until = _format_timestamp(dt_util.utcnow())
+        assets: dict[str, AssetRecord] = {}
+        last_id: str | None = None
+        while True:
+            received = 0
+            async for asset in self._client.async_iter_full_sync(
+                self._user_id, updated_until, self._page_size, last_id
+            ):
+                received += 1
+                last_id = asset["id"]
+                if not asset.get("isTrashed"):
+                    assets[last_id] = self._ingest(asset)
+            if received < self._page_size:
+                break
+
+        previous = self.assets
+        recent, watermark = await self._async_run_job(
+            len(assets), _index_full_sync, delta, previous, assets, updated_until
+        )
+        for asset_id in delta.removed:
+            record = previous[asset_id]
+            for timeline in self._album_timelines(record):
+                timeline.discard(record.created_at, asset_id)
+        for asset_id in delta.changed:
+            old, record = previous[asset_id], assets[asset_id]
+            if old.created_at != record.created_at:
+                for timeline in self._album_timelines(old):
+                    timeline.discard(old.created_at, asset_id)
+                    timeline.add(record.created_at, asset_id)
+        self.assets = assets
+        self.recent = recent
+        self.watermark = watermark
+        _LOGGER.debug("Full sync indexed %d assets", len(assets))
+
+    async def _async_delta_sync(self, delta: SyncDelta) -> None:
+        """Merge assets changed since the watermark into the index."""
+        assert self._user_id is not None and self.watermark is not None
+        response = await self._client.async_delta_sync(self._user_id, self.watermark)
+        if response.get("needsFullSync"):
+            _LOGGER.debug("Server requested a full sync")
+            await self._async_full_sync(delta)
+            return
+
+        watermark = self.watermark
+        for asset in response.get("upserted", []):
+            asset_id = asset["id"]
+            updated_at = asset.get("updatedAt")
+            if updated_at and updated_at > watermark:
+                watermark = updated_at
+            if asset.get("isTrashed"):
+                if self._remove(asset_id):
+                    delta.removed.add(asset_id)
+                continue
+            record = self._ingest(asset)
+            previous = self.assets.get(asset_id)
+            if previous is None:
+                delta.added.add(asset_id)
+                self.recent.add(record.created_at, record.id)
+            else:
+                delta.changed.add(asset_id)
+                if previous.created_at != record.created_at:
+                    for timeline in (self.recent, *self._album_timelines(previous)):
+                        timeline.discard(previous.created_at, asset_id)
+                        timeline.add(record.created_at, record.id)
+            self.assets[asset_id] = record
+        for asset_id in response.get("deleted", []):
+            if self._remove(asset_id):
+                delta.removed.add(asset_id)
+        self.watermark = watermark
+
+    def _remove(self, asset_id: str) -> bool:
+        """Drop an owned asset from the index; return True if it was there."""
+        record = self.assets.pop(asset_id, None)
+        if record is None:
+            return False
+        for timeline in (self.recent, *self._album_timelines(record)):
+            timeline.discard(record.created_at, asset_id)
+        return True
+
+    def _album_timelines(self, record: AssetRecord) -> Iterator[AssetTimeline]:
+        """Yield the timelines of the albums holding an asset."""
+        for album_id in record.albums:
+            if (timeline := self.album_assets.get(album_id)) is not None:
+                yield timeline
+
+    def _ingest(self, asset: dict[str, Any]) -> AssetRecord:
+        """Build the record for an API asset, keeping its album membership."""
+        previous = self.assets.get(asset["id"])
+        return AssetRecord.from_api(asset, previous.albums if previous else ())
+
+    def _set_album_members(self, album_id: str, members: set[str]) -> None:
+        """Update the membership tuples of assets entering or leaving an album."""
+        timeline = self.album_assets.get(album_id)
+        previous = set(timeline.asset_ids()) if timeline is not None else set()
+        for asset_id in previous - members:
+            if (record := self.get_record(asset_id)) is not None:
+                record.remove_album(album_id)
+        for asset_id in members - previous:
+            if (record := self.get_record(asset_id)) is not None:
+                record.add_album(album_id)
+
+    async def _async_fetch_album(self, album_id: str) -> list[AssetRecord]:
+        """Stream one album into records, reusing those already indexed."""
+        records: list[AssetRecord] = []
+        async for asset in self._client.async_iter_album_assets(album_id):
+            if asset.get("isTrashed"):
+                continue
+            record = self.assets.get(asset["id"])
+            if record is None:
+                # Shared albums can hold assets owned by other users,
+                # which the per-user delta sync never reports.
+                record = AssetRecord.from_api(asset)
+            records.append(record)
+        return records
+
+    async def _async_sync_album_assets(
+        self, delta: SyncDelta, albums: dict[str, dict[str, Any]]
+    ) -> None:
+        """Rebuild the per-album timelines of albums that changed.
+
+        Albums are fetched concurrently; ones that fail are kept as they were
+        and retried on the next pass.
+        """
+        for album_id in delta.albums_removed:
+            self._set_album_members(album_id, set())
+            self.album_assets.pop(album_id, None)
+        pending = (delta.albums_changed | self._retry_albums) & albums.keys()
+        fetched = await self._client.async_fan_out(pending, self._async_fetch_album)
+        self._retry_albums = set(fetched.errors)
+        if not fetched.complete:
+            _LOGGER.warning(
+                "Could not fetch %d of %d albums, retrying on the next poll",
+                len(fetched.errors),
+                len(pending),
+            )
+        for album_id, records in fetched.results.items():
+            entries: list[tuple[str, str]] = []
+            for record in records:
+                if record.id not in self.assets:
+                    previous = self.foreign_assets.get(record.id)
+                    if previous is not None:
+                        record.albums = previous.albums
+                    self.foreign_assets[record.id] = record
+                entries.append((record.created_at, record.id))
+            timeline = await self._async_run_job(len(entries), AssetTimeline, entries)
+            self._set_album_members(album_id, {asset_id for _, asset_id in entries})
+            self.album_assets[album_id] = timeline
+            delta.albums_changed.add(album_id)
+            # A first sync rebuilds every album; let the loop run between them.
+            await asyncio.sleep(0)
+
+        if self.foreign_assets and (delta.albums_changed or delta.albums_removed):
+            referenced = {
+                asset_id
+                for timeline in self.album_assets.values()
+                for asset_id in timeline.asset_ids()
+            }
+            for asset_id in self.foreign_assets.keys() - referenced:
+                del self.foreign_assets[asset_id]
+
+    def get_record(self, asset_id: str) -> AssetRecord | None:
+        """Return the record of an owned or shared-album asset."""
+        if (record := self.assets.get(asset_id)) is not None:
+            return record
+        return self.foreign_assets.get(asset_id)
+
+    def album_page(
+        self, album_id: str, cursor: str | None, page_size: int
+    ) -> dict[str, Any]:
+        """Return one page of an album's assets, newest first.
+
+        Raises KeyError for unknown albums and InvalidCursorError for cursors
+        that were not produced by a previous page.
+        """
+        timeline = self.album_assets[album_id]
+        entries, next_cursor = timeline.page(cursor, page_size)
+        records = [self.get_record(asset_id) for _, asset_id in entries]
+        return {
+            "assets": [record.as_dict() for record in records if record is not None],
+            "next_cursor": next_cursor,
+            "total": len(timeline),
+        }
+
+    def as_snapshot(self) -> dict[str, Any]:
+        """Return the index in the compact form saved to HA storage."""
+        return {
+            "user_id": self._user_id,
+            "watermark": self.watermark,
+            "albums": list(self.albums.values()),
+            "assets": [record.as_row() for record in self.assets.values()],
+            "foreign_assets": [
+                record.as_row() for record in self.foreign_assets.values()
+            ],
+            "album_assets": {
+                album_id: timeline.asset_ids()
+                for album_id, timeline in self.album_assets.items()
+            },
+        }
+
+    async def async_restore(self, snapshot: dict[str, Any]) -> None:
+        """Replace the index with one saved by ``as_snapshot``.
+
+        The next ``async_sync`` then resumes from the saved watermark with a
+        delta sync instead of a full listing.
+        """
+        size = len(snapshot["assets"]) + len(snapshot["foreign_assets"])
+        assets, foreign_assets, album_assets, recent = await self._async_run_job(
+            size, _restore_index, snapshot
+        )
+        self._user_id = snapshot["user_id"]
+        self.watermark = snapshot["watermark"]
+        self.albums = {album["id"]: album for album in snapshot["albums"]}
+        self.assets = assets
+        self.foreign_assets = foreign_assets
+        self.album_assets = album_assets
+        self.recent = recent
+
+    def album_records(
+        self, album_id: str, cursor: str | None, limit: int
+    ) -> list[AssetRecord]:
+        """Return the records of up to ``limit`` album assets after a cursor."""
+        entries, _ = self.album_assets[album_id].page(cursor, limit)
+        records = (self.get_record(asset_id) for _, asset_id in entries)
+        return [record for record in records if record is not None]
+
+    def iter_recent(
+        self, start: tuple[str, ...] | None = None
+    ) -> Iterator[tuple[str, str]]:
+        """Yield ``(fileCreatedAt, id)`` of owned assets, newest first.
+
+        With ``start``, only positions at or before it are yielded.
+        """
+        return self.recent.iter_from(start)
+
+    def delta_payload(self, delta: SyncDelta) -> dict[str, Any]:
+        """Serialize a sync delta for WebSocket subscribers."""
+        records = (self.get_record(asset_id) for asset_id in delta.added)
+        changed = (self.get_record(asset_id) for asset_id in delta.changed)
+        return {
+            "full": delta.full,
+            "added": [record.as_dict() for record in records if record is not None],
+            "changed": [record.as_dict() for record in changed if record is not None],
+            "removed": list(delta.removed),
+            "albums_changed": [
+                self.albums[album_id]
+                for album_id in delta.albums_changed
+                if album_id in self.albums
+            ],
+            "albums_removed": list(delta.albums_removed),
+            "asset_count": len(self.assets),
+            "album_count": len(self.albums),
+            "watermark": self.watermark,
+        }
+
+    def summary(self) -> dict[str, Any]:
+        """Return the compact view published as coordinator data."""
+        return {
+            "asset_count": len(self.assets),
+            "album_count": len(self.albums),
+            "albums": list(self.albums.values()),
+            "watermark": self.watermark,
+        }
@@ -0,0 +1,543 @@
+"""Thumbnail proxy and on-disk cache for the Immich Browser integration."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+import struct
+import tempfile
+from collections import OrderedDict
+from collections.abc import Iterable
+from contextlib import suppress
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import voluptuous as vol
+from aiohttp import hdrs, web
+
+from homeassistant.components.http import KEY_HASS, HomeAssistantView
+from homeassistant.components.http.data_validator import RequestDataValidator
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+from homeassistant.util.hass_dict import HassKey
+
+from .api import ApiClient, CannotConnectError, InvalidAuthError, ServerError
+from .const import (
+    DEFAULT_THUMBNAIL_MAX_AGE,
+    DOMAIN,
+    MAX_BUNDLE_ASSETS,
+    RESIZE_CONCURRENCY,
+    THUMBNAIL_BUNDLE_URL,
+    THUMBNAIL_SIZES,
+    THUMBNAIL_URL,
+)
+from .metrics import MetricsRegistry
+from .resize import BUCKET_EDGES, ResizeError, resize_to_webp, source_size
+
+if TYPE_CHECKING:
+    from . import ImmichBrowserConfigEntry
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_THUMBNAIL_CACHE: HassKey[ThumbnailCache] = HassKey(f"{DOMAIN}_thumbnail_cache")
+
+_ASSET_ID_RE = re.compile(r"^[0-9a-fA-F-]{1,64}$")
+_DEFAULT_CONTENT_TYPE = "application/octet-stream"
+
+# Bundle item header: asset id length, content type length, image length.
+_BUNDLE_HEADER = struct.Struct(">HHI")
+BUNDLE_CONTENT_TYPE = "application/octet-stream"
+
+
+@dataclass(slots=True)
+class CachedThumbnail:
+    """A thumbnail held in the on-disk cache."""
+
+    path: Path
+    size: int
+    content_type: str
+    etag: str | None = None
+
+
+def thumbnail_key(asset_id: str, size: str, checksum: str | None = None) -> str:
+    """Return the cache key of an asset's thumbnail at one size.
+
+    The key includes Immich's checksum of the original when it is known, so
+    an edited asset misses the cache instead of serving the old image.
+    """
+    if checksum is None:
+        return f"{asset_id}_{size}"
+    # Base64 made filename-safe; the key is also the file name on disk.
+    token = checksum.rstrip("=").replace("/", "_").replace("+", "-")
+    return f"{asset_id}_{size}_{token}"
+
+
+def pack_bundle_item(asset_id: str, content_type: str, data: bytes) -> bytes:
+    """Return one length-prefixed bundle item."""
+    asset_id_bytes = asset_id.encode()
+    content_type_bytes = content_type.encode()
+    return b"".join(
+        (
+            _BUNDLE_HEADER.pack(
+                len(asset_id_bytes), len(content_type_bytes), len(data)
+            ),
+            asset_id_bytes,
+            content_type_bytes,
+            data,
+        )
+    )
+
+
+def _compute_etag(data: bytes) -> str:
+    """Return a strong ETag value for thumbnail bytes."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class ThumbnailCache:
+    """Size-bounded LRU cache of thumbnail bytes stored on disk.
+
+    The recency order and byte accounting live in memory; the files on disk
+    are the only copy of the image data. All file I/O runs in the executor.
+    Resize timings go to the cache's own ``metrics``, keeping local encoding
+    out of the API latency.
+    """
+
+    def __init__(self, hass: HomeAssistant, directory: Path, max_bytes: int) -> None:
+        """Initialize the cache."""
+        self._hass = hass
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[str, CachedThumbnail] = OrderedDict()
+        self._total_bytes = 0
+        self._resize_slots = asyncio.Semaphore(RESIZE_CONCURRENCY)
+        self._inflight: dict[str, asyncio.Future[tuple[CachedThumbnail, bytes]]] = {}
+        # Requests served from the cache vs. fetched from Immich.
+        self.hits = 0
+        self.misses = 0
+        self.metrics = MetricsRegistry()
+
+    @property
+    def total_bytes(self) -> int:
+        """Return the number of bytes currently cached."""
+        return self._total_bytes
+
+    def __contains__(self, key: str) -> bool:
+        """Return True if the key is cached."""
+        return key in self._entries
+
+    def __len__(self) -> int:
+        """Return the number of cached thumbnails."""
+        return len(self._entries)
+
+    async def async_load(self) -> None:
+        """Index thumbnails left on disk by a previous run, oldest first."""
+        entries = await self._hass.async_add_executor_job(self._scan)
+        for key, entry in entries:
+            self._entries[key] = entry
+            self._total_bytes += entry.size
+        await self._async_evict()
+
+    def _scan(self) -> list[tuple[str, CachedThumbnail]]:
+        """Scan the cache directory (executor)."""
+        self._directory.mkdir(parents=True, exist_ok=True)
+        found: list[tuple[float, str, CachedThumbnail]] = []
+        for path in self._directory.iterdir():
+            if not path.is_file():
+                continue
+            if path.suffix == ".tmp":
+                # Left behind by a write interrupted by a shutdown.
+                path.unlink(missing_ok=True)
+                continue
+            stat = path.stat()
+            content_type = mimetypes.guess_type(path.name)[0] or _DEFAULT_CONTENT_TYPE
+            found.append(
+                (stat.st_mtime, path.stem, CachedThumbnail(path, stat.st_size, content_type))
+            )
+        found.sort(key=lambda item: item[0])
+        return [(key, entry) for _, key, entry in found]
+
+    async def async_get(self, key: str) -> tuple[CachedThumbnail, bytes] | None:
+        """Return a cached thumbnail and its bytes, marking it recently used."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        try:
+            data = await self._hass.async_add_executor_job(entry.path.read_bytes)
+        except OSError:
+            self._drop(key)
+            return None
+        if entry.etag is None:
+            entry.etag = _compute_etag(data)
+        self._entries.move_to_end(key)
+        return entry, data
+
+    async def async_get_many(
+        self, keys: Iterable[str]
+    ) -> dict[str, tuple[CachedThumbnail, bytes]]:
+        """Return the cached thumbnails among ``keys``, read in one executor job."""
+        entries = {
+            key: entry for key in keys if (entry := self._entries.get(key)) is not None
+        }
+        if not entries:
+            return {}
+        contents = await self._hass.async_add_executor_job(
+            self._read_many, [entry.path for entry in entries.values()]
+        )
+        found: dict[str, tuple[CachedThumbnail, bytes]] = {}
+        for (key, entry), data in zip(entries.items(), contents, strict=True):
+            if self._entries.get(key) is not entry:
+                continue
+            if data is None:
+                self._drop(key)
+                continue
+            if entry.etag is None:
+                entry.etag = _compute_etag(data)
+            self._entries.move_to_end(key)
+            found[key] = (entry, data)
+        return found
+
+    @staticmethod
+    def _read_many(paths: list[Path]) -> list[bytes | None]:
+        """Read cached files, None for any that vanished (executor)."""
+        contents: list[bytes | None] = []
+        for path in paths:
+            try:
+                contents.append(path.read_bytes())
+            except OSError:
+                contents.append(None)
+        return contents
+
+    def peek(self, key: str) -> CachedThumbnail | None:
+        """Return cache metadata for a key without reading the file."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    async def async_put(self, key: str, data: bytes, content_type: str) -> CachedThumbnail:
+        """Store thumbnail bytes and evict least recently used entries."""
+        path = self._path(key, content_type)
+        await self._hass.async_add_executor_job(self._write, path, data)
+        if key in self._entries:
+            self._drop(key)
+        entry = CachedThumbnail(path, len(data), content_type, _compute_etag(data))
+        self._entries[key] = entry
+        self._total_bytes += entry.size
+        await self._async_evict()
+        return entry
+
+    async def async_fetch(
+        self,
+        client: ApiClient,
+        asset_id: str,
+        size: str,
+        checksum: str | None = None,
+    ) -> tuple[CachedThumbnail, bytes]:
+        """Fetch a thumbnail from Immich and store it.
+
+        Concurrent misses of one key share a single fetch, resize and write;
+        a cancelled caller does not cancel it for the others. Bucket sizes
+        are cut from the smallest Immich rendition that covers them and
+        re-encoded as WebP in the executor.
+        """
+        key = thumbnail_key(asset_id, size, checksum)
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(
+                self._async_fetch(client, asset_id, size, key)
+            )
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._fetch_done(key, done))
+        return await asyncio.shield(future)
+
+    def _fetch_done(
+        self, key: str, future: asyncio.Future[tuple[CachedThumbnail, bytes]]
+    ) -> None:
+        """Forget a finished fetch and mark its exception as retrieved."""
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if not future.cancelled():
+            future.exception()
+
+    async def _async_fetch(
+        self, client: ApiClient, asset_id: str, size: str, key: str
+    ) -> tuple[CachedThumbnail, bytes]:
+        """Fetch, resize and store one thumbnail.
+
+        A failed cache write is logged and the bytes are still returned,
+        without an index entry.
+        """
+        if (edge := BUCKET_EDGES.get(size)) is None:
+            data, content_type = await client.async_get_thumbnail(asset_id, size)
+        else:
+            data, content_type = await self._async_fetch_resized(client, asset_id, edge)
+        try:
+            entry = await self.async_put(key, data, content_type)
+        except OSError as err:
+            _LOGGER.warning("Could not cache thumbnail %s: %s", asset_id, err)
+            entry = CachedThumbnail(
+                self._path(key, content_type),
+                len(data),
+                content_type,
+                _compute_etag(data),
+            )
+        return entry, data
+
+    async def _async_fetch_resized(
+        self, client: ApiClient, asset_id: str, edge: int
+    ) -> tuple[bytes, str]:
+        """Fetch a rendition and scale it down to a bucket.
+
+        At most RESIZE_CONCURRENCY images are encoded at once so a burst of
+        prefetches cannot take over the executor. A rendition that cannot be
+        decoded is served as it came.
+        """
+        source, content_type = await client.async_get_thumbnail(
+            asset_id, source_size(edge)
+        )
+        async with self._resize_slots:
+            with self.metrics.track(f"resize {edge}") as stats:
+                try:
+                    data = await self._hass.async_add_executor_job(
+                        resize_to_webp, source, edge
+                    )
+                except ResizeError as err:
+                    _LOGGER.debug("Could not resize %s: %s", asset_id, err)
+                    return source, content_type
+                stats.bytes += len(data)
+        return data, "image/webp"
+
+    def _path(self, key: str, content_type: str) -> Path:
+        """Return the file a thumbnail of a key is stored in."""
+        extension = mimetypes.guess_extension(content_type) or ".bin"
+        return self._directory / f"{key}{extension}"
+
+    def _write(self, path: Path, data: bytes) -> None:
+        """Write a thumbnail atomically (executor).
+
+        Every write goes through its own temporary file, so concurrent writes
+        of one key cannot move each other's file away.
+        """
+        self._directory.mkdir(parents=True, exist_ok=True)
+        tmp_file = tempfile.NamedTemporaryFile(
+            dir=self._directory, suffix=".tmp", delete=False
+        )
+        tmp_path = Path(tmp_file.name)
+        try:
+            with tmp_file:
+                tmp_file.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    def _drop(self, key: str) -> CachedThumbnail | None:
+        """Forget a key without touching the disk."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total_bytes -= entry.size
+        return entry
+
+    async def _async_evict(self) -> None:
+        """Evict least recently used thumbnails until under the size budget."""
+        evicted: list[Path] = []
+        while self._total_bytes > self._max_bytes and self._entries:
+            key = next(iter(self._entries))
+            evicted.append(self._drop(key).path)
+        if evicted:
+            await self._hass.async_add_executor_job(self._unlink, evicted)
+
+    @staticmethod
+    def _unlink(paths: list[Path]) -> None:
+        """Delete evicted files (executor)."""
+        for path in paths:
+            path.unlink(missing_ok=True)
+
+
+def _async_get_entry(
+    hass: HomeAssistant, entry_id: str | None
+) -> ImmichBrowserConfigEntry | None:
+    """Return the requested (or first) loaded entry."""
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        if entry.state is not ConfigEntryState.LOADED:
+            continue
+        if entry_id is None or entry.entry_id == entry_id:
+            return entry
+    return None
+
+
+def _etag_matches(request: web.Request, etag: str) -> bool:
+    """Return True if the request's If-None-Match covers the ETag."""
+    if_none_match = request.headers.get(hdrs.IF_NONE_MATCH)
+    if not if_none_match:
+        return False
+    candidates = {value.strip() for value in if_none_match.split(",")}
+    return "*" in candidates or f'"{etag}"' in candidates
+
+
+class ImmichThumbnailView(HomeAssistantView):
+    """Authenticated proxy for Immich asset thumbnails."""
+
+    url = THUMBNAIL_URL
+    name = f"api:{DOMAIN}:thumbnail"
+    requires_auth = True
+
+    def __init__(self, cache: ThumbnailCache) -> None:
+        """Initialize the view."""
+        self._cache = cache
+
+    async def get(self, request: web.Request, asset_id: str) -> web.StreamResponse:
+        """Serve a thumbnail from the cache, fetching it from Immich on a miss."""
+        size = request.query.get("size", THUMBNAIL_SIZES[0])
+        if size not in THUMBNAIL_SIZES or not _ASSET_ID_RE.match(asset_id):
+            return web.Response(status=400)
+        config_entry = _async_get_entry(
+            request.app[KEY_HASS], request.query.get("entry_id")
+        )
+        if config_entry is None:
+            return web.Response(status=404)
+        runtime = config_entry.runtime_data
+        record = runtime.coordinator.library.get_record(asset_id)
+        checksum = record.checksum if record is not None else None
+        key = thumbnail_key(asset_id, size, checksum)
+
+        entry = self._cache.peek(key)
+        if entry is not None and entry.etag and _etag_matches(request, entry.etag):
+            self._cache.hits += 1
+            return self._not_modified(entry.etag)
+
+        cached = await self._cache.async_get(key)
+        if cached is None:
+            self._cache.misses += 1
+            try:
+                entry, data = await self._cache.async_fetch(
+                    runtime.client, asset_id, size, checksum
+                )
+            except (CannotConnectError, InvalidAuthError, ServerError) as err:
+                _LOGGER.debug("Thumbnail fetch for %s failed: %s", asset_id, err)
+                return web.Response(status=502)
+        else:
+            self._cache.hits += 1
+            entry, data = cached
+            if _etag_matches(request, entry.etag):
+                return self._not_modified(entry.etag)
+
+        return web.Response(
+            body=data,
+            content_type=entry.content_type,
+            headers=self._cache_headers(entry.etag),
+        )
+
+    @staticmethod
+    def _cache_headers(etag: str) -> dict[str, str]:
+        """Return caching headers for a thumbnail response."""
+        return {
+            hdrs.ETAG: f'"{etag}"',
+            hdrs.CACHE_CONTROL: f"private, max-age={DEFAULT_THUMBNAIL_MAX_AGE}",
+        }
+
+    def _not_modified(self, etag: str) -> web.Response:
+        """Return a 304 response for a matching ETag."""
+        return web.Response(status=304, headers=self._cache_headers(etag))
+
+
+class ImmichThumbnailBundleView(HomeAssistantView):
+    """Authenticated endpoint serving many thumbnails in one response.
+
+    POST ``asset_ids`` (plus optional ``size`` and ``entry_id``) as JSON. The
+    response streams one ``pack_bundle_item`` per thumbnail: cached ones
+    first, then misses as the concurrent fetches complete. Thumbnails that
+    cannot be fetched are left out, so clients fall back to the single
+    thumbnail view for them.
+    """
+
+    url = THUMBNAIL_BUNDLE_URL
+    name = f"api:{DOMAIN}:thumbnails"
+    requires_auth = True
+
+    def __init__(self, cache: ThumbnailCache) -> None:
+        """Initialize the view."""
+        self._cache = cache
+
+    @RequestDataValidator(
+        vol.Schema(
+            {
+                vol.Required("asset_ids"): vol.All(
+                    [vol.Match(_ASSET_ID_RE)],
+                    vol.Length(min=1, max=MAX_BUNDLE_ASSETS),
+                ),
+                vol.Optional("size", default=THUMBNAIL_SIZES[0]): vol.In(
+                    THUMBNAIL_SIZES
+                ),
+                vol.Optional("entry_id"): str,
+            }
+        )
+    )
+    async def post(
+        self, request: web.Request, data: dict[str, Any]
+    ) -> web.StreamResponse:
+        """Stream the requested thumbnails, fetching misses from Immich."""
+        config_entry = _async_get_entry(request.app[KEY_HASS], data.get("entry_id"))
+        if config_entry is None:
+            return web.Response(status=404)
+        runtime = config_entry.runtime_data
+        library = runtime.coordinator.library
+        size = data["size"]
+        checksums: dict[str, str | None] = {}
+        for asset_id in data["asset_ids"]:
+            record = library.get_record(asset_id)
+            checksums[asset_id] = record.checksum if record is not None else None
+        keys = {
+            asset_id: thumbnail_key(asset_id, size, checksum)
+            for asset_id, checksum in checksums.items()
+        }
+        cached = await self._cache.async_get_many(keys.values())
+
+        response = web.StreamResponse(
+            headers={
+                hdrs.CONTENT_TYPE: BUNDLE_CONTENT_TYPE,
+                hdrs.CACHE_CONTROL: "no-store",
+            }
+        )
+        await response.prepare(request)
+        missing: list[str] = []
+        for asset_id, key in keys.items():
+            if (hit := cached.get(key)) is None:
+                missing.append(asset_id)
+                continue
+            entry, image = hit
+            await response.write(pack_bundle_item(asset_id, entry.content_type, image))
+        self._cache.hits += len(keys) - len(missing)
+        self._cache.misses += len(missing)
+
+        async def _async_fetch(asset_id: str) -> None:
+            entry, image = await self._cache.async_fetch(
+                runtime.client, asset_id, size, checksums[asset_id]
+            )
+            # Each item is written in a single call, so items never interleave.
+            with suppress(ConnectionResetError):
+                await response.write(
+                    pack_bundle_item(asset_id, entry.content_type, image)
+                )
+
+        try:
+            fetched = await runtime.client.async_fan_out(
+                missing, _async_fetch, retries=0
+            )
+        except InvalidAuthError as err:
+            _LOGGER.debug("Thumbnail bundle fetch failed: %s", err)
+        else:
+            if fetched.errors:
+                _LOGGER.debug(
+                    "%d of %d thumbnails could not be fetched",
+                    len(fetched.errors),
+                    len(missing),
+                )
+        with suppress(ConnectionResetError):
+            await response.write_eof()
+        return response
@@ -3,23 +3,129 @@
 from __future__ import annotations
 
 import logging
-from typing import Any
+import time
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, nullcontext
+from functools import partial
+from typing import TYPE_CHECKING, Any
 
 import voluptuous as vol
 
 from homeassistant.components import websocket_api
+from homeassistant.config_entries import ConfigEntryState
 from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.json import json_bytes
 
-from .const import DOMAIN
+from .const import (
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_PREFETCH_AHEAD,
+    DOMAIN,
+    MAX_PAGE_SIZE,
+    THUMBNAIL_SIZES,
+)
+from .index import InvalidCursorError, decode_cursor, merge_newest_first
+from .metrics import EndpointStats
+from .prefetch import DATA_PREFETCHER
+from .sync import LibrarySync
+
+if TYPE_CHECKING:
+    from . import ImmichBrowserConfigEntry
 
 _LOGGER = logging.getLogger(__name__)
 
 WS_TYPE_GET_DATA = f"{DOMAIN}/get_data"
+WS_TYPE_ALBUM_ASSETS = f"{DOMAIN}/album_assets"
+WS_TYPE_SUBSCRIBE = f"{DOMAIN}/subscribe"
+WS_TYPE_RECENT_ASSETS = f"{DOMAIN}/recent_assets"
+WS_TYPE_CANCEL_PREFETCH = f"{DOMAIN}/cancel_prefetch"
+# Metrics name of the events pushed to subscribers, apart from the command.
+WS_SUBSCRIBE_EVENT = f"{WS_TYPE_SUBSCRIBE}:event"
+
+# Key of the connection "subscription" that drops pending prefetches on close.
+PREFETCH_SUBSCRIPTION = f"{DOMAIN}_prefetch"
+
+
+@callback
+def _async_loaded_entries(hass: HomeAssistant) -> list[ImmichBrowserConfigEntry]:
+    """Return the loaded Immich Browser entries."""
+    return [
+        entry
+        for entry in hass.config_entries.async_entries(DOMAIN)
+        if entry.state is ConfigEntryState.LOADED
+    ]
+
+
+@callback
+def _async_get_entry(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> ImmichBrowserConfigEntry | None:
+    """Return the entry a command is routed to, or send an error.
+
+    Commands go to the entry named by ``entry_id``, or to the first loaded
+    entry when it is omitted.
+    """
+    entry_id = msg.get("entry_id")
+    for entry in _async_loaded_entries(hass):
+        if entry_id is None or entry.entry_id == entry_id:
+            return entry
+    connection.send_error(
+        msg["id"],
+        websocket_api.ERR_NOT_FOUND,
+        f"Unknown entry: {entry_id}" if entry_id else "No config entries",
+    )
+    return None
+
+
+def _track(
+    entries: list[ImmichBrowserConfigEntry], command: str
+) -> AbstractContextManager[EndpointStats]:
+    """Track a command in the metrics of the entry it was routed to.
+
+    Commands merged across entries are recorded once, in the first entry's
+    metrics, which is also where commands without ``entry_id`` are routed.
+    """
+    if not entries:
+        return nullcontext(EndpointStats())
+    return entries[0].runtime_data.metrics.track(command)
+
+
+@callback
+def _async_send_tracked(
+    connection: websocket_api.ActiveConnection,
+    stats: EndpointStats,
+    message: dict[str, Any],
+) -> None:
+    """Encode and send a message, recording its size and encode time.
+
+    Encoding here rather than in ``send_message`` lets the JSON time and the
+    payload size be measured apart from the handler's own work.
+    """
+    encode_started = time.perf_counter()
+    payload = json_bytes(message)
+    stats.json.observe(time.perf_counter() - encode_started)
+    stats.bytes += len(payload)
+    connection.send_message(payload)
+
+
+@callback
+def _async_send_error(
+    connection: websocket_api.ActiveConnection,
+    stats: EndpointStats,
+    msg_id: int,
+    code: str,
+    message: str,
+) -> None:
+    """Send an error result and count it against the command."""
+    stats.errors += 1
+    connection.send_error(msg_id, code, message)
 
 
 @websocket_api.websocket_command(
     {
         vol.Required("type"): WS_TYPE_GET_DATA,
+        vol.Optional("entry_id"): str,
     }
 )
 @websocket_api.async_response
@@ -29,16 +135,297 @@ async def websocket_get_data(
     msg: dict[str, Any],
 ) -> None:
     """Handle get_data WebSocket command for Immich Browser."""
-    entries = hass.config_entries.async_entries(DOMAIN)
-    if not entries:
-        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, "No config entries")
+    if (entry := _async_get_entry(hass, connection, msg)) is None:
         return
 
-    coordinator = entries[0].runtime_data.coordinator
-    connection.send_result(msg["id"], coordinator.data or {})
+    coordinator = entry.runtime_data.coordinator
+    with _track([entry], WS_TYPE_GET_DATA) as stats:
+        _async_send_tracked(
+            connection,
+            stats,
+            websocket_api.result_message(msg["id"], coordinator.data or {}),
+        )
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): WS_TYPE_ALBUM_ASSETS,
+        vol.Optional("entry_id"): str,
+        vol.Required("album_id"): str,
+        vol.Optional("cursor"): vol.Any(str, None),
+        vol.Optional("page_size", default=DEFAULT_PAGE_SIZE): vol.All(
+            int, vol.Range(min=1, max=MAX_PAGE_SIZE)
+        ),
+        vol.Optional("prefetch", default=DEFAULT_PREFETCH_AHEAD): vol.All(
+            int, vol.Range(min=0, max=MAX_PAGE_SIZE)
+        ),
+        vol.Optional("thumbnail_size", default=THUMBNAIL_SIZES[0]): vol.In(
+            THUMBNAIL_SIZES
+        ),
+    }
+)
+@callback
+def websocket_album_assets(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Handle album_assets WebSocket command for Immich Browser.
+
+    Pages are served from the coordinator's per-album index; pass the returned
+    ``next_cursor`` back to fetch the following page. The thumbnails of the
+    next ``prefetch`` assets are then warmed in the background, replacing
+    whatever this connection had queued before for the same album.
+    """
+    if (entry := _async_get_entry(hass, connection, msg)) is None:
+        return
+
+    runtime = entry.runtime_data
+    library = runtime.coordinator.library
+    with _track([entry], WS_TYPE_ALBUM_ASSETS) as stats:
+        try:
+            page = library.album_page(
+                msg["album_id"], msg.get("cursor"), msg["page_size"]
+            )
+        except KeyError:
+            _async_send_error(
+                connection,
+                stats,
+                msg["id"],
+                websocket_api.ERR_NOT_FOUND,
+                "Unknown album",
+            )
+            return
+        except InvalidCursorError as err:
+            _async_send_error(
+                connection,
+                stats,
+                msg["id"],
+                websocket_api.ERR_INVALID_FORMAT,
+                str(err),
+            )
+            return
+        _async_send_tracked(
+            connection, stats, websocket_api.result_message(msg["id"], page)
+        )
+
+    prefetcher = hass.data.get(DATA_PREFETCHER)
+    if prefetcher is None:
+        return
+    # One queue per card: cards on a dashboard share the connection, and
+    # each shows one album.
+    owner = (connection, msg["album_id"])
+    if not msg["prefetch"] or page["next_cursor"] is None:
+        prefetcher.async_cancel(owner)
+        return
+    prefetcher.async_schedule(
+        owner,
+        runtime.client,
+        library.album_records(msg["album_id"], page["next_cursor"], msg["prefetch"]),
+        msg["thumbnail_size"],
+    )
+    subscription = f"{PREFETCH_SUBSCRIPTION}_{msg['album_id']}"
+    if subscription not in connection.subscriptions:
+        connection.subscriptions[subscription] = partial(
+            prefetcher.async_cancel, owner
+        )
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): WS_TYPE_CANCEL_PREFETCH,
+        vol.Required("album_id"): str,
+    }
+)
+@callback
+def websocket_cancel_prefetch(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Handle cancel_prefetch WebSocket command for Immich Browser.
+
+    Cards send it when they leave the view. The connection outlives
+    dashboard navigation, so without it the album's queued thumbnails would
+    keep being fetched for nobody.
+    """
+    if (prefetcher := hass.data.get(DATA_PREFETCHER)) is not None:
+        prefetcher.async_cancel((connection, msg["album_id"]))
+    connection.subscriptions.pop(f"{PREFETCH_SUBSCRIPTION}_{msg['album_id']}", None)
+    connection.send_result(msg["id"])
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): WS_TYPE_SUBSCRIBE,
+        vol.Optional("entry_id"): str,
+    }
+)
+@callback
+def websocket_subscribe(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Handle subscribe WebSocket command for Immich Browser.
+
+    Sends a ``snapshot`` event with the current data, then a ``delta`` event
+    with the added, changed and removed assets and albums after every poll
+    that changed the library, and a ``secondary`` event whenever the
+    secondary coordinator's data changes. Subscribers only listen to the
+    coordinators, so any number of open cards share the same polls.
+    """
+    if (entry := _async_get_entry(hass, connection, msg)) is None:
+        return
+
+    runtime = entry.runtime_data
+    coordinator = runtime.coordinator
+    secondary = runtime.coordinator_secondary
+    sent: dict[str, Any] = {"delta": None, "secondary": secondary.data}
+
+    @callback
+    def _async_send_delta() -> None:
+        payload = coordinator.delta_payload()
+        if payload is None or payload is sent["delta"]:
+            return
+        sent["delta"] = payload
+        with _track([entry], WS_SUBSCRIBE_EVENT) as stats:
+            _async_send_tracked(
+                connection,
+                stats,
+                websocket_api.event_message(msg["id"], {"type": "delta", **payload}),
+            )
+
+    @callback
+    def _async_send_secondary() -> None:
+        if secondary.data is None or secondary.data == sent["secondary"]:
+            return
+        sent["secondary"] = secondary.data
+        with _track([entry], WS_SUBSCRIBE_EVENT) as stats:
+            _async_send_tracked(
+                connection,
+                stats,
+                websocket_api.event_message(
+                    msg["id"], {"type": "secondary", "data": secondary.data}
+                ),
+            )
+
+    unsubscribers = [
+        coordinator.async_add_listener(_async_send_delta),
+        secondary.async_add_listener(_async_send_secondary),
+    ]
+
+    @callback
+    def _async_unsubscribe() -> None:
+        for unsubscribe in unsubscribers:
+            unsubscribe()
+
+    with _track([entry], WS_TYPE_SUBSCRIBE) as stats:
+        connection.subscriptions[msg["id"]] = _async_unsubscribe
+        connection.send_result(msg["id"])
+        _async_send_tracked(
+            connection,
+            stats,
+            websocket_api.event_message(
+                msg["id"],
+                {
+                    "type": "snapshot",
+                    "data": coordinator.data or {},
+                    "secondary": secondary.data,
+                },
+            ),
+        )
+
+
+def _recent_stream(
+    entry_id: str, library: LibrarySync, after: tuple[str, ...] | None
+) -> Iterator[tuple[str, str, str]]:
+    """Yield a library's merge positions strictly older than ``after``."""
+    for sort_key, asset_id in library.iter_recent(after[:2] if after else None):
+        position = (sort_key, asset_id, entry_id)
+        if after is None or position < after:
+            yield position
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): WS_TYPE_RECENT_ASSETS,
+        vol.Optional("entry_id"): str,
+        vol.Optional("cursor"): vol.Any(str, None),
+        vol.Optional("page_size", default=DEFAULT_PAGE_SIZE): vol.All(
+            int, vol.Range(min=1, max=MAX_PAGE_SIZE)
+        ),
+    }
+)
+@callback
+def websocket_recent_assets(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Handle recent_assets WebSocket command for Immich Browser.
+
+    Without ``entry_id`` the newest assets of every loaded library are merged
+    into one timeline. Each asset carries the ``entry_id`` it belongs to, and
+    the returned ``next_cursor`` continues the merged timeline.
+    """
+    if "entry_id" in msg:
+        if (entry := _async_get_entry(hass, connection, msg)) is None:
+            return
+        entries = [entry]
+    else:
+        entries = _async_loaded_entries(hass)
+
+    with _track(entries, WS_TYPE_RECENT_ASSETS) as stats:
+        try:
+            after = decode_cursor(msg["cursor"], 3) if msg.get("cursor") else None
+        except InvalidCursorError as err:
+            _async_send_error(
+                connection,
+                stats,
+                msg["id"],
+                websocket_api.ERR_INVALID_FORMAT,
+                str(err),
+            )
+            return
+        _async_send_recent(connection, stats, msg, entries, after)
+
+
+@callback
+def _async_send_recent(
+    connection: websocket_api.ActiveConnection,
+    stats: EndpointStats,
+    msg: dict[str, Any],
+    entries: list[ImmichBrowserConfigEntry],
+    after: tuple[str, ...] | None,
+) -> None:
+    """Merge the entries' timelines after ``after`` and send one page."""
+    libraries = {
+        entry.entry_id: entry.runtime_data.coordinator.library for entry in entries
+    }
+    streams = [
+        _recent_stream(entry_id, library, after)
+        for entry_id, library in libraries.items()
+    ]
+    page, next_cursor = merge_newest_first(streams, msg["page_size"])
+    assets = []
+    for _, asset_id, entry_id in page:
+        if (record := libraries[entry_id].get_record(asset_id)) is not None:
+            assets.append({**record.as_dict(), "entry_id": entry_id})
+    _async_send_tracked(
+        connection,
+        stats,
+        websocket_api.result_message(
+            msg["id"], {"assets": assets, "next_cursor": next_cursor}
+        ),
+    )
 
 
 @callback
 def async_setup_websocket(hass: HomeAssistant) -> None:
     """Register WebSocket commands for Immich Browser."""
     websocket_api.async_register_command(hass, websocket_get_data)
+    websocket_api.async_register_command(hass, websocket_album_assets)
+    websocket_api.async_register_command(hass, websocket_cancel_prefetch)
+    websocket_api.async_register_command(hass, websocket_subscribe)
+    websocket_api.async_register_command(hass, websocket_recent_assets)
@@ -1,7 +1,8 @@
 """Common fixtures for the Immich Browser tests."""
 
-from collections.abc import Generator
-from unittest.mock import AsyncMock, patch
+from collections.abc import AsyncIterator, Generator, Iterable
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
@@ -12,6 +13,86 @@ from pytest_homeassistant_custom_component.common import MockConfigEntry
 from custom_components.immich_browser.const import DOMAIN
 
 
+MOCK_USER = {"id": "user-1", "email": "family@example.com"}
+
+MOCK_ALBUMS = [
+    {
+        "id": "album-1",
+        "albumName": "Holidays",
+        "albumThumbnailAssetId": "asset-1",
+        "assetCount": 2,
+        "startDate": "2024-07-01T10:00:00.000Z",
+        "endDate": "2024-07-02T10:00:00.000Z",
+        "updatedAt": "2024-07-03T10:00:00.000Z",
+        "shared": False,
+    },
+]
+
+MOCK_ASSETS = [
+    {
+        "id": "asset-1",
+        "type": "IMAGE",
+        "fileCreatedAt": "2024-07-01T10:00:00.000Z",
+        "updatedAt": "2024-07-01T11:00:00.000Z",
+        "thumbhash": "1QcSHQRnh493V4dIh4eXh1h4kJUI",
+        "isTrashed": False,
+    },
+    {
+        "id": "asset-2",
+        "type": "VIDEO",
+        "fileCreatedAt": "2024-07-02T10:00:00.000Z",
+        "updatedAt": "2024-07-02T11:00:00.000Z",
+        "thumbhash": None,
+        "isTrashed": False,
+    },
+]
+
+MOCK_STATISTICS = {
+    "photos": 19925,
+    "videos": 234,
+    "usage": 156_420_000_000,
+    "usageByUser": [],
+}
+
+
+async def _aiter(items: Iterable[Any]) -> AsyncIterator[Any]:
+    """Yield items like a streamed response."""
+    for item in items:
+        yield item
+
+
+@pytest.fixture
+def mock_immich() -> Generator[dict[str, MagicMock]]:
+    """Patch the Immich endpoints used by the library sync with a tiny library."""
+    client = "custom_components.immich_browser.api.ApiClient"
+    responses: dict[str, Any] = {
+        "async_get_my_user": MOCK_USER,
+        "async_get_albums": MOCK_ALBUMS,
+        "async_delta_sync": {"needsFullSync": False, "upserted": [], "deleted": []},
+        "async_get_thumbnail": (b"webp-bytes", "image/webp"),
+        "async_get_statistics": MOCK_STATISTICS,
+        "async_get_asset_statistics": {"images": 812, "videos": 40, "total": 852},
+    }
+    streams: dict[str, list[dict[str, Any]]] = {
+        "async_iter_full_sync": MOCK_ASSETS,
+        "async_iter_album_assets": MOCK_ASSETS,
+    }
+    patchers = [
+        patch(f"{client}.{name}", new_callable=AsyncMock, return_value=value)
+        for name, value in responses.items()
+    ] + [
+        patch(f"{client}.{name}", side_effect=lambda *args, _items=items: _aiter(_items))
+        for name, items in streams.items()
+    ]
+    mocks = {
+        name: patcher.start()
+        for name, patcher in zip([*responses, *streams], patchers)
+    }
+    yield mocks
+    for patcher in patchers:
+        patcher.stop()
+
+
 @pytest.fixture(autouse=True)
 def auto_enable_custom_integrations(enable_custom_integrations):
     """Enable custom integrations for all tests in this package."""
@@ -0,0 +1,365 @@
+"""Tests for the Immich Browser API client."""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import aiohttp
+import pytest
+from multidict import CIMultiDict
+
+from custom_components.immich_browser.api import (
+    ApiClient,
+    CannotConnectError,
+    CircuitOpenError,
+    InvalidAuthError,
+    ResponseCache,
+    ServerError,
+)
+from custom_components.immich_browser.breaker import BreakerState, CircuitBreaker
+from custom_components.immich_browser.streaming import JsonArrayStream
+
+
+def _mock_response(
+    body=None, status: int = 200, headers: dict[str, str] | None = None
+) -> MagicMock:
+    """Return a mocked aiohttp response."""
+    response = MagicMock()
+    response.status = status
+    response.reason = "OK"
+    response.headers = CIMultiDict(headers or {})
+    response.read = AsyncMock(return_value=json.dumps(body).encode())
+    return response
+
+
+def _client(session: MagicMock) -> ApiClient:
+    """Return an ApiClient bound to a mocked session."""
+    return ApiClient(host="immich.local", port=2283, api_key="key", session=session)
+
+
+async def test_concurrent_gets_are_coalesced() -> None:
+    """Test identical concurrent GETs share one upstream request."""
+    release = asyncio.Event()
+
+    async def _request(*args, **kwargs):
+        await release.wait()
+        return _mock_response([{"id": "album-1"}])
+
+    session = MagicMock()
+    session.request = AsyncMock(side_effect=_request)
+    client = _client(session)
+
+    waiters = [asyncio.create_task(client.async_get_albums()) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters)
+
+    assert session.request.await_count == 1
+    assert all(result is results[0] for result in results)
+
+    await client.async_get_albums()
+    assert session.request.await_count == 2
+
+
+async def test_coalesced_error_reaches_every_waiter() -> None:
+    """Test a failed shared request raises for all of its waiters."""
+    release = asyncio.Event()
+
+    async def _request(*args, **kwargs):
+        await release.wait()
+        raise asyncio.TimeoutError
+
+    session = MagicMock()
+    session.request = AsyncMock(side_effect=_request)
+    client = _client(session)
+
+    with patch("custom_components.immich_browser.api.REQUEST_RETRY_BACKOFF", 0):
+        waiters = [
+            asyncio.create_task(client.async_get_albums()) for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        for waiter in waiters:
+            with pytest.raises(CannotConnectError):
+                await waiter
+    # One shared request: the first attempt and its two retries.
+    assert session.request.await_count == 3
+
+
+async def test_conditional_get_reuses_cached_body() -> None:
+    """Test a 304 answer returns the cached body and sends validators."""
+    albums = [{"id": "album-1"}]
+    session = MagicMock()
+    session.request = AsyncMock(
+        side_effect=[
+            _mock_response(albums, headers={"ETag": 'W/"abc"'}),
+            _mock_response(status=304),
+        ]
+    )
+    client = _client(session)
+
+    first = await client.async_get_albums()
+    second = await client.async_get_albums()
+
+    assert first == albums
+    assert second is first
+    revalidation_headers = session.request.await_args_list[1].kwargs["headers"]
+    assert revalidation_headers["If-None-Match"] == 'W/"abc"'
+
+    stats = client.metrics.as_dict()["GET /api/albums"]
+    assert stats["requests"] == 2
+    assert stats["cache_misses"] == 1
+    assert stats["cache_hits"] == 1
+    assert stats["bytes"] == len(json.dumps(albums))
+    assert stats["in_flight"] == 0
+    assert stats["latency"]["count"] == 2
+    assert stats["json"]["count"] == 1
+
+
+async def test_undecodable_bodies_raise_api_errors() -> None:
+    """Test bad bodies and a 304 without a cached copy map to API errors."""
+    malformed = _mock_response()
+    malformed.read = AsyncMock(return_value=b"{not json")
+    truncated = _mock_response()
+    truncated.read = AsyncMock(side_effect=aiohttp.ClientPayloadError("cut"))
+    session = MagicMock()
+    session.request = AsyncMock(
+        side_effect=[malformed, truncated, _mock_response(status=304)]
+    )
+    client = _client(session)
+
+    with pytest.raises(ServerError):
+        await client.async_get_albums()
+    with pytest.raises(CannotConnectError):
+        await client.async_get_albums()
+    with pytest.raises(ServerError):
+        await client.async_get_albums()
+    assert client.metrics.as_dict()["GET /api/albums"]["errors"] == 3
+
+
+async def test_truncated_thumbnail_raises_cannot_connect() -> None:
+    """Test a payload error while reading a thumbnail maps to an API error."""
+    truncated = _mock_response()
+    truncated.read = AsyncMock(side_effect=aiohttp.ClientPayloadError("cut"))
+    session = MagicMock()
+    session.request = AsyncMock(return_value=truncated)
+    client = _client(session)
+
+    with pytest.raises(CannotConnectError):
+        await client.async_get_thumbnail("0b7e5a54-8e9c-4e7a-9a31-2f0c4f3a9d10")
+    stats = client.metrics.as_dict()["GET /api/assets/{id}/thumbnail"]
+    assert stats["errors"] == 1
+
+
+async def test_large_json_is_decoded_in_executor() -> None:
+    """Test bodies over the offload threshold are decoded by the executor."""
+    albums = [{"id": "album-1"}]
+    session = MagicMock()
+    session.request = AsyncMock(return_value=_mock_response(albums))
+
+    async def _executor(target, *args):
+        return target(*args)
+
+    executor = AsyncMock(side_effect=_executor)
+    client = ApiClient(
+        host="immich.local",
+        port=2283,
+        api_key="key",
+        session=session,
+        executor=executor,
+    )
+
+    with patch("custom_components.immich_browser.api.JSON_OFFLOAD_BYTES", 1):
+        assert await client.async_get_albums() == albums
+    executor.assert_awaited_once_with(json.loads, json.dumps(albums).encode())
+
+
+async def test_response_cache_evicts_by_size() -> None:
+    """Test the response cache drops least recently used bodies over budget."""
+    cache = ResponseCache(ttl=60, max_bytes=10)
+    cache.store("a", "etag-a", None, "A", 6)
+    cache.store("b", "etag-b", None, "B", 6)
+
+    assert cache.get("a") is None
+    assert cache.get("b").body == "B"
+    assert len(cache) == 1
+
+
+async def test_stream_decodes_elements_across_chunks() -> None:
+    """Test streamed arrays are decoded element by element across chunk splits."""
+    album = {
+        "id": "album-1",
+        "albumName": "Brackets ] and \\\" quotes",
+        "assets": [{"id": f"asset-{index}", "tags": ["[x]"]} for index in range(20)],
+        "assetCount": 20,
+    }
+    raw = json.dumps(album).encode()
+
+    async def _chunks(size):
+        for start in range(0, len(raw), 7):
+            yield raw[start : start + 7]
+
+    response = _mock_response()
+    response.content.iter_chunked = _chunks
+    session = MagicMock()
+    session.request = AsyncMock(return_value=response)
+    client = _client(session)
+
+    stream = JsonArrayStream(("assets",))
+    assets = [
+        asset
+        async for asset in client.async_iter_json(stream, "GET", "/api/albums/album-1")
+    ]
+
+    assert assets == album["assets"]
+    assert stream.envelope == {**album, "assets": []}
+    response.release.assert_called_once()
+
+
+async def test_stream_latency_excludes_consumer_time() -> None:
+    """Test streamed request latency leaves out time spent by the consumer."""
+    raw = json.dumps([{"id": f"asset-{index}"} for index in range(3)]).encode()
+
+    async def _chunks(size):
+        yield raw
+
+    response = _mock_response()
+    response.content.iter_chunked = _chunks
+    session = MagicMock()
+    session.request = AsyncMock(return_value=response)
+    client = _client(session)
+
+    async for _asset in client.async_iter_json(
+        JsonArrayStream(), "POST", "/api/sync/full-sync"
+    ):
+        await asyncio.sleep(0.05)
+
+    stats = client.metrics.as_dict()["POST /api/sync/full-sync"]
+    assert stats["requests"] == 1
+    assert stats["in_flight"] == 0
+    assert stats["latency"]["max_ms"] < 50
+
+
+async def test_fan_out_bounds_concurrency_and_keeps_partial_results() -> None:
+    """Test fan-out caps in-flight fetches, retries and reports failures."""
+    client = _client(MagicMock())
+    in_flight = 0
+    peak = 0
+    attempts: dict[int, int] = {}
+
+    async def _fetch(key: int) -> int:
+        nonlocal in_flight, peak
+        attempts[key] = attempts.get(key, 0) + 1
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        if key == 3 and attempts[key] == 1:
+            raise CannotConnectError("reset")
+        if key == 7:
+            raise CannotConnectError("down")
+        if key == 8:
+            raise ServerError("HTTP 500")
+        return key * 10
+
+    with patch("custom_components.immich_browser.api.FAN_OUT_RETRY_DELAY", 0):
+        outcome = await client.async_fan_out(
+            range(20), _fetch, concurrency=4, retries=2
+        )
+
+    assert peak == 4
+    assert not outcome.complete
+    assert set(outcome.errors) == {7, 8}
+    assert outcome.results[3] == 30
+    assert len(outcome.results) == 18
+    assert attempts[7] == 3
+    assert attempts[8] == 1
+
+
+async def test_fan_out_backoff_releases_slot() -> None:
+    """Test a key waiting to retry does not hold a concurrency slot."""
+    client = _client(MagicMock())
+    finished: list[int] = []
+    failed = False
+
+    async def _fetch(key: int) -> int:
+        nonlocal failed
+        if key == 0 and not failed:
+            failed = True
+            raise CannotConnectError("reset")
+        finished.append(key)
+        return key
+
+    with patch("custom_components.immich_browser.api.FAN_OUT_RETRY_DELAY", 0.05):
+        outcome = await client.async_fan_out(
+            range(3), _fetch, concurrency=1, retries=1
+        )
+
+    assert outcome.complete
+    assert finished == [1, 2, 0]
+
+
+async def test_fan_out_raises_auth_error() -> None:
+    """Test an auth failure stops the fan-out and is raised unwrapped."""
+    client = _client(MagicMock())
+
+    async def _fetch(key: int) -> int:
+        if key == 3:
+            raise InvalidAuthError("revoked")
+        await asyncio.sleep(0)
+        return key
+
+    with pytest.raises(InvalidAuthError):
+        await client.async_fan_out(range(10), _fetch, concurrency=2)
+
+
+async def test_retries_then_opens_circuit_breaker() -> None:
+    """Test idempotent requests retry and an unhealthy server opens the breaker."""
+    session = MagicMock()
+    session.request = AsyncMock(
+        side_effect=[
+            asyncio.TimeoutError,
+            _mock_response([{"id": "album-1"}]),
+            *[_mock_response(status=503)] * 5,
+        ]
+    )
+    client = _client(session)
+    client.breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+
+    with patch("custom_components.immich_browser.api.REQUEST_RETRY_BACKOFF", 0):
+        assert await client.async_get_albums() == [{"id": "album-1"}]
+        assert client.breaker.failures == 0
+
+        with pytest.raises(ServerError):
+            await client.async_get_my_user()
+        assert session.request.await_count == 5
+        assert client.breaker.state is BreakerState.OPEN
+
+        with pytest.raises(CircuitOpenError):
+            await client.async_get_my_user()
+        assert session.request.await_count == 5
+
+
+async def test_circuit_breaker_half_open_probe() -> None:
+    """Test one probe is let through after the reset timeout."""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    with patch("custom_components.immich_browser.breaker.time.monotonic") as now:
+        now.return_value = 100.0
+        breaker.record_failure()
+        assert not breaker.allow_request()
+
+        now.return_value = 111.0
+        assert breaker.allow_request()
+        assert breaker.state is BreakerState.HALF_OPEN
+        assert not breaker.allow_request()
+
+        breaker.record_failure()
+        assert breaker.state is BreakerState.OPEN
+        now.return_value = 125.0
+        assert not breaker.allow_request()
+
+        now.return_value = 132.0
+        assert breaker.allow_request()
+        breaker.record_success()
+        assert breaker.state is BreakerState.CLOSED
+        assert breaker.allow_request()
@@ -101,6 +101,43 @@ async def test_form_duplicate_abort(hass: HomeAssistant) -> None:
     assert result["reason"] == "already_configured"
 
 
+async def test_reauth_flow(hass: HomeAssistant) -> None:
+    """Test reauth stores the new API key and reloads the entry."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOST: "192.168.1.100",
+            CONF_PORT: 8080,
+            CONF_API_KEY: "old-key",
+        },
+    )
+    entry.add_to_hass(hass)
+
+    with (
+        patch(
+            "custom_components.immich_browser.async_setup_entry",
+            return_value=True,
+        ),
+        patch(
+            "custom_components.immich_browser.config_flow._async_validate_connection",
+            return_value=None,
+        ),
+    ):
+        result = await entry.start_reauth_flow(hass)
+        assert result["type"] == FlowResultType.FORM
+        assert result["step_id"] == "reauth_confirm"
+
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"], user_input={CONF_API_KEY: "new-key"}
+        )
+        await hass.async_block_till_done()
+
+    assert result["type"] == FlowResultType.ABORT
+    assert result["reason"] == "reauth_successful"
+    assert entry.data[CONF_API_KEY] == "new-key"
+    assert entry.data[CONF_HOST] == "192.168.1.100"
+
+
 async def test_options_flow(hass: HomeAssistant) -> None:
     """Test the options flow validates, updates entry.data, and reloads."""
     entry = MockConfigEntry(
@@ -1,22 +1,44 @@
 """Tests for Immich Browser coordinator."""
 
-from unittest.mock import AsyncMock, patch
+from typing import Any
+from unittest.mock import MagicMock, patch
 
 import pytest
 
 from homeassistant.const import CONF_API_KEY, CONF_HOST, CONF_PORT
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryAuthFailed
 from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.util import dt as dt_util
 
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
-from custom_components.immich_browser.api import CannotConnectError
+from custom_components.immich_browser.api import (
+    ApiClient,
+    CannotConnectError,
+    InvalidAuthError,
+    ServerError,
+)
 from custom_components.immich_browser.const import DOMAIN
 from custom_components.immich_browser.coordinator import TemplateCoordinator
+from custom_components.immich_browser.index import AssetTimeline
+from custom_components.immich_browser.snapshot import STORAGE_VERSION, snapshot_source
+from custom_components.immich_browser.sync import _index_full_sync
 
+from .conftest import MOCK_ALBUMS, MOCK_ASSETS, MOCK_STATISTICS, _aiter
 
-async def test_coordinator_update(hass: HomeAssistant) -> None:
-    """Test successful data refresh from mocked API client."""
+
+def _client() -> ApiClient:
+    """Return an API client whose endpoints are patched by mock_immich."""
+    return ApiClient(
+        host="192.168.1.100", port=8080, api_key="test-key", session=MagicMock()
+    )
+
+
+async def test_coordinator_update(
+    hass: HomeAssistant, mock_immich: dict[str, MagicMock]
+) -> None:
+    """Test the first refresh indexes the whole library."""
     entry = MockConfigEntry(
         domain=DOMAIN,
         data={
@@ -27,20 +49,216 @@ async def test_coordinator_update(hass: HomeAssistant) -> None:
     )
     entry.add_to_hass(hass)
 
-    mock_data = {"sensor_value": 42, "status": "ok"}
+    coordinator = TemplateCoordinator(hass, entry, _client())
+    await coordinator.async_refresh()
+
+    assert coordinator.last_update_success
+    assert coordinator.data["asset_count"] == 2
+    assert coordinator.data["album_count"] == 1
+    assert coordinator.last_delta.full
+    assert coordinator.last_delta.added == {"asset-1", "asset-2"}
+    mock_immich["async_delta_sync"].assert_not_awaited()
+
+    record = coordinator.library.assets["asset-1"]
+    assert record.albums == ("album-1",)
+    assert record.thumbhash == MOCK_ASSETS[0]["thumbhash"]
+    assert not hasattr(record, "__dict__")
+
+
+async def test_coordinator_offloads_large_index(
+    hass: HomeAssistant, mock_immich: dict[str, MagicMock]
+) -> None:
+    """Test index rebuilds past the threshold run in the executor."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOST: "192.168.1.100",
+            CONF_PORT: 8080,
+            CONF_API_KEY: "test-key",
+        },
+    )
+    entry.add_to_hass(hass)
 
-    with patch(
-        "custom_components.immich_browser.coordinator.ApiClient.async_get_data",
-        new_callable=AsyncMock,
-        return_value=mock_data,
+    with (
+        patch("custom_components.immich_browser.sync.INDEX_OFFLOAD_MIN_ASSETS", 1),
+        patch.object(
+            hass, "async_add_executor_job", wraps=hass.async_add_executor_job
+        ) as executor,
     ):
-        coordinator = TemplateCoordinator(hass, entry)
+        coordinator = TemplateCoordinator(hass, entry, _client())
         await coordinator.async_refresh()
 
-    assert coordinator.data == mock_data
+    assert coordinator.last_update_success
+    assert coordinator.data["asset_count"] == 2
+    assert coordinator.last_delta.added == {"asset-1", "asset-2"}
+    assert coordinator.library.recent.asset_ids() == ["asset-2", "asset-1"]
+    assert coordinator.library.album_assets["album-1"].asset_ids()
+    targets = [call.args[0] for call in executor.call_args_list]
+    assert _index_full_sync in targets
+    assert AssetTimeline in targets
+
+
+async def test_coordinator_delta_update(
+    hass: HomeAssistant, mock_immich: dict[str, MagicMock]
+) -> None:
+    """Test later refreshes only merge the changes since the watermark."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOST: "192.168.1.100",
+            CONF_PORT: 8080,
+            CONF_API_KEY: "test-key",
+        },
+    )
+    entry.add_to_hass(hass)
+
+    coordinator = TemplateCoordinator(hass, entry, _client())
+    await coordinator.async_refresh()
+    assert coordinator.library.watermark == "2024-07-02T11:00:00.000Z"
+
+    new_asset = {
+        **MOCK_ASSETS[0],
+        "id": "asset-3",
+        "updatedAt": "2024-07-05T09:00:00.000Z",
+    }
+    mock_immich["async_delta_sync"].return_value = {
+        "needsFullSync": False,
+        "upserted": [new_asset],
+        "deleted": ["asset-2"],
+    }
+    await coordinator.async_refresh()
+
+    mock_immich["async_delta_sync"].assert_awaited_once_with(
+        "user-1", "2024-07-02T11:00:00.000Z"
+    )
+    assert mock_immich["async_iter_full_sync"].call_count == 1
+    assert coordinator.last_delta.added == {"asset-3"}
+    assert coordinator.last_delta.removed == {"asset-2"}
+    assert set(coordinator.library.assets) == {"asset-1", "asset-3"}
+    assert coordinator.library.watermark == "2024-07-05T09:00:00.000Z"
+    assert [asset_id for _, asset_id in coordinator.library.iter_recent()] == [
+        "asset-3",
+        "asset-1",
+    ]
+    page = coordinator.library.album_page("album-1", None, 10)
+    assert page["total"] == 1
+    assert [asset["id"] for asset in page["assets"]] == ["asset-1"]
+
+
+async def test_full_sync_rekeys_album_timelines(
+    hass: HomeAssistant, mock_immich: dict[str, MagicMock]
+) -> None:
+    """Test a date change seen by a full sync moves the asset in its albums."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOST: "192.168.1.100",
+            CONF_PORT: 8080,
+            CONF_API_KEY: "test-key",
+        },
+    )
+    entry.add_to_hass(hass)
+
+    coordinator = TemplateCoordinator(hass, entry, _client())
+    await coordinator.async_refresh()
+
+    moved = {
+        **MOCK_ASSETS[0],
+        "fileCreatedAt": "2024-07-03T10:00:00.000Z",
+        "updatedAt": "2024-07-04T11:00:00.000Z",
+    }
+    mock_immich["async_delta_sync"].return_value = {"needsFullSync": True}
+    mock_immich["async_iter_full_sync"].side_effect = lambda *args: _aiter(
+        [moved, MOCK_ASSETS[1]]
+    )
+    await coordinator.async_refresh()
+    assert coordinator.last_delta.full
+    assert coordinator.last_delta.changed == {"asset-1"}
+
+    mock_immich["async_delta_sync"].return_value = {
+        "needsFullSync": False,
+        "upserted": [{**moved, "updatedAt": "2024-07-05T11:00:00.000Z"}],
+        "deleted": [],
+    }
+    await coordinator.async_refresh()
+
+    page = coordinator.library.album_page("album-1", None, 10)
+    assert page["total"] == 2
+    assert [asset["id"] for asset in page["assets"]] == ["asset-1", "asset-2"]
+
+
+async def test_coordinator_retries_album_changes_after_failure(
+    hass: HomeAssistant, mock_immich: dict[str, MagicMock]
+) -> None:
+    """Test an album change seen by a failed pass is fetched on the next one."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOST: "192.168.1.100",
+            CONF_PORT: 8080,
+            CONF_API_KEY: "test-key",
+        },
+    )
+    entry.add_to_hass(hass)
+
+    coordinator = TemplateCoordinator(hass, entry, _client())
+    await coordinator.async_refresh()
+    album_assets = mock_immich["async_iter_album_assets"]
+    album_assets.reset_mock()
+
+    mock_immich["async_get_albums"].return_value = [
+        {**MOCK_ALBUMS[0], "updatedAt": "2024-07-06T10:00:00.000Z"}
+    ]
+    mock_immich["async_delta_sync"].side_effect = CannotConnectError("Timeout")
+    with pytest.raises(UpdateFailed):
+        await coordinator._async_update_data()
+    album_assets.assert_not_called()
+
+    mock_immich["async_delta_sync"].side_effect = None
+    await coordinator.async_refresh()
+    album_assets.assert_called_once_with("album-1")
+    assert coordinator.last_delta.albums_changed == {"album-1"}
+    assert coordinator.library.albums["album-1"]["updatedAt"] == (
+        "2024-07-06T10:00:00.000Z"
+    )
+
+
+async def test_coordinator_interval_adapts(
+    hass: HomeAssistant, mock_immich: dict[str, MagicMock]
+) -> None:
+    """Test idle polls back off and a poll with changes speeds back up."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOST: "192.168.1.100",
+            CONF_PORT: 8080,
+            CONF_API_KEY: "test-key",
+        },
+    )
+    entry.add_to_hass(hass)
+
+    coordinator = TemplateCoordinator(hass, entry, _client())
+    await coordinator.async_refresh()
+    fast = coordinator.update_interval
+
+    await coordinator.async_refresh()
+    await coordinator.async_refresh()
+    assert coordinator.interval.idle_polls == 2
+    assert coordinator.update_interval > fast * 3
 
+    mock_immich["async_delta_sync"].return_value = {
+        "needsFullSync": False,
+        "upserted": [],
+        "deleted": ["asset-1"],
+    }
+    await coordinator.async_refresh()
+    assert coordinator.interval.idle_polls == 0
+    assert coordinator.update_interval.total_seconds() < 12
 
-async def test_coordinator_update_failed(hass: HomeAssistant) -> None:
+
+async def test_coordinator_update_failed(
+    hass: HomeAssistant, mock_immich: dict[str, MagicMock]
+) -> None:
     """Test failed refresh raises UpdateFailed when API is unreachable."""
     entry = MockConfigEntry(
         domain=DOMAIN,
@@ -52,11 +270,151 @@ async def test_coordinator_update_failed(hass: HomeAssistant) -> None:
     )
     entry.add_to_hass(hass)
 
-    with patch(
-        "custom_components.immich_browser.coordinator.ApiClient.async_get_data",
-        new_callable=AsyncMock,
-        side_effect=CannotConnectError("Connection refused"),
-    ):
-        coordinator = TemplateCoordinator(hass, entry)
-        with pytest.raises(UpdateFailed):
-            await coordinator.async_refresh()
+    mock_immich["async_get_albums"].side_effect = CannotConnectError(
+        "Connection refused"
+    )
+    coordinator = TemplateCoordinator(hass, entry, _client())
+    with pytest.raises(UpdateFailed):
+        await coordinator._async_update_data()
+
+
+async def test_coordinator_maps_server_and_auth_errors(
+    hass: HomeAssistant, mock_immich: dict[str, MagicMock]
+) -> None:
+    """Test server errors fail the update and a rejected key starts reauth."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOST: "192.168.1.100",
+            CONF_PORT: 8080,
+            CONF_API_KEY: "test-key",
+        },
+    )
+    entry.add_to_hass(hass)
+    coordinator = TemplateCoordinator(hass, entry, _client())
+
+    mock_immich["async_get_albums"].side_effect = ServerError("Malformed JSON")
+    with pytest.raises(UpdateFailed):
+        await coordinator._async_update_data()
+
+    mock_immich["async_get_albums"].side_effect = InvalidAuthError("Invalid API key")
+    with pytest.raises(ConfigEntryAuthFailed):
+        await coordinator._async_update_data()
+
+
+async def test_coordinators_share_entry_client(
+    hass: HomeAssistant, mock_immich: dict[str, MagicMock]
+) -> None:
+    """Test both coordinators use the entry's single API client."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOST: "192.168.1.100",
+            CONF_PORT: 8080,
+            CONF_API_KEY: "test-key",
+        },
+    )
+    entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    runtime = entry.runtime_data
+    assert runtime.coordinator.client is runtime.client
+    assert runtime.coordinator_secondary.client is runtime.client
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    assert runtime.client._session.closed
+
+
+async def test_setup_restores_snapshot(
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+    mock_immich: dict[str, MagicMock],
+) -> None:
+    """Test setup serves the saved index and catches up with a delta sync."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOST: "192.168.1.100",
+            CONF_PORT: 8080,
+            CONF_API_KEY: "test-key",
+        },
+    )
+    entry.add_to_hass(hass)
+
+    coordinator = TemplateCoordinator(hass, entry, _client())
+    await coordinator.async_refresh()
+    hass_storage[f"{DOMAIN}.{entry.entry_id}"] = {
+        "version": STORAGE_VERSION,
+        "key": f"{DOMAIN}.{entry.entry_id}",
+        "data": {
+            "source": snapshot_source(entry.data),
+            "library": coordinator.library.as_snapshot(),
+            "secondary": {
+                **{key: MOCK_STATISTICS[key] for key in ("photos", "videos", "usage")},
+                "photos": MOCK_STATISTICS["photos"] - 30,
+                "sampled_at": dt_util.utcnow().timestamp() - 7200,
+            },
+        },
+    }
+    for mock in mock_immich.values():
+        mock.reset_mock()
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    runtime = entry.runtime_data
+    assert runtime.coordinator.data["asset_count"] == 2
+    # The saved totals seed the rate window for the catch-up poll.
+    assert runtime.coordinator_secondary.data["photos"] == MOCK_STATISTICS["photos"]
+    assert runtime.coordinator_secondary.data["assets_per_hour"] == pytest.approx(
+        15, abs=0.1
+    )
+    assert runtime.coordinator.library.assets["asset-1"].albums == ("album-1",)
+    mock_immich["async_iter_full_sync"].assert_not_called()
+    mock_immich["async_get_my_user"].assert_not_awaited()
+    mock_immich["async_delta_sync"].assert_awaited_once_with(
+        "user-1", "2024-07-02T11:00:00.000Z"
+    )
+
+
+async def test_setup_discards_snapshot_of_other_connection(
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+    mock_immich: dict[str, MagicMock],
+) -> None:
+    """Test a snapshot saved for another API key is not restored."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_HOST: "192.168.1.100",
+            CONF_PORT: 8080,
+            CONF_API_KEY: "test-key",
+        },
+    )
+    entry.add_to_hass(hass)
+
+    coordinator = TemplateCoordinator(hass, entry, _client())
+    await coordinator.async_refresh()
+    hass_storage[f"{DOMAIN}.{entry.entry_id}"] = {
+        "version": STORAGE_VERSION,
+        "key": f"{DOMAIN}.{entry.entry_id}",
+        "data": {
+            "source": snapshot_source({**entry.data, CONF_API_KEY: "old-key"}),
+            "library": {
+                **coordinator.library.as_snapshot(),
+                "user_id": "other-user",
+            },
+        },
+    }
+    for mock in mock_immich.values():
+        mock.reset_mock()
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    mock_immich["async_get_my_user"].assert_awaited_once()
+    mock_immich["async_iter_full_sync"].assert_called_once()
+    mock_immich["async_delta_sync"].assert_not_awaited()
+    assert entry.runtime_data.coordinator.data["asset_count"] == 2
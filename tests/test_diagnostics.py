@@ -0,0 +1,122 @@
+"""Tests for Immich Browser diagnostics and hot-path metrics."""
+
+from unittest.mock import MagicMock
+
+from homeassistant.const import CONF_API_KEY, CONF_HOST, CONF_PORT
+from homeassistant.core import HomeAssistant
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.components.diagnostics import (
+    get_diagnostics_for_config_entry,
+)
+
+from custom_components.immich_browser.const import DOMAIN
+from custom_components.immich_browser.metrics import (
+    LatencyHistogram,
+    MetricsRegistry,
+    endpoint_name,
+)
+
+
+def test_histogram_percentiles() -> None:
+    """Test percentiles interpolate within buckets and stay below the max."""
+    histogram = LatencyHistogram()
+    assert histogram.percentile(50) is None
+    for _ in range(90):
+        histogram.observe(0.004)  # (2, 5] ms bucket
+    for _ in range(10):
+        histogram.observe(0.150)  # (100, 200] ms bucket
+
+    assert 2 < histogram.percentile(50) <= 5
+    assert 100 < histogram.percentile(95) <= 150
+    assert histogram.percentile(99) <= histogram.max_ms == 150
+
+
+def test_registry_collapses_ids_and_caps_endpoints() -> None:
+    """Test asset ids share one endpoint and unknown paths fold into other."""
+    asset_id = "0b7e5a54-8e9c-4e7a-9a31-2f0c4f3a9d10"
+    assert (
+        endpoint_name("GET", f"/api/assets/{asset_id}/thumbnail")
+        == "GET /api/assets/{id}/thumbnail"
+    )
+
+    registry = MetricsRegistry(max_endpoints=2)
+    for name in ("a", "b", "c", "d"):
+        with registry.track(name):
+            pass
+    assert set(registry.as_dict()) == {"a", "b", "other"}
+    assert registry.as_dict()["other"]["requests"] == 2
+    assert registry.summary().count == 4
+
+
+async def test_diagnostics(
+    hass: HomeAssistant,
+    hass_client,
+    hass_ws_client,
+    mock_immich: dict[str, MagicMock],
+) -> None:
+    """Test diagnostics redact the API key and report WebSocket metrics."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_HOST: "192.168.1.100", CONF_PORT: 8080, CONF_API_KEY: "test-key"},
+    )
+    entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    client = await hass_ws_client(hass)
+    await client.send_json({"id": 1, "type": f"{DOMAIN}/get_data"})
+    assert (await client.receive_json())["success"]
+
+    diagnostics = await get_diagnostics_for_config_entry(hass, hass_client, entry)
+
+    assert diagnostics["entry"]["data"][CONF_API_KEY] == "**REDACTED**"
+    assert diagnostics["circuit_breaker"]["state"] == "closed"
+    assert diagnostics["library"]["assets"] == 2
+    get_data = diagnostics["websocket"][f"{DOMAIN}/get_data"]
+    assert get_data["requests"] == 1
+    assert get_data["bytes"] > 0
+    assert get_data["latency"]["p99_ms"] is not None
+    assert diagnostics["thumbnail_cache"]["misses"] == 0
+
+
+async def test_websocket_metrics_count_errors_and_events(
+    hass: HomeAssistant,
+    hass_ws_client,
+    mock_immich: dict[str, MagicMock],
+) -> None:
+    """Test error replies are counted and pushed events are tracked apart."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_HOST: "192.168.1.100", CONF_PORT: 8080, CONF_API_KEY: "test-key"},
+    )
+    entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    client = await hass_ws_client(hass)
+    await client.send_json(
+        {"id": 1, "type": f"{DOMAIN}/album_assets", "album_id": "missing"}
+    )
+    assert not (await client.receive_json())["success"]
+    await client.send_json({"id": 2, "type": f"{DOMAIN}/subscribe"})
+    assert (await client.receive_json())["success"]
+    await client.receive_json()
+
+    mock_immich["async_delta_sync"].return_value = {
+        "needsFullSync": False,
+        "upserted": [],
+        "deleted": ["asset-1"],
+    }
+    await entry.runtime_data.coordinator.async_refresh()
+    assert (await client.receive_json())["event"]["type"] == "delta"
+
+    metrics = entry.runtime_data.metrics.as_dict()
+    album_assets = metrics[f"{DOMAIN}/album_assets"]
+    assert album_assets["requests"] == 1
+    assert album_assets["errors"] == 1
+    assert album_assets["in_flight"] == 0
+    assert metrics[f"{DOMAIN}/subscribe"]["requests"] == 1
+    assert metrics[f"{DOMAIN}/subscribe:event"]["requests"] == 1
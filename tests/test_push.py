@@ -0,0 +1,121 @@
+"""Tests for the Immich Browser push listener against a fake event server."""
+
+import asyncio
+import json
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from custom_components.immich_browser.api import (
+    ApiClient,
+    CannotConnectError,
+    InvalidAuthError,
+)
+from custom_components.immich_browser.push import EVENT_PATH, ImmichEventListener
+
+UPLOADED = {"id": "asset-9", "type": "IMAGE"}
+
+
+def _fake_event_server(
+    reject: bool = False, silent: bool = False
+) -> web.Application:
+    """Return an app speaking just enough Engine.IO v4 to emit two events.
+
+    A ``silent`` server announces a 100 ms ping deadline and never pings.
+    """
+
+    async def _handler(request: web.Request) -> web.WebSocketResponse:
+        websocket = web.WebSocketResponse()
+        await websocket.prepare(request)
+        ping = '"pingInterval":50,"pingTimeout":50' if silent else (
+            '"pingInterval":25000,"pingTimeout":20000'
+        )
+        await websocket.send_str('0{"sid":"s1",' + ping + "}")
+        assert (await websocket.receive_str()) == "40"
+        if silent:
+            await websocket.send_str('40{"sid":"n1"}')
+            await asyncio.sleep(1)
+            await websocket.close()
+            return websocket
+        if reject:
+            await websocket.send_str('44{"message":"Unauthorized"}')
+            await websocket.close()
+            return websocket
+        await websocket.send_str('40{"sid":"n1"}')
+        await websocket.send_str("2")
+        assert (await websocket.receive_str()) == "3"
+        await websocket.send_str("42" + json.dumps(["on_upload_success", UPLOADED]))
+        await websocket.send_str("42" + json.dumps(["on_asset_delete", "asset-1"]))
+        await websocket.send_str("41")
+        await websocket.close()
+        return websocket
+
+    app = web.Application()
+    app.router.add_get(EVENT_PATH, _handler)
+    return app
+
+
+async def _listen(
+    reject: bool = False, silent: bool = False
+) -> tuple[list[tuple[str, Any]], bool]:
+    """Run the listener for one connection and return the events it saw."""
+    events: list[tuple[str, Any]] = []
+    async with (
+        TestServer(_fake_event_server(reject, silent), host="127.0.0.1") as server,
+        aiohttp.ClientSession() as session,
+    ):
+        client = ApiClient(
+            host=server.host, port=server.port, api_key="key", session=session
+        )
+        listener = ImmichEventListener(
+            client, lambda name, payload: events.append((name, payload))
+        )
+        await asyncio.wait_for(listener.async_listen(), timeout=5)
+    return events, listener.connected
+
+
+async def test_listener_receives_events() -> None:
+    """Test events from the fake server reach the callback in order."""
+    events, connected = await _listen()
+
+    assert connected
+    assert events == [
+        ("on_upload_success", UPLOADED),
+        ("on_asset_delete", "asset-1"),
+    ]
+
+
+async def test_listener_connect_error() -> None:
+    """Test a refused namespace connection surfaces as an auth error."""
+    with pytest.raises(InvalidAuthError):
+        await _listen(reject=True)
+
+
+async def test_listener_detects_missing_pings() -> None:
+    """Test a socket that stops pinging past the server's deadline is dropped."""
+    with pytest.raises(CannotConnectError, match="No ping"):
+        await _listen(silent=True)
+
+
+async def test_listener_reconnects_after_unexpected_errors() -> None:
+    """Test errors outside the API error types do not end the run loop."""
+    listener = ImmichEventListener(MagicMock(), lambda name, payload: None)
+    listener.async_listen = AsyncMock(
+        side_effect=[
+            ValueError("bad packet"),
+            aiohttp.ClientError("reset"),
+            ConnectionResetError(),
+            asyncio.CancelledError(),
+        ]
+    )
+
+    with (
+        patch("custom_components.immich_browser.push.asyncio.sleep", AsyncMock()),
+        pytest.raises(asyncio.CancelledError),
+    ):
+        await listener.async_run()
+    assert listener.async_listen.await_count == 4
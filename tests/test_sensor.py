@@ -1,82 +1,186 @@
 """Tests for Immich Browser sensor platform."""
 
-from unittest.mock import AsyncMock, patch
+from unittest.mock import MagicMock, patch
 
+import pytest
+
+from homeassistant.config_entries import ConfigEntryState
 from homeassistant.const import CONF_API_KEY, CONF_HOST, CONF_PORT
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
 
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
+from custom_components.immich_browser.api import InvalidAuthError, ServerError
 from custom_components.immich_browser.const import DOMAIN
+from custom_components.immich_browser.rates import RateWindow
+
+from .conftest import MOCK_STATISTICS
 
 
-async def test_sensor_value(hass: HomeAssistant) -> None:
-    """Test sensor entity reports correct state from coordinator data."""
+async def test_statistics_sensors(
+    hass: HomeAssistant, mock_immich: dict[str, MagicMock]
+) -> None:
+    """Test the statistics sensors report one statistics fetch per poll."""
     entry = MockConfigEntry(
         domain=DOMAIN,
         data={CONF_HOST: "192.168.1.100", CONF_PORT: 8080, CONF_API_KEY: "test-key"},
     )
     entry.add_to_hass(hass)
 
-    mock_data = {"status": "ok"}
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    prefix = f"sensor.{entry.title.lower().replace(' ', '_')}"
+    assert hass.states.get(f"{prefix}_photos").state == "19925"
+    assert hass.states.get(f"{prefix}_videos").state == "234"
+    assert hass.states.get(f"{prefix}_albums").state == "1"
+    storage = hass.states.get(f"{prefix}_storage_used")
+    assert float(storage.state) == pytest.approx(156.42)
+    assert storage.attributes["unit_of_measurement"] == "GB"
+    # One sample so far: the rates need a second poll.
+    assert hass.states.get(f"{prefix}_assets_added_per_hour").state == "unknown"
+    mock_immich["async_get_statistics"].assert_awaited_once()
+
+
+async def test_statistics_fall_back_without_admin_key(
+    hass: HomeAssistant, mock_immich: dict[str, MagicMock]
+) -> None:
+    """Test a 403 from server statistics falls back to the user's counts."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_HOST: "192.168.1.100", CONF_PORT: 8080, CONF_API_KEY: "test-key"},
+    )
+    entry.add_to_hass(hass)
+    mock_immich["async_get_statistics"].side_effect = InvalidAuthError(
+        "Authentication failed (HTTP 403)"
+    )
 
-    with patch(
-        "custom_components.immich_browser.coordinator.ApiClient.async_get_data",
-        new_callable=AsyncMock,
-        return_value=mock_data,
-    ):
-        assert await hass.config_entries.async_setup(entry.entry_id)
-        await hass.async_block_till_done()
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
 
-    state = hass.states.get(f"sensor.{entry.title.lower().replace(' ', '_')}_status")
-    assert state is not None
-    assert state.state == "ok"
+    assert entry.state is ConfigEntryState.LOADED
+    prefix = f"sensor.{entry.title.lower().replace(' ', '_')}"
+    assert hass.states.get(f"{prefix}_photos").state == "812"
+    assert hass.states.get(f"{prefix}_videos").state == "40"
+    assert hass.states.get(f"{prefix}_storage_used").state == "unknown"
 
+    await entry.runtime_data.coordinator_secondary.async_refresh()
+    mock_immich["async_get_statistics"].assert_awaited_once()
+    assert mock_immich["async_get_asset_statistics"].await_count == 2
 
-async def test_sensor_unique_id(hass: HomeAssistant) -> None:
-    """Test sensor entity has correct unique_id format."""
+
+async def test_statistics_failure_does_not_block_setup(
+    hass: HomeAssistant, mock_immich: dict[str, MagicMock]
+) -> None:
+    """Test setup completes with unavailable statistics sensors."""
     entry = MockConfigEntry(
         domain=DOMAIN,
         data={CONF_HOST: "192.168.1.100", CONF_PORT: 8080, CONF_API_KEY: "test-key"},
     )
     entry.add_to_hass(hass)
+    mock_immich["async_get_statistics"].side_effect = ServerError(
+        "Server returned HTTP 500: Internal Server Error", status=500
+    )
 
-    mock_data = {"status": "ok"}
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
 
-    with patch(
-        "custom_components.immich_browser.coordinator.ApiClient.async_get_data",
-        new_callable=AsyncMock,
-        return_value=mock_data,
-    ):
-        assert await hass.config_entries.async_setup(entry.entry_id)
-        await hass.async_block_till_done()
+    assert entry.state is ConfigEntryState.LOADED
+    prefix = f"sensor.{entry.title.lower().replace(' ', '_')}"
+    assert hass.states.get(f"{prefix}_photos").state == "unavailable"
+    assert hass.states.get(f"{prefix}_albums").state == "1"
 
-    entity_registry = hass.helpers.entity_registry.async_get(hass)
+
+async def test_sensor_unique_id(
+    hass: HomeAssistant, mock_immich: dict[str, MagicMock]
+) -> None:
+    """Test sensor entities have the correct unique_id format."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_HOST: "192.168.1.100", CONF_PORT: 8080, CONF_API_KEY: "test-key"},
+    )
+    entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    entity_registry = er.async_get(hass)
     entity = entity_registry.async_get(
-        f"sensor.{entry.title.lower().replace(' ', '_')}_status"
+        f"sensor.{entry.title.lower().replace(' ', '_')}_photos"
     )
     assert entity is not None
-    assert entity.unique_id == f"{entry.entry_id}_status"
+    assert entity.unique_id == f"{entry.entry_id}_photos"
 
 
-async def test_binary_sensor_online(hass: HomeAssistant) -> None:
-    """Test binary sensor shows on when coordinator succeeds."""
+async def test_sensors_write_only_changed_values(
+    hass: HomeAssistant, mock_immich: dict[str, MagicMock]
+) -> None:
+    """Test polls with unchanged totals do not write state, and rates derive."""
     entry = MockConfigEntry(
         domain=DOMAIN,
         data={CONF_HOST: "192.168.1.100", CONF_PORT: 8080, CONF_API_KEY: "test-key"},
     )
     entry.add_to_hass(hass)
 
-    with patch(
-        "custom_components.immich_browser.coordinator.ApiClient.async_get_data",
-        new_callable=AsyncMock,
-        return_value={"status": "ok"},
-    ):
-        assert await hass.config_entries.async_setup(entry.entry_id)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    prefix = f"sensor.{entry.title.lower().replace(' ', '_')}"
+    coordinator = entry.runtime_data.coordinator_secondary
+    photos = hass.states.get(f"{prefix}_photos")
+    sampled_at = coordinator.sampled_at
+    utcnow = "custom_components.immich_browser.coordinator_secondary.dt_util.utcnow"
+
+    with patch(utcnow, return_value=dt_util.utc_from_timestamp(sampled_at)):
+        await coordinator.async_refresh()
         await hass.async_block_till_done()
+    assert hass.states.get(f"{prefix}_photos").last_reported == photos.last_reported
+
+    mock_immich["async_get_statistics"].return_value = {
+        **MOCK_STATISTICS,
+        "photos": MOCK_STATISTICS["photos"] + 12,
+    }
+    with patch(utcnow, return_value=dt_util.utc_from_timestamp(sampled_at + 1800)):
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+
+    assert hass.states.get(f"{prefix}_photos").state == "19937"
+    assert hass.states.get(f"{prefix}_assets_added_per_hour").state == "24.0"
+    assert hass.states.get(f"{prefix}_storage_growth_per_day").state == "0.0"
+
+
+def test_rate_window_drops_old_samples() -> None:
+    """Test the rate only spans samples inside the window."""
+    window = RateWindow(3600)
+    assert window.rate() is None
+    window.add(0, 100)
+    window.add(1800, 160)
+    assert window.rate(3600) == 120
+    window.add(5400, 190)
+    assert len(window) == 2
+    assert window.rate(3600) == 30
+    window.add(5400, 500)
+    assert window.rate(3600) == 30
+
+
+async def test_binary_sensor_online(
+    hass: HomeAssistant, mock_immich: dict[str, MagicMock]
+) -> None:
+    """Test binary sensor shows on when coordinator succeeds."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_HOST: "192.168.1.100", CONF_PORT: 8080, CONF_API_KEY: "test-key"},
+    )
+    entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
 
     state = hass.states.get(
         f"binary_sensor.{entry.title.lower().replace(' ', '_')}_status"
     )
     assert state is not None
     assert state.state == "on"
+    assert state.attributes["circuit_breaker"] == "closed"
@@ -0,0 +1,305 @@
+"""Tests for the Immich Browser thumbnail proxy and cache."""
+
+import asyncio
+import io
+import struct
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from PIL import Image
+
+from homeassistant.const import CONF_API_KEY, CONF_HOST, CONF_PORT
+from homeassistant.core import HomeAssistant
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.immich_browser.breaker import CircuitBreaker
+from custom_components.immich_browser.const import DOMAIN
+from custom_components.immich_browser.models import AssetRecord
+from custom_components.immich_browser.prefetch import ThumbnailPrefetcher
+from custom_components.immich_browser.resize import resize_to_webp
+from custom_components.immich_browser.thumbnails import (
+    DATA_THUMBNAIL_CACHE,
+    ThumbnailCache,
+    thumbnail_key,
+)
+
+ASSET_ID = "0b7e5a54-8e9c-4e7a-9a31-2f0c4f3a9d10"
+OTHER_ASSET_ID = "5d2c8e10-7f3b-4a61-8c0e-9b1a2d3c4e5f"
+
+
+def _unpack_bundle(body: bytes) -> dict[str, tuple[str, bytes]]:
+    """Return the items of a thumbnail bundle by asset id."""
+    items: dict[str, tuple[str, bytes]] = {}
+    offset = 0
+    while offset < len(body):
+        id_length, type_length, data_length = struct.unpack_from(">HHI", body, offset)
+        offset += 8
+        asset_id = body[offset : offset + id_length].decode()
+        offset += id_length
+        content_type = body[offset : offset + type_length].decode()
+        offset += type_length
+        items[asset_id] = (content_type, body[offset : offset + data_length])
+        offset += data_length
+    return items
+
+
+async def test_cache_evicts_least_recently_used(hass: HomeAssistant, tmp_path) -> None:
+    """Test the cache stays under its byte budget by evicting the LRU entry."""
+    cache = ThumbnailCache(hass, tmp_path, max_bytes=10)
+    await cache.async_load()
+
+    await cache.async_put("a", b"aaaa", "image/webp")
+    await cache.async_put("b", b"bbbb", "image/webp")
+    assert await cache.async_get("a") is not None  # "b" is now least recent
+    await cache.async_put("c", b"cccc", "image/webp")
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert cache.total_bytes == 8
+    assert not (tmp_path / "b.webp").exists()
+
+    reloaded = ThumbnailCache(hass, tmp_path, max_bytes=10)
+    await reloaded.async_load()
+    assert len(reloaded) == 2
+
+
+async def test_cache_coalesces_concurrent_fetches(
+    hass: HomeAssistant, tmp_path
+) -> None:
+    """Test concurrent misses of one key share a fetch and writes cannot race."""
+    cache = ThumbnailCache(hass, tmp_path, max_bytes=1024)
+    await cache.async_load()
+    client = MagicMock()
+    client.async_get_thumbnail = AsyncMock(return_value=(b"new", "image/webp"))
+
+    results = await asyncio.gather(
+        cache.async_fetch(client, "a", "thumbnail"),
+        cache.async_fetch(client, "a", "thumbnail"),
+    )
+    assert client.async_get_thumbnail.await_count == 1
+    assert [data for _, data in results] == [b"new", b"new"]
+
+    await asyncio.gather(
+        cache.async_put("b", b"one", "image/webp"),
+        cache.async_put("b", b"two", "image/webp"),
+    )
+    assert "b" in cache
+    assert cache.total_bytes == 6
+    assert not list(tmp_path.glob("*.tmp"))
+
+    with patch.object(ThumbnailCache, "_write", side_effect=OSError("No space left")):
+        entry, data = await cache.async_fetch(client, "c", "thumbnail")
+    assert data == b"new"
+    assert entry.etag
+    assert "c_thumbnail" not in cache
+
+
+async def test_thumbnail_view_caches_upstream(
+    hass: HomeAssistant, hass_client, mock_immich: dict[str, MagicMock]
+) -> None:
+    """Test repeat thumbnail requests are served without hitting Immich."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_HOST: "192.168.1.100", CONF_PORT: 8080, CONF_API_KEY: "test-key"},
+    )
+    entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    client = await hass_client()
+    with patch(
+        "custom_components.immich_browser.api.ApiClient.async_get_thumbnail",
+        new_callable=AsyncMock,
+        return_value=(b"webp-bytes", "image/webp"),
+    ) as mock_thumbnail:
+        first = await client.get(f"/api/{DOMAIN}/thumbnail/{ASSET_ID}")
+        assert first.status == 200
+        assert await first.read() == b"webp-bytes"
+        etag = first.headers["ETag"]
+        assert "max-age" in first.headers["Cache-Control"]
+
+        second = await client.get(f"/api/{DOMAIN}/thumbnail/{ASSET_ID}")
+        assert second.status == 200
+        assert second.headers["ETag"] == etag
+
+        revalidated = await client.get(
+            f"/api/{DOMAIN}/thumbnail/{ASSET_ID}",
+            headers={"If-None-Match": etag},
+        )
+        assert revalidated.status == 304
+
+    assert mock_thumbnail.await_count == 1
+
+
+async def test_prefetch_follows_latest_page(hass: HomeAssistant, tmp_path) -> None:
+    """Test a new page replaces the owner's queue and cached assets are skipped."""
+    cache = ThumbnailCache(hass, tmp_path, max_bytes=1024)
+    await cache.async_load()
+    await cache.async_put("cached_thumbnail_abc", b"old", "image/webp")
+    client = MagicMock()
+    client.breaker = CircuitBreaker()
+    client.async_get_thumbnail = AsyncMock(return_value=(b"new", "image/webp"))
+    prefetcher = ThumbnailPrefetcher(hass, cache, workers=1, max_pending=3)
+
+    def _records(*asset_ids: str) -> list[AssetRecord]:
+        return [
+            AssetRecord(asset_id, "IMAGE", "", None, None, checksum="abc")
+            for asset_id in asset_ids
+        ]
+
+    prefetcher.async_schedule("card", client, _records("a", "b"), "thumbnail")
+    prefetcher.async_schedule("card", client, _records("cached", "c", "d"), "thumbnail")
+    prefetcher.async_schedule("other", client, _records("e", "f"), "thumbnail")
+    assert prefetcher.pending == 3
+    prefetcher.async_cancel("other")
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    fetched = [call.args[0] for call in client.async_get_thumbnail.await_args_list]
+    assert fetched == ["c"]
+    assert "c_thumbnail_abc" in cache
+
+
+async def test_prefetch_survives_disk_errors(hass: HomeAssistant, tmp_path) -> None:
+    """Test a failed cache write skips that thumbnail and prefetching goes on."""
+    cache = ThumbnailCache(hass, tmp_path, max_bytes=1024)
+    await cache.async_load()
+    client = MagicMock()
+    client.breaker = CircuitBreaker()
+    prefetcher = ThumbnailPrefetcher(hass, cache, workers=1)
+    records = [
+        AssetRecord(asset_id, "IMAGE", "", None, None, checksum="abc")
+        for asset_id in ("a", "b")
+    ]
+
+    with patch.object(
+        cache, "async_fetch", AsyncMock(side_effect=[OSError("No space"), None])
+    ) as fetch:
+        prefetcher.async_schedule(("card", "album-1"), client, records, "thumbnail")
+        await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert fetch.await_count == 2
+    assert prefetcher.pending == 0
+
+
+def _jpeg(width: int, height: int) -> bytes:
+    """Return a JPEG of the given size."""
+    output = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 120, 40)).save(output, "JPEG")
+    return output.getvalue()
+
+
+def test_resize_covers_bucket_without_upscaling() -> None:
+    """Test the short edge is scaled to the bucket and never enlarged."""
+    with Image.open(io.BytesIO(resize_to_webp(_jpeg(1440, 1080), 256))) as image:
+        assert image.format == "WEBP"
+        assert image.size == (341, 256)
+    with Image.open(io.BytesIO(resize_to_webp(_jpeg(250, 188), 256))) as image:
+        assert image.size == (250, 188)
+
+
+def test_thumbnail_key_includes_checksum() -> None:
+    """Test an edited asset (new checksum) gets a new, filename-safe key."""
+    assert thumbnail_key(ASSET_ID, "256") == f"{ASSET_ID}_256"
+    assert thumbnail_key(ASSET_ID, "256", "q+/w==") == f"{ASSET_ID}_256_q-_w"
+
+
+async def test_thumbnail_view_resizes_bucket(
+    hass: HomeAssistant, hass_client, mock_immich: dict[str, MagicMock]
+) -> None:
+    """Test a bucket size is cut from the preview and served as WebP."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_HOST: "192.168.1.100", CONF_PORT: 8080, CONF_API_KEY: "test-key"},
+    )
+    entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    preview = _jpeg(1440, 1920)
+    mock_immich["async_get_thumbnail"].return_value = (preview, "image/jpeg")
+    client = await hass_client()
+    response = await client.get(
+        f"/api/{DOMAIN}/thumbnail/{ASSET_ID}", params={"size": "512"}
+    )
+
+    assert response.status == 200
+    assert response.content_type == "image/webp"
+    body = await response.read()
+    assert len(body) < len(preview)
+    with Image.open(io.BytesIO(body)) as image:
+        assert image.size == (512, 683)
+    mock_immich["async_get_thumbnail"].assert_awaited_once_with(ASSET_ID, "preview")
+    resize_stats = hass.data[DATA_THUMBNAIL_CACHE].metrics.as_dict()
+    assert resize_stats["resize 512"]["requests"] == 1
+    assert not any(
+        name.startswith("resize")
+        for name in entry.runtime_data.client.metrics.as_dict()
+    )
+
+
+async def test_thumbnail_bundle_serves_cached_and_fetches_misses(
+    hass: HomeAssistant, hass_client, mock_immich: dict[str, MagicMock]
+) -> None:
+    """Test one bundle request returns cached and freshly fetched thumbnails."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_HOST: "192.168.1.100", CONF_PORT: 8080, CONF_API_KEY: "test-key"},
+    )
+    entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    client = await hass_client()
+    assert (await client.get(f"/api/{DOMAIN}/thumbnail/{ASSET_ID}")).status == 200
+    fetch = mock_immich["async_get_thumbnail"]
+    fetch.reset_mock()
+
+    response = await client.post(
+        f"/api/{DOMAIN}/thumbnails",
+        json={"asset_ids": [ASSET_ID, OTHER_ASSET_ID, ASSET_ID]},
+    )
+    assert response.status == 200
+    items = _unpack_bundle(await response.read())
+
+    assert items == {
+        ASSET_ID: ("image/webp", b"webp-bytes"),
+        OTHER_ASSET_ID: ("image/webp", b"webp-bytes"),
+    }
+    fetch.assert_awaited_once_with(OTHER_ASSET_ID, "thumbnail")
+
+    invalid = await client.post(
+        f"/api/{DOMAIN}/thumbnails", json={"asset_ids": ["../etc/passwd"]}
+    )
+    assert invalid.status == 400
+
+
+async def test_thumbnail_bundle_serves_items_that_fail_to_cache(
+    hass: HomeAssistant, hass_client, mock_immich: dict[str, MagicMock]
+) -> None:
+    """Test a disk error still serves the fetched item and completes the bundle."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_HOST: "192.168.1.100", CONF_PORT: 8080, CONF_API_KEY: "test-key"},
+    )
+    entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    client = await hass_client()
+    with patch.object(
+        ThumbnailCache, "_write", side_effect=[OSError("No space left"), None]
+    ):
+        response = await client.post(
+            f"/api/{DOMAIN}/thumbnails",
+            json={"asset_ids": [ASSET_ID, OTHER_ASSET_ID]},
+        )
+        assert response.status == 200
+        items = _unpack_bundle(await response.read())
+
+    assert set(items) == {ASSET_ID, OTHER_ASSET_ID}
+    assert len(hass.data[DATA_THUMBNAIL_CACHE]) == 1
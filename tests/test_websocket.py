@@ -1,6 +1,6 @@
 """Tests for Immich Browser WebSocket commands."""
 
-from unittest.mock import AsyncMock, patch
+from unittest.mock import MagicMock, patch
 
 from homeassistant.const import CONF_API_KEY, CONF_HOST, CONF_PORT
 from homeassistant.core import HomeAssistant
@@ -8,9 +8,14 @@ from homeassistant.core import HomeAssistant
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
 from custom_components.immich_browser.const import DOMAIN
+from custom_components.immich_browser.prefetch import DATA_PREFETCHER
 
+from .conftest import MOCK_ASSETS, MOCK_STATISTICS
 
-async def test_websocket_get_data(hass: HomeAssistant, hass_ws_client) -> None:
+
+async def test_websocket_get_data(
+    hass: HomeAssistant, hass_ws_client, mock_immich: dict[str, MagicMock]
+) -> None:
     """Test the WebSocket get_data command returns coordinator data."""
     entry = MockConfigEntry(
         domain=DOMAIN,
@@ -18,17 +23,200 @@ async def test_websocket_get_data(hass: HomeAssistant, hass_ws_client) -> None:
     )
     entry.add_to_hass(hass)
 
-    with patch(
-        "custom_components.immich_browser.coordinator.ApiClient.async_get_data",
-        new_callable=AsyncMock,
-        return_value={"sensor_value": 42},
-    ):
-        assert await hass.config_entries.async_setup(entry.entry_id)
-        await hass.async_block_till_done()
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
 
     client = await hass_ws_client(hass)
     await client.send_json({"id": 1, "type": f"{DOMAIN}/get_data"})
     result = await client.receive_json()
 
     assert result["success"] is True
-    assert result["result"] == {"sensor_value": 42}
+    assert result["result"]["asset_count"] == 2
+    assert result["result"]["albums"][0]["albumName"] == "Holidays"
+
+
+async def test_websocket_album_assets_pages(
+    hass: HomeAssistant, hass_ws_client, mock_immich: dict[str, MagicMock]
+) -> None:
+    """Test album_assets walks an album newest first with a cursor."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_HOST: "192.168.1.100", CONF_PORT: 8080, CONF_API_KEY: "test-key"},
+    )
+    entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    client = await hass_ws_client(hass)
+    await client.send_json(
+        {"id": 1, "type": f"{DOMAIN}/album_assets", "album_id": "album-1", "page_size": 1}
+    )
+    first = await client.receive_json()
+    assert first["success"] is True
+    assert first["result"]["total"] == 2
+    assert [a["id"] for a in first["result"]["assets"]] == ["asset-2"]
+    assert first["result"]["next_cursor"] is not None
+
+    # The rest of the album is warmed in the thumbnail cache behind the page.
+    await hass.async_block_till_done(wait_background_tasks=True)
+    mock_immich["async_get_thumbnail"].assert_awaited_once_with("asset-1", "thumbnail")
+
+    await client.send_json(
+        {
+            "id": 2,
+            "type": f"{DOMAIN}/album_assets",
+            "album_id": "album-1",
+            "page_size": 1,
+            "cursor": first["result"]["next_cursor"],
+        }
+    )
+    second = await client.receive_json()
+    assert [a["id"] for a in second["result"]["assets"]] == ["asset-1"]
+    assert second["result"]["assets"][0]["thumbhash"] == "1QcSHQRnh493V4dIh4eXh1h4kJUI"
+    assert second["result"]["next_cursor"] is None
+
+    await client.send_json(
+        {"id": 3, "type": f"{DOMAIN}/album_assets", "album_id": "missing"}
+    )
+    missing = await client.receive_json()
+    assert missing["success"] is False
+    assert missing["error"]["code"] == "not_found"
+
+
+async def test_websocket_cancel_prefetch(
+    hass: HomeAssistant, hass_ws_client, mock_immich: dict[str, MagicMock]
+) -> None:
+    """Test a card leaving the view drops its album's queued thumbnails."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_HOST: "192.168.1.100", CONF_PORT: 8080, CONF_API_KEY: "test-key"},
+    )
+    entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    prefetcher = hass.data[DATA_PREFETCHER]
+    client = await hass_ws_client(hass)
+    with (
+        patch.object(prefetcher, "async_schedule") as schedule,
+        patch.object(prefetcher, "async_cancel") as cancel,
+    ):
+        await client.send_json(
+            {"id": 1, "type": f"{DOMAIN}/album_assets", "album_id": "album-1", "page_size": 1}
+        )
+        assert (await client.receive_json())["success"] is True
+        owner = schedule.call_args.args[0]
+        cancel.assert_not_called()
+
+        await client.send_json(
+            {"id": 2, "type": f"{DOMAIN}/cancel_prefetch", "album_id": "album-1"}
+        )
+        assert (await client.receive_json())["success"] is True
+
+    cancel.assert_called_once_with(owner)
+    assert owner[1] == "album-1"
+
+
+async def test_websocket_subscribe_pushes_deltas(
+    hass: HomeAssistant, hass_ws_client, mock_immich: dict[str, MagicMock]
+) -> None:
+    """Test subscribers get a snapshot, then only what each poll changed."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_HOST: "192.168.1.100", CONF_PORT: 8080, CONF_API_KEY: "test-key"},
+    )
+    entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    coordinator = entry.runtime_data.coordinator
+    listeners = len(coordinator._listeners)
+    client = await hass_ws_client(hass)
+    await client.send_json({"id": 1, "type": f"{DOMAIN}/subscribe"})
+    assert (await client.receive_json())["success"] is True
+    snapshot = await client.receive_json()
+    assert snapshot["event"]["type"] == "snapshot"
+    assert snapshot["event"]["data"]["asset_count"] == 2
+    assert snapshot["event"]["secondary"]["photos"] == MOCK_STATISTICS["photos"]
+
+    mock_immich["async_delta_sync"].return_value = {
+        "needsFullSync": False,
+        "upserted": [{**MOCK_ASSETS[0], "id": "asset-3"}],
+        "deleted": ["asset-2"],
+    }
+    await coordinator.async_refresh()
+    delta = (await client.receive_json())["event"]
+    assert delta["type"] == "delta"
+    assert [asset["id"] for asset in delta["added"]] == ["asset-3"]
+    assert delta["removed"] == ["asset-2"]
+    assert delta["asset_count"] == 2
+
+    await client.send_json(
+        {"id": 2, "type": "unsubscribe_events", "subscription": 1}
+    )
+    assert (await client.receive_json())["success"] is True
+    assert len(coordinator._listeners) == listeners
+
+
+async def test_websocket_recent_assets_merges_entries(
+    hass: HomeAssistant, hass_ws_client, mock_immich: dict[str, MagicMock]
+) -> None:
+    """Test recent_assets routes by entry_id and merges all libraries without it."""
+    entries = [
+        MockConfigEntry(
+            domain=DOMAIN,
+            data={CONF_HOST: host, CONF_PORT: 8080, CONF_API_KEY: "test-key"},
+        )
+        for host in ("192.168.1.100", "192.168.1.101")
+    ]
+    for entry in entries:
+        entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    client = await hass_ws_client(hass)
+    await client.send_json(
+        {"id": 1, "type": f"{DOMAIN}/recent_assets", "page_size": 3}
+    )
+    first = (await client.receive_json())["result"]
+    assert [asset["id"] for asset in first["assets"]] == [
+        "asset-2",
+        "asset-2",
+        "asset-1",
+    ]
+    assert {asset["entry_id"] for asset in first["assets"][:2]} == {
+        entry.entry_id for entry in entries
+    }
+
+    await client.send_json(
+        {
+            "id": 2,
+            "type": f"{DOMAIN}/recent_assets",
+            "page_size": 3,
+            "cursor": first["next_cursor"],
+        }
+    )
+    second = (await client.receive_json())["result"]
+    assert [asset["id"] for asset in second["assets"]] == ["asset-1"]
+    assert second["next_cursor"] is None
+
+    await client.send_json(
+        {
+            "id": 3,
+            "type": f"{DOMAIN}/recent_assets",
+            "entry_id": entries[1].entry_id,
+        }
+    )
+    single = (await client.receive_json())["result"]
+    assert [asset["entry_id"] for asset in single["assets"]] == [
+        entries[1].entry_id
+    ] * 2
+
+    await client.send_json(
+        {"id": 4, "type": f"{DOMAIN}/get_data", "entry_id": "missing"}
+    )
+    missing = await client.receive_json()
+    assert missing["error"]["code"] == "not_found"